@@ -101,11 +101,64 @@ def findDocument(url):
 
     Returns None if no document with given url exists or if the url is empty.
 
+    The lookup uses an index that is kept up to date when documents are
+    created, loaded, closed or change their url, so it does not depend on the
+    number of open documents.
+
     """
     if not url.isEmpty():
-        for d in documents:
-            if url == d.url():
-                return d
+        return _documentIndex.get(_urlKey(url))
+
+
+# index of the open documents, mapping normalized url keys to Document
+_documentIndex = {}
+
+def _urlKey(url):
+    """Return a hashable key for the QUrl, used for the document index.
+
+    For local files, the normalized path is used, so that different spellings
+    of the same file name refer to the same document.
+
+    """
+    filename = url.toLocalFile()
+    if filename:
+        return os.path.normcase(os.path.normpath(filename))
+    return url.toString()
+
+def _indexDocument(doc):
+    """Add the Document to the index, unless another has the same url."""
+    url = doc.url()
+    if not url.isEmpty():
+        _documentIndex.setdefault(_urlKey(url), doc)
+
+def _unindexUrl(doc, url):
+    """Remove the Document from the index for url.
+
+    If another open Document has the same url, that one takes its place.
+
+    """
+    if not url.isEmpty():
+        key = _urlKey(url)
+        if _documentIndex.get(key) is doc:
+            del _documentIndex[key]
+            for d in documents:
+                if d is not doc and not d.url().isEmpty() and _urlKey(d.url()) == key:
+                    _documentIndex[key] = d
+                    break
+
+def _documentUrlChanged(doc, url, old):
+    _unindexUrl(doc, old)
+    _indexDocument(doc)
+
+def _documentClosed(doc):
+    _unindexUrl(doc, doc.url())
+
+# keep the index updated before other slots are called, and while closing,
+# only after all other slots have run
+documentCreated.connect(_indexDocument, -1000)
+documentLoaded.connect(_indexDocument, -1000)
+documentUrlChanged.connect(_documentUrlChanged, -1000)
+documentClosed.connect(_documentClosed, 1000)
 
 def instantiate():
     """Instantiate the global QApplication object."""
@@ -213,6 +266,19 @@ def settings(name):
     s.setFallbacksEnabled(False)
     return s
 
+def cachedir(name):
+    """Returns a directory to store cached data in, e.g. ~/.cache/frescobaldi/name.
+
+    The directory is created if it does not exist yet.
+
+    """
+    from PyQt5.QtCore import QStandardPaths
+    path = os.path.join(
+        QStandardPaths.writableLocation(QStandardPaths.GenericCacheLocation),
+        appinfo.name, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
 def excepthook(exctype, excvalue, exctb):
     """Called when a Python exception goes unhandled."""
     from traceback import format_exception
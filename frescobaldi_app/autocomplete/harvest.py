@@ -50,7 +50,7 @@ def markup_commands(cursor):
 
 def schemewords(document):
     """Harvests all schemewords from the document."""
-    for t in tokeniter.all_tokens(document):
+    for t in tokeniter.select(document, (ly.lex.scheme.Word,)):
         if type(t) is ly.lex.scheme.Word:
             yield t
 
@@ -78,8 +78,7 @@ _word_types = (
 
 def words(document):
     """Harvests words from strings, lyrics, markup and comments."""
-    for t in tokeniter.all_tokens(document):
-        if isinstance(t, _word_types):
-            for m in _words(t):
-                yield m.group()
+    for t in tokeniter.select(document, _word_types):
+        for m in _words(t):
+            yield m.group()
 
@@ -0,0 +1,36 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Benchmarks for the code that runs while editing large documents.
+
+The benchmarks run on a synthetic score (see the generate module) and time
+the cases defined in the cases module. Run them from the directory containing
+frescobaldi_app with:
+
+    python3 -m frescobaldi_app.benchmark --output results.json
+
+and later compare a new run against those results with:
+
+    python3 -m frescobaldi_app.benchmark --baseline results.json
+
+No window is shown: the offscreen Qt platform is used unless QT_QPA_PLATFORM
+is set. Use --help to see how the size of the generated score can be changed.
+
+"""
@@ -0,0 +1,47 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Entry point of the benchmarks, see the benchmark package.
+"""
+
+
+import os
+import sys
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from .. import toplevel
+toplevel.install()
+
+try:
+    import sip
+except ImportError:
+    # PyQt5 >= 5.11 only has the private PyQt5.sip module, which main imports
+    from PyQt5 import sip
+    sys.modules['sip'] = sip
+
+import main                     # Set up sip and translations
+import app
+
+app.instantiate()               # Construct QApplication object
+
+import benchmark.suite
+
+sys.exit(benchmark.suite.main())
@@ -0,0 +1,321 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+The benchmark cases.
+
+Every case is a function that is called with a Subject and returns a function
+without arguments, which is the code that is timed. Everything a case does
+before returning that function (the setup) is not timed. If the timed function
+returns a dictionary, its values are stored as additional measurements. A case is called
+again for every repetition, after the Subject has been touched, so caches
+that depend on the document contents are empty, like they are after the user
+typed a character.
+
+"""
+
+
+from PyQt5.QtCore import QEvent, QUrl
+from PyQt5.QtGui import QTextCursor
+
+import app
+import cursortools
+import document
+import highlighter
+import tokeniter
+import ly.lex
+import ly.lex.lilypond
+
+
+_cases = []
+
+
+def case(func):
+    """Decorator that registers a benchmark case, in the order of definition."""
+    _cases.append(func)
+    return func
+
+
+def names():
+    """Return the names of all cases."""
+    return [func.__name__ for func in _cases]
+
+
+def get(name):
+    """Return the case with the specified name, raises KeyError if not found."""
+    for func in _cases:
+        if func.__name__ == name:
+            return func
+    raise KeyError(name)
+
+
+def description(func):
+    """Return the first line of the docstring of the case."""
+    return (func.__doc__ or '').strip().splitlines()[0]
+
+
+class Subject(object):
+    """The document the benchmarks are run on.
+
+    The text is loaded in an EditorDocument, like the documents in the editor.
+    A MainWindow is only created when a case requests it.
+
+    """
+    def __init__(self, text):
+        self.text = text
+        self.document = document.EditorDocument()
+        highlighter.highlighter(self.document)
+        self.document.setPlainText(text)
+        self._mainwindow = None
+        self._notes = None
+        self._documents = []
+
+    def close(self):
+        """Close the main window, if any, and the documents if still open."""
+        self.document.setModified(False)    # don't ask to save it
+        if self._mainwindow:
+            self._mainwindow.close()
+            self._mainwindow.deleteLater()
+            self._mainwindow = None
+            # delete it now, not while the interpreter shuts down
+            app.qApp.sendPostedEvents(None, QEvent.DeferredDelete)
+        for doc in [self.document] + self._documents:
+            if doc in app.documents:
+                doc.close()
+        self._documents = []
+
+    def touch(self):
+        """Change and restore the end of the document.
+
+        This invalidates everything that is cached for the document contents,
+        while only the last block needs to be highlighted again.
+
+        """
+        cursor = QTextCursor(self.document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(" ")
+        cursor.deletePreviousChar()
+
+    def copy(self):
+        """Return a new, highlighted, non-editor Document with the same text."""
+        doc = document.Document()
+        highlighter.highlighter(doc)
+        doc.setPlainText(self.text)
+        return doc
+
+    def cursor(self, text, fraction=0.5, offset=0):
+        """Return a QTextCursor at the first occurrence of text.
+
+        The search starts at the given fraction of the document, and offset is
+        added to the position of the found text.
+
+        """
+        start = int(len(self.text) * fraction)
+        pos = self.text.find(text, start)
+        if pos == -1:
+            pos = self.text.rfind(text, 0, start)
+        cursor = QTextCursor(self.document)
+        cursor.setPosition(max(0, pos) + offset)
+        return cursor
+
+    def documents(self, count):
+        """Return a list of count other open (empty) documents.
+
+        Every document has its own local url. The documents are created on
+        the first request and closed by close().
+
+        """
+        while len(self._documents) < count:
+            url = QUrl.fromLocalFile(
+                "/benchmark/document{0}.ly".format(len(self._documents) + 1))
+            self._documents.append(document.EditorDocument(url))
+        return self._documents[:count]
+
+    def mainwindow(self):
+        """Return a MainWindow showing the document, creating it if needed."""
+        if self._mainwindow is None:
+            import mainwindow
+            self._mainwindow = mainwindow.MainWindow()
+            self._mainwindow.setCurrentDocument(self.document)
+        return self._mainwindow
+
+    def notes(self):
+        """Return a list of (line, column) tuples for every note.
+
+        Lines start at 1, like in the point and click links LilyPond writes.
+
+        """
+        if self._notes is None:
+            self._notes = [(block.blockNumber() + 1, t.pos)
+                for block in cursortools.all_blocks(self.document)
+                for t in tokeniter.tokens(block)
+                if isinstance(t, ly.lex.lilypond.Note)]
+        return self._notes
+
+
+@case
+def highlighting(subject):
+    """Highlight the full document (highlighter.Highlighter.rehighlight)."""
+    return highlighter.highlighter(subject.document).rehighlight
+
+
+@case
+def all_tokens(subject):
+    """Iterate over all tokens (tokeniter.all_tokens)."""
+    def run():
+        for t in tokeniter.all_tokens(subject.document):
+            pass
+    return run
+
+
+@case
+def states(subject):
+    """Look up the lexer state at the start of every block (tokeniter.state)."""
+    check_fridge()
+    blocks = list(cursortools.all_blocks(subject.document))
+    def run():
+        for block in blocks:
+            tokeniter.state(block)
+    return run
+
+
+def check_fridge():
+    """Raise AssertionError if using a thawed state changes the stored state.
+
+    ParsePitchCommand decreases its argcount on every note, also below zero,
+    so highlighter.Fridge may not share it between the states it thaws.
+
+    """
+    fridge = highlighter.Fridge()
+    state = ly.lex.state('lilypond')
+    for t in state.tokens('{ \\transpose c d'):
+        pass
+    num = fridge.freeze(state)
+    for t in fridge.thaw(num).tokens('e'):
+        pass
+    if fridge.thaw(num).freeze() != state.freeze():
+        raise AssertionError("highlighter.Fridge.thaw() returned a changed state")
+
+
+@case
+def outline(subject):
+    """Build the document outline (documentstructure.outline)."""
+    import documentstructure
+    return documentstructure.DocumentStructure.instance(subject.document).outline
+
+
+@case
+def search(subject):
+    """Find all occurrences of a word (search.Search.updatePositions)."""
+    import search
+    view = subject.mainwindow().currentView()
+    s = search.Search.instance(view.window())
+    s.setCurrentView(view)
+    s.regexCheck.setChecked(False)
+    s.caseCheck.setChecked(False)
+    s.searchEntry.setText("dolce")
+    # typing selected the first occurrence, don't search inside it
+    view.setTextCursor(QTextCursor(subject.document))
+    def run():
+        s.markPositionsDirty()
+        s.updatePositions()
+    return run
+
+
+@case
+def harvest(subject):
+    """Harvest completion words, names and markup (autocomplete.harvest)."""
+    from autocomplete import harvest
+    cursor = subject.cursor("\\score")
+    def run():
+        set(harvest.words(subject.document))
+        set(harvest.schemewords(subject.document))
+        list(harvest.names(cursor))
+        list(harvest.markup_commands(cursor))
+    return run
+
+
+@case
+def matcher(subject):
+    """Find the end of a slur in the middle of the document (matcher.matches)."""
+    import matcher
+    cursor = subject.cursor("4( ", offset=1)
+    return lambda: matcher.matches(cursor)
+
+
+@case
+def musicpos(subject):
+    """Compute the time position in the middle of a voice (musicpos)."""
+    import documentinfo
+    position = subject.cursor(" |", 0.25).position()
+    return lambda: documentinfo.music(subject.document).time_position(position)
+
+
+@case
+def links(subject):
+    """Bind a point and click link to every note (pointandclick.BoundLinks)."""
+    import pointandclick
+    l = pointandclick.Links()
+    filename = "/benchmark.ly"
+    for i, (line, column) in enumerate(subject.notes()):
+        l.add_link(filename, line, column, (i // 100, i))
+    return lambda: l.bind(filename, subject.document)
+
+
+@case
+def midi(subject):
+    """Play chords through a fake MIDI port (midiinput.Listener latency)."""
+    from . import fakemidi
+    messages = fakemidi.chords(25)
+    return lambda: fakemidi.measure(messages)
+
+
+@case
+def transpose(subject):
+    """Transpose the document a major second up (lydocument.Document.apply_changes)."""
+    import lydocument
+    import ly.pitch
+    import ly.pitch.transpose
+    doc = subject.copy()
+    cursor = lydocument.cursor(QTextCursor(doc), select_all=True)
+    transposer = ly.pitch.transpose.Transposer(ly.pitch.Pitch(0), ly.pitch.Pitch(1))
+    return lambda: ly.pitch.transpose.transpose(cursor, transposer)
+
+
+@case
+def snippets(subject):
+    """Filter and repaint the snippet list (snippet.widget.Widget.updateFilter)."""
+    import panelmanager
+    widget = panelmanager.manager(subject.mainwindow()).snippettool.widget()
+    widget.treeView.resize(400, 4000)   # paint all rows
+    def run():
+        for text in ("", "h", "he", "hea", "head", ":menu", ""):
+            widget.searchEntry.setText(text)
+            widget.treeView.grab()
+    return run
+
+
+@case
+def find_document(subject):
+    """Find every one of 500 open documents by its url (app.findDocument)."""
+    urls = [doc.url() for doc in subject.documents(500)]
+    def run():
+        for url in urls:
+            app.findDocument(url)
+    return run
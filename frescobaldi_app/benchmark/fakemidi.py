@@ -0,0 +1,130 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+A fake MIDI input port, to measure the latency of the MIDI input listener.
+
+FakeInput plays a list of timestamped messages: a message becomes readable
+when its time has come, like on a real PortMidi input. The latency of an
+event is the time between that moment and the moment its batch reached the
+main thread.
+
+"""
+
+
+import collections
+import statistics
+import threading
+from time import perf_counter
+
+from PyQt5.QtCore import QEventLoop, QTimer
+
+
+class FakeInput(object):
+    """A MIDI input with the poll() and read() methods of portmidi.Input.
+
+    messages is a list of (time, (status, data1, data2, data3)) tuples, time
+    being the number of ms after start() the message arrives. The timestamps
+    read() returns are the times the messages arrived.
+
+    """
+    def __init__(self, messages):
+        self._messages = collections.deque(sorted(messages, key=lambda m: m[0]))
+        self._lock = threading.Lock()
+        self._start = None
+
+    def start(self):
+        """Start the clock, the messages begin to arrive."""
+        self._start = perf_counter()
+
+    def time(self):
+        """Return the time in ms since start()."""
+        return (perf_counter() - self._start) * 1000
+
+    def poll(self):
+        """Return True if a message can be read."""
+        with self._lock:
+            return bool(self._messages) and self._messages[0][0] <= self.time()
+
+    def read(self, num_events):
+        """Return at most num_events messages that have arrived."""
+        now = self.time()
+        result = []
+        with self._lock:
+            while self._messages and len(result) < num_events and self._messages[0][0] <= now:
+                time, message = self._messages.popleft()
+                result.append((message, time))
+        return result
+
+
+def chords(count, size=3, interval=40, duration=20):
+    """Return messages playing count chords of size notes each.
+
+    Every interval ms a chord starts, the keys are pressed 1 ms apart and
+    released after duration ms.
+
+    """
+    messages = []
+    for c in range(count):
+        start = c * interval
+        for n in range(size):
+            note = 48 + (c * 5 + n * 4) % 36
+            messages.append((start + n, (0x90, note, 80, 0)))
+            messages.append((start + duration + n, (0x80, note, 0, 0)))
+    return messages
+
+
+def measure(messages, pollingtime=10):
+    """Play the messages through a midiinput.Listener and return the latency.
+
+    Returns a dictionary with the mean latency and the jitter (the standard
+    deviation of the latency), both in ms, and the number of batches emitted.
+
+    """
+    import midiinput
+    port = FakeInput(messages)
+    listener = midiinput.Listener(port, pollingtime)
+    notes = sum(1 for time, (status, d1, d2, d3) in messages if 0x80 <= status < 0xA0)
+    latencies = []
+    batches = []
+    loop = QEventLoop()
+
+    def received(events):
+        now = port.time()
+        batches.append(len(events))
+        latencies.extend(now - timestamp for timestamp, event in events)
+        if len(latencies) >= notes:
+            loop.quit()
+
+    listener.NoteEventsSignal.connect(received)
+    port.start()
+    listener.start()
+    # don't wait forever if events get lost
+    QTimer.singleShot(int(max(m[0] for m in messages)) + 2000, loop.quit)
+    loop.exec_()
+    listener.stop()
+    listener.wait()
+    if len(latencies) < notes:
+        raise RuntimeError("{0} of {1} MIDI events were lost".format(
+            notes - len(latencies), notes))
+    return {
+        'latency_ms': statistics.mean(latencies),
+        'jitter_ms': statistics.pstdev(latencies),
+        'batches': len(batches),
+    }
@@ -0,0 +1,133 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Generates synthetic LilyPond scores to run the benchmarks on.
+
+The generated music is not meant to sound good, but it contains the things
+real scores contain: assignments, relative music with slurs, chords, dynamics,
+markup and comments, lyrics attached to the voices and Scheme expressions.
+The output only depends on the arguments, so results of different runs can be
+compared.
+
+"""
+
+
+# one measure of 4/4 per entry, in relative mode
+_measures = (
+    "c4( d e f) |",
+    "g2 a4\\p b |",
+    "<c e g>2 ~ q4 r |",
+    "b8 a g f e4-. d-. |",
+    "c4.\\< d8 e4 f\\! |",
+    "g4^\\markup { \\italic \"dolce\" } f e d |",
+    "c2( e4 g) |",
+    "a4 b c2 |",
+)
+
+# lyrics for one measure, matching the number of notes above (ties and rests
+# do not get a syllable, slurred notes share one)
+_syllables = (
+    "Lau -- da -- te",
+    "Do -- mi -- num",
+    "om --",
+    "nes gen -- tes, lau -- da",
+    "te e -- um om --",
+    "nes po -- pu -- li",
+    "quo --",
+    "ni -- am con --",
+)
+
+_names = ("one", "two", "three", "four", "five", "six", "seven", "eight")
+
+_scheme = (
+    "#(define (bench-scale n)\n"
+    "   (if (< n 2)\n"
+    "       1\n"
+    "       (* n (bench-scale (- n 1)))))\n"
+    "\n"
+    "#(define bench-colors\n"
+    "   '((red . (1 0 0)) (green . (0 1 0)) (blue . (0 0 1))))\n"
+)
+
+
+def name(number):
+    """Return a name for the voice with the given number (counting from 0).
+
+    Names consist of letters only, so they are valid LilyPond identifiers.
+
+    """
+    word = _names[number % len(_names)]
+    if number >= len(_names):
+        word += _names[number // len(_names) % len(_names)].capitalize()
+    return word
+
+
+def voice(number, measures, scheme=True):
+    """Return the assignment of a voice with the given number of measures."""
+    lines = ["voice{0} = \\relative c'' {{".format(name(number).capitalize()),
+             "  \\global"]
+    for m in range(measures):
+        if m % 16 == 0:
+            lines.append("  % measure {0}".format(m + 1))
+        if scheme and m % 8 == 4:
+            lines.append("  \\once \\override NoteHead.color = "
+                "#(rgb-color {0} 0 0)".format(m % 3 / 2))
+        lines.append("  " + _measures[(m + number) % len(_measures)])
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def verse(number, measures):
+    """Return the assignment of the lyrics for the voice with the given number."""
+    lines = ["verse{0} = \\lyricmode {{".format(name(number).capitalize())]
+    for m in range(measures):
+        lines.append("  " + _syllables[(m + number) % len(_syllables)])
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def score(voices=4, measures=200, lyrics=True, scheme=True):
+    """Return the text of a LilyPond document.
+
+    The document has the given number of voices, each on its own staff, with
+    the given number of measures. If lyrics is True, every voice gets lyrics.
+    If scheme is True, Scheme function definitions and overrides are added.
+
+    """
+    parts = [
+        '\\version "2.18.0"',
+        '\\header {\n  title = "Benchmark"\n  composer = "Frescobaldi"\n}',
+    ]
+    if scheme:
+        parts.append(_scheme)
+    parts.append("global = {\n  \\key c \\major\n  \\time 4/4\n}")
+    for v in range(voices):
+        parts.append(voice(v, measures, scheme))
+        if lyrics:
+            parts.append(verse(v, measures))
+    staves = []
+    for v in range(voices):
+        n = name(v).capitalize()
+        staves.append('    \\new Staff \\new Voice = "{0}" \\voice{0}'.format(n))
+        if lyrics:
+            staves.append('    \\new Lyrics \\lyricsto "{0}" \\verse{0}'.format(n))
+    parts.append("\\score {{\n  <<\n{0}\n  >>\n  \\layout {{ }}\n}}".format(
+        "\n".join(staves)))
+    return "\n\n".join(parts) + "\n"
@@ -0,0 +1,214 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Runs the benchmark cases, stores the results and compares them.
+"""
+
+
+import collections
+import json
+import platform
+import statistics
+import sys
+from time import perf_counter
+
+from PyQt5.QtCore import PYQT_VERSION_STR, QT_VERSION_STR
+
+import appinfo
+
+from . import cases, generate
+
+
+def run(names=None, voices=4, measures=200, lyrics=True, scheme=True,
+        repeat=5, report=None):
+    """Run the benchmarks and return the results as a dictionary.
+
+    names is a list of case names to run, by default all cases are run.
+    The other arguments describe the generated document and how many times
+    every case is run. If given, report is called with the case name and its
+    result after every case. Measurements a case returns are stored, as the
+    median of all runs, under 'metrics' in its result.
+
+    """
+    text = generate.score(voices, measures, lyrics, scheme)
+    subject = cases.Subject(text)
+    results = {}
+    try:
+        for name in names or cases.names():
+            func = cases.get(name)
+            times = []
+            metrics = collections.defaultdict(list)
+            for i in range(repeat):
+                subject.touch()
+                timed = func(subject)
+                start = perf_counter()
+                measured = timed()
+                times.append(perf_counter() - start)
+                if isinstance(measured, dict):
+                    for key, value in measured.items():
+                        metrics[key].append(value)
+            results[name] = {
+                'min': min(times),
+                'median': statistics.median(times),
+            }
+            if metrics:
+                results[name]['metrics'] = dict((key, statistics.median(values))
+                    for key, values in metrics.items())
+            if report:
+                report(name, results[name])
+    finally:
+        subject.close()
+    return {
+        'version': appinfo.version,
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'machine': platform.machine(),
+        'document': {
+            'voices': voices,
+            'measures': measures,
+            'lyrics': lyrics,
+            'scheme': scheme,
+            'lines': text.count('\n'),
+            'characters': len(text),
+        },
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def save(results, filename):
+    """Write the results to a JSON file."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(filename):
+    """Read results from a JSON file."""
+    with open(filename, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(results, baseline, threshold=0.1, resolution=0.0001):
+    """Compare results against a baseline.
+
+    Yields (name, time, baseline_time, ratio, verdict) tuples for the cases
+    present in both, where the times are the minimum times and verdict is
+    "slower", "faster" or "same", depending on whether the ratio differs more
+    than threshold from 1. Differences smaller than resolution (in seconds)
+    are considered noise.
+
+    """
+    base = baseline['results']
+    for name, result in results['results'].items():
+        if name in base:
+            time, base_time = result['min'], base[name]['min']
+            ratio = time / base_time if base_time else float('inf')
+            if abs(time - base_time) < resolution:
+                verdict = "same"
+            elif ratio > 1 + threshold:
+                verdict = "slower"
+            elif ratio < 1 - threshold:
+                verdict = "faster"
+            else:
+                verdict = "same"
+            yield name, time, base_time, ratio, verdict
+
+
+def parse_commandline(argv=None):
+    """Parse the command line and return the options."""
+    import argparse
+    parser = argparse.ArgumentParser(prog="python3 -m frescobaldi_app.benchmark",
+        description="Time the editor hot paths on a synthetic score.")
+    parser.add_argument('cases', nargs='*', metavar="CASE",
+        help="the cases to run (default: all)")
+    parser.add_argument('-l', '--list', action="store_true",
+        help="list the cases and exit")
+    parser.add_argument('-v', '--voices', type=int, default=4,
+        help="number of voices (default: %(default)s)")
+    parser.add_argument('-m', '--measures', type=int, default=200,
+        help="number of measures per voice (default: %(default)s)")
+    parser.add_argument('--no-lyrics', dest="lyrics", action="store_false",
+        help="do not add lyrics to the voices")
+    parser.add_argument('--no-scheme', dest="scheme", action="store_false",
+        help="do not add Scheme code")
+    parser.add_argument('-r', '--repeat', type=int, default=5,
+        help="how many times every case is run (default: %(default)s)")
+    parser.add_argument('-o', '--output', metavar="FILE",
+        help="write the results to FILE as JSON")
+    parser.add_argument('-b', '--baseline', metavar="FILE",
+        help="compare the results against the JSON results in FILE")
+    parser.add_argument('-t', '--threshold', type=float, default=0.1,
+        help="relative difference that counts as a change "
+             "(default: %(default)s)")
+    parser.add_argument('-s', '--save-score', metavar="FILE",
+        help="write the generated score to FILE and exit")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Run the benchmarks from the command line.
+
+    Returns 1 if any case is slower than in the baseline, 2 on invalid
+    arguments, 0 otherwise.
+
+    """
+    args = parse_commandline(argv)
+    if args.list:
+        for name in cases.names():
+            print("{0:14} {1}".format(name, cases.description(cases.get(name))))
+        return 0
+    if args.save_score:
+        with open(args.save_score, 'w', encoding='utf-8') as f:
+            f.write(generate.score(args.voices, args.measures, args.lyrics, args.scheme))
+        return 0
+    unknown = set(args.cases).difference(cases.names())
+    if unknown:
+        print("unknown case(s):", ", ".join(sorted(unknown)), file=sys.stderr)
+        return 2
+    baseline = load(args.baseline) if args.baseline else None
+
+    def report(name, result):
+        metrics = "".join("  {0}={1:.4g}".format(key, value)
+            for key, value in sorted(result.get('metrics', {}).items()))
+        print("{0:14} {1:10.2f} ms{2}".format(name, result['min'] * 1000, metrics))
+        sys.stdout.flush()
+
+    print("{0} voices, {1} measures, {2} runs per case".format(
+        args.voices, args.measures, args.repeat))
+    results = run(args.cases, args.voices, args.measures, args.lyrics,
+        args.scheme, args.repeat, report)
+    if args.output:
+        save(results, args.output)
+
+    if baseline is None:
+        return 0
+    if baseline['document'] != results['document']:
+        print("warning: the baseline was made with a different document:",
+            baseline['document'], file=sys.stderr)
+    print()
+    print("compared with {0}:".format(args.baseline))
+    slower = False
+    for name, time, base_time, ratio, verdict in compare(results, baseline, args.threshold):
+        print("{0:14} {1:10.2f} ms {2:10.2f} ms {3:7.2f}x  {4}".format(
+            name, time * 1000, base_time * 1000, ratio, verdict))
+        slower = slower or verdict == "slower"
+    return 1 if slower else 0
@@ -0,0 +1,230 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+
+"""
+A process-wide store of the decoded contents of files.
+
+Files are memory-mapped and decoded only once, as long as they do not change
+on disk. All users of a file (loading a document in the editor, the external
+changes dialog, and the fileinfo module, which scans included files for
+autocomplete, the music tree and the engraving jobs) share the same immutable
+text string, and the same ly.document.Document, which caches the tokens of
+its lines.
+
+A change is detected by the mtime, size and inode of the file. On file
+systems with a coarse mtime, a rewrite of the same size within the mtime
+resolution goes unnoticed that way. So as long as the file was read less than
+mtime_window seconds after it was last modified, a hash of its contents is
+compared as well, which is much cheaper than decoding and parsing it again.
+
+The store keeps at most max_size characters; the least recently used files
+are dropped first. The stats() function returns the number of hits and misses.
+"""
+
+
+import collections
+import hashlib
+import mmap
+import os
+import threading
+import time
+
+import util
+import variables
+
+
+max_size = 64 << 20     # maximum total length of the texts in the store
+mtime_window = 2.0      # the coarsest mtime resolution (FAT), in seconds
+
+_store = collections.OrderedDict()  # (filename, encoding) -> Entry
+_size = 0
+_hits = 0
+_misses = 0
+_lock = threading.Lock()
+
+
+class Entry(object):
+    """The contents of a file, as read from disk.
+
+    The filename, stat (a tuple with the mtime in nanoseconds, the size,
+    inode and device of the file), digest (a hash of the contents) and the
+    decoded text are available as attributes.
+
+    """
+    def __init__(self, filename, stat, digest, text):
+        self.filename = filename
+        self.stat = stat
+        self.digest = digest
+        self.text = text
+        self._checked = time.time_ns()
+        self._variables = None
+        self._document = None
+
+    def valid(self, stat):
+        """Return True if the file on disk (with the stat tuple) still has our text.
+
+        If the file was modified less than mtime_window seconds before we
+        last checked it, its contents are hashed and compared.
+
+        """
+        if stat != self.stat:
+            return False
+        if self._checked - stat[0] >= mtime_window * 1e9:
+            return True
+        checked = time.time_ns()
+        try:
+            digest = _load(self.filename, hash_only=True)
+        except OSError:
+            return False
+        if digest != self.digest:
+            return False
+        self._checked = checked
+        return True
+
+    def variables(self):
+        """Return the document variables (a dict) of the text."""
+        if self._variables is None:
+            self._variables = variables.variables(self.text)
+        return self._variables
+
+    def document(self):
+        """Return a ly.document.Document with the text.
+
+        The document is shared by all users of the file, so it must not be
+        modified.
+
+        """
+        if self._document is None:
+            import ly.document
+            d = ly.document.Document(self.text, self.variables().get("mode"))
+            d.filename = self.filename
+            self._document = d
+        return self._document
+
+
+def _stat(filename):
+    """Return the (mtime, size, inode, device) tuple for the file."""
+    st = os.stat(filename)
+    return st.st_mtime_ns, st.st_size, st.st_ino, st.st_dev
+
+
+def _load(filename, encoding=None, hash_only=False):
+    """Read the file via a memory map, return a (digest, text) tuple.
+
+    If hash_only is True, only the digest is returned.
+
+    """
+    with open(filename, 'rb') as f:
+        try:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # an empty file can't be mapped
+            m = None
+            data = f.read()
+    if m is None:
+        digest = hashlib.sha1(data).digest()
+        return digest if hash_only else (digest, util.decode(data, encoding))
+    with m:
+        digest = hashlib.sha1(m).digest()
+        return digest if hash_only else (digest, util.decode(memoryview(m), encoding))
+
+
+def entry(filename, encoding=None):
+    """Return the Entry for the filename, reading the file if needed.
+
+    The filename is made absolute with os.path.realpath(). The encoding is
+    used to decode the file, if it can't be determined otherwise (see
+    util.decode()). Raises OSError if the file can't be read.
+
+    """
+    global _hits, _misses, _size
+    filename = os.path.realpath(filename)
+    key = (filename, encoding)
+    stat = _stat(filename)
+    with _lock:
+        e = _store.get(key)
+    if e and e.valid(stat):
+        with _lock:
+            if key in _store:
+                _store.move_to_end(key)
+            _hits += 1
+        return e
+    digest, text = _load(filename, encoding)
+    e = Entry(filename, stat, digest, text)
+    with _lock:
+        _misses += 1
+        old = _store.pop(key, None)
+        if old:
+            _size -= len(old.text)
+        _store[key] = e
+        _size += len(text)
+        while _size > max_size and len(_store) > 1:
+            _size -= len(_store.popitem(False)[1].text)
+    return e
+
+
+def read(filename, encoding=None):
+    """Read and decode the file via a memory map, without using the store."""
+    return _load(filename, encoding)[1]
+
+
+def text(filename, encoding=None):
+    """Return the decoded contents of the file. Raises OSError on error."""
+    return entry(filename, encoding).text
+
+
+def document(filename):
+    """Return a shared ly.document.Document for the file. Raises OSError on error."""
+    return entry(filename).document()
+
+
+def stats():
+    """Return a dict with information about the use of the store.
+
+    The keys are: "files", "size" (total length of the texts), "hits",
+    "misses" and "ratio" (the fraction of the requests that were hits).
+
+    """
+    with _lock:
+        requests = _hits + _misses
+        return {
+            "files": len(_store),
+            "size": _size,
+            "hits": _hits,
+            "misses": _misses,
+            "ratio": _hits / requests if requests else 0.0,
+        }
+
+
+def forget(filename):
+    """Remove the file from the store."""
+    global _size
+    filename = os.path.realpath(filename)
+    with _lock:
+        for key in [k for k in _store if k[0] == filename]:
+            _size -= len(_store.pop(key).text)
+
+
+def clear():
+    """Remove all files from the store."""
+    global _size
+    with _lock:
+        _store.clear()
+        _size = 0
@@ -22,7 +22,9 @@ The browser widget for the help browser.
 """
 
 
+import html
 import os
+import time
 
 from PyQt5.QtCore import QSettings, Qt, QUrl
 from PyQt5.QtGui import QKeySequence
@@ -54,6 +56,7 @@ class Browser(QWidget):
         self.webview = QWebView(contextMenuPolicy=Qt.CustomContextMenu)
         self.chooser = QComboBox(sizeAdjustPolicy=QComboBox.AdjustToContents)
         self.search = SearchEntry(maximumWidth=200)
+        self._pendingSearch = None
 
         layout.addWidget(self.toolbar)
         layout.addWidget(self.webview)
@@ -117,6 +120,10 @@ class Browser(QWidget):
             self.search.setPlaceholderText(_("Search..."))
         except AttributeError:
             pass # not in Qt 4.6
+        self.search.setToolTip(_(
+            "Search the current page.\n"
+            "Start with a colon (:) and press Enter to search all pages of the\n"
+            "local documentation."))
 
     def showInitialPage(self):
         """Shows the preferred start page.
@@ -196,7 +203,81 @@ class Browser(QWidget):
         if not text.startswith(':'):
             self.slotSearchChanged()
         else:
-            pass # TODO: implement full doc search
+            self.fullTextSearch(text[1:])
+
+    def currentDocumentation(self):
+        """Returns the Documentation instance currently selected in the chooser."""
+        i = self.chooser.currentIndex()
+        if i < 0:
+            i = 0
+        return lilydoc.manager.docs()[i]
+
+    def fullTextSearch(self, query):
+        """Searches the current (local) documentation and shows the results.
+
+        If the search index is not yet available, it is built in the
+        background and the search is performed when it is ready.
+
+        """
+        import lilydoc.fulltext
+        query = query.strip()
+        if not query:
+            return
+        doc = self.currentDocumentation()
+        if not doc.isLocal():
+            self.showSearchPage(query, _(
+                "Full text search is only available for local documentation."))
+            return
+        index = lilydoc.fulltext.index(doc)
+        error = lilydoc.fulltext.error(doc)
+        if error:
+            self.showSearchPage(query, _(
+                "The search index could not be built: {message}").format(
+                    message=error))
+            return
+        elif index is None:
+            self._pendingSearch = query
+            lilydoc.fulltext.indexReady.connect(self.slotIndexReady)
+            self.showSearchPage(query, _(
+                "Building the search index. This is only done once for every "
+                "version of the documentation, please wait..."))
+            return
+        start = time.time()
+        results = index.search(query)
+        msecs = (time.time() - start) * 1000
+        items = []
+        langs = lilydoc.network.langs()
+        for score, filename, title, summary in results:
+            for lang in langs:
+                translated = filename[:-5] + '.' + lang + '.html'
+                if os.path.exists(translated):
+                    filename = translated
+                    break
+            manual = os.path.basename(os.path.dirname(filename))
+            items.append('<dt><a href="{0}">{1}</a> <small>({2})</small></dt>'
+                '<dd>{3}</dd>'.format(
+                    html.escape(QUrl.fromLocalFile(filename).toString()),
+                    html.escape(title or os.path.basename(filename)),
+                    html.escape(manual), html.escape(summary)))
+        message = _("{count} pages found in {msecs:.0f} ms.").format(
+            count=len(results), msecs=msecs)
+        self.showSearchPage(query, message, '<dl>{0}</dl>'.format(''.join(items)))
+
+    def slotIndexReady(self):
+        """Called when a documentation search index is ready."""
+        import lilydoc.fulltext
+        lilydoc.fulltext.indexReady.disconnect(self.slotIndexReady)
+        query, self._pendingSearch = self._pendingSearch, None
+        if query:
+            self.fullTextSearch(query)
+
+    def showSearchPage(self, query, message, results=""):
+        """Displays a page with search results for the query."""
+        title = html.escape(_("Search results for \"{query}\"").format(query=query))
+        page = ('<html><head><title>{0}</title></head><body>'
+                '<h2>{0}</h2><p>{1}</p>{2}</body></html>').format(
+                    title, html.escape(message), results)
+        self.webview.setHtml(page, self.currentDocumentation().url())
 
     def sourceViewer(self):
         try:
@@ -208,10 +289,7 @@ class Browser(QWidget):
 
     def showHomePage(self):
         """Shows the homepage of the LilyPond documentation."""
-        i = self.chooser.currentIndex()
-        if i < 0:
-            i = 0
-        doc = lilydoc.manager.docs()[i]
+        doc = self.currentDocumentation()
 
         url = doc.home()
         if doc.isLocal():
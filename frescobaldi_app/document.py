@@ -40,6 +40,7 @@ from PyQt5.QtGui import QTextCursor, QTextDocument
 from PyQt5.QtWidgets import QPlainTextDocumentLayout
 
 import app
+import contentstore
 import util
 import variables
 import signals
@@ -71,9 +72,7 @@ class AbstractDocument(QTextDocument):
         # currently, we do not support non-local files
         if not filename:
             raise IOError("not a local file")
-        with open(filename, 'rb') as f:
-            data = f.read()
-        text = util.decode(data, encoding)
+        text = contentstore.text(filename, encoding)
         return util.universal_newlines(text)
 
     @classmethod
@@ -31,7 +31,7 @@ import weakref
 from PyQt5.QtCore import QSettings, QUrl
 
 import document
-import qsettings
+import settingssnapshot
 import ly.lex
 import lydocinfo
 import lydocument
@@ -177,21 +177,7 @@ class DocumentInfo(plugin.DocumentPlugin):
         Currently the document does not matter.
 
         """
-        # get the global include path
-        include_path = qsettings.get_string_list(
-            QSettings(), "lilypond_settings/include_path")
-
-        # get the session specific include path
-        import sessions
-        session_settings = sessions.currentSessionGroup()
-        if session_settings and session_settings.value("set-paths", False, bool):
-            sess_path = qsettings.get_string_list(session_settings, "include-path")
-            if session_settings.value("repl-paths", False, bool):
-                include_path = sess_path
-            else:
-                include_path = sess_path + include_path
-
-        return include_path
+        return list(settingssnapshot.snapshot().session_include_path)
 
     def jobinfo(self, create=False):
         """Returns a two-tuple(filename, includepath).
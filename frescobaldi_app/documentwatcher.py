@@ -31,9 +31,10 @@ Use start() to start the document watcher, and stop() to stop it if desired.
 
 
 import contextlib
+import hashlib
 import os
 
-from PyQt5.QtCore import QFileSystemWatcher, QUrl
+from PyQt5.QtCore import QFileSystemWatcher, QTimer, QUrl
 
 import app
 import plugin
@@ -51,9 +52,15 @@ watcher = None
 
 
 class DocumentWatcher(plugin.DocumentPlugin):
-    """Maintains if a change was detected for a document."""
+    """Maintains if a change was detected for a document.
+
+    The diskhash attribute is the contenthash() of the document's text as
+    it was last loaded or saved, or None if unknown.
+
+    """
     def __init__(self, d):
         self.changed = False
+        self.diskhash = None
 
     def isdeleted(self):
         """Return True if some change has occurred, the document has a local
@@ -67,6 +74,27 @@ class DocumentWatcher(plugin.DocumentPlugin):
         return False
 
 
+def contenthash(data):
+    """Return a (size, digest) tuple for the bytes data."""
+    return len(data), hashlib.sha1(data).digest()
+
+
+def filehash(filename, chunksize=1 << 20):
+    """Return a (size, digest) tuple for the contents of the file.
+
+    The file is read in chunks, so it is not held in memory completely.
+    Raises OSError if the file can't be read.
+
+    """
+    h = hashlib.sha1()
+    size = 0
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunksize), b''):
+            h.update(chunk)
+            size += len(chunk)
+    return size, h.digest()
+
+
 def addUrl(url):
     """Add a url (QUrl) to the filesystem watcher."""
     filename = url.toLocalFile()
@@ -94,6 +122,7 @@ def documentUrlChanged(document, url, old):
     else:
         removeUrl(old)
     addUrl(url)
+    DocumentWatcher.instance(document).diskhash = None
 
 
 def documentClosed(document):
@@ -107,6 +136,13 @@ def documentClosed(document):
 def documentLoaded(document):
     """Called whenever a document loads."""
     addUrl(document.url())
+    storeHash(document)
+
+
+def storeHash(document):
+    """Store the hash of the document's contents as they are on disk."""
+    if not document.url().isEmpty() and not document.isModified():
+        DocumentWatcher.instance(document).diskhash = contenthash(document.encodedText())
 
 
 @contextlib.contextmanager
@@ -120,14 +156,31 @@ def whileSaving(document):
 
 
 def fileChanged(filename):
-    """Called whenever the global filesystem watcher detects a change."""
-    url = QUrl.fromLocalFile(filename)
-    doc = app.findDocument(url)
-    if doc:
-        w = DocumentWatcher.instance(doc)
-        if not w.changed:
-            w.changed = True
-            documentChangedOnDisk(doc)
+    """Called whenever the global filesystem watcher detects a change.
+
+    The changed files are collected and handled together shortly after,
+    because often many files change at the same time.
+
+    """
+    _changedFiles.add(filename)
+    _changedFilesTimer.start()
+
+
+def _handleChangedFiles():
+    """Emits documentChangedOnDisk for the documents of the changed files."""
+    filenames = list(_changedFiles)
+    _changedFiles.clear()
+    for filename in filenames:
+        doc = app.findDocument(QUrl.fromLocalFile(filename))
+        if doc:
+            w = DocumentWatcher.instance(doc)
+            if not w.changed:
+                w.changed = True
+                documentChangedOnDisk(doc)
+
+
+_changedFiles = set()
+_changedFilesTimer = QTimer(singleShot=True, interval=100, timeout=_handleChangedFiles)
 
 
 def start():
@@ -139,6 +192,7 @@ def start():
         app.documentUrlChanged.connect(documentUrlChanged)
         app.documentClosed.connect(documentClosed)
         app.documentSaving.connect(whileSaving)
+        app.documentSaved.connect(storeHash)
         watcher.fileChanged.connect(fileChanged)
         for d in app.documents:
             documentLoaded(d)
@@ -154,6 +208,7 @@ def stop():
         app.documentUrlChanged.disconnect(documentUrlChanged)
         app.documentClosed.disconnect(documentClosed)
         app.documentSaving.disconnect(whileSaving)
+        app.documentSaved.disconnect(storeHash)
         watcher.deleteLater()
         watcher = None
 
@@ -34,6 +34,7 @@ import actioncollectionmanager
 import documentinfo
 import job.attributes
 import job.lilypond
+import job.split
 import plugin
 import icons
 import signals
@@ -58,6 +59,8 @@ class Engraver(plugin.MainWindowPlugin):
         ac.engrave_preview.triggered.connect(self.engravePreview)
         ac.engrave_publish.triggered.connect(self.engravePublish)
         ac.engrave_debug.triggered.connect(self.engraveLayoutControl)
+        ac.engrave_split.triggered.connect(self.engraveSplit)
+        ac.engrave_fragment.triggered.connect(self.engraveFragment)
         ac.engrave_custom.triggered.connect(self.engraveCustom)
         ac.engrave_abort.triggered.connect(self.engraveAbort)
         ac.engrave_autocompile.toggled.connect(self.engraveAutoCompileToggled)
@@ -106,6 +109,7 @@ class Engraver(plugin.MainWindowPlugin):
         ac.engrave_preview.setEnabled(not visible)
         ac.engrave_publish.setEnabled(not visible)
         ac.engrave_debug.setEnabled(not visible)
+        ac.engrave_split.setEnabled(not visible)
         ac.engrave_abort.setEnabled(running)
         ac.engrave_runner.setIcon(icons.get('process-stop' if visible else 'lilypond-run'))
         ac.engrave_runner.setToolTip(_("Abort engraving job") if visible else
@@ -153,6 +157,15 @@ class Engraver(plugin.MainWindowPlugin):
         """Starts an engrave job in debug mode (using the settings in the debug tool)."""
         self.engrave('layout-control')
 
+    def engraveSplit(self):
+        """Starts an engrave job that engraves the bookparts in parallel (with point and click turned on)."""
+        self.engrave('split')
+
+    def engraveFragment(self):
+        """Engraves the music at the cursor and shows it in a preview dialog."""
+        from . import fragment
+        fragment.preview(self.mainwindow())
+
     def engraveCustom(self):
         """Opens a dialog to configure the job before starting it."""
         try:
@@ -171,9 +184,10 @@ class Engraver(plugin.MainWindowPlugin):
     def engrave(self, mode='preview', document=None, may_save=True):
         """Starts an engraving job.
 
-        The mode can be 'preview', 'publish', or 'layout-control'. The last
-        one uses the settings in the Layout Control Options panel. The
-        default mode is 'preview'.
+        The mode can be 'preview', 'publish', 'layout-control' or 'split'.
+        'layout-control' uses the settings in the Layout Control Options
+        panel; 'split' is like 'preview', but engraves the bookparts of the
+        document in parallel, if possible. The default mode is 'preview'.
 
         If document is not specified, it is either the sticky or current
         document.
@@ -186,6 +200,7 @@ class Engraver(plugin.MainWindowPlugin):
         job_class = (
             job.lilypond.PreviewJob if mode == 'preview'
             else job.lilypond.PublishJob if mode == 'publish'
+            else job.split.SplitJob if mode == 'split'
             else job.lilypond.LayoutControlJob
         )
         # TODO: Try to move this argument creation into
@@ -378,6 +393,8 @@ class Actions(actioncollection.ActionCollection):
         self.engrave_preview = QAction(parent)
         self.engrave_publish = QAction(parent)
         self.engrave_debug = QAction(parent)
+        self.engrave_split = QAction(parent)
+        self.engrave_fragment = QAction(parent)
         self.engrave_custom = QAction(parent)
         self.engrave_abort = QAction(parent)
         self.engrave_autocompile = QAction(parent)
@@ -394,6 +411,8 @@ class Actions(actioncollection.ActionCollection):
         self.engrave_preview.setIcon(icons.get('lilypond-run'))
         self.engrave_publish.setIcon(icons.get('lilypond-run'))
         self.engrave_debug.setIcon(icons.get('lilypond-run'))
+        self.engrave_split.setIcon(icons.get('lilypond-run'))
+        self.engrave_fragment.setIcon(icons.get('lilypond-run'))
         self.engrave_custom.setIcon(icons.get('lilypond-run'))
         self.engrave_abort.setIcon(icons.get('process-stop'))
 
@@ -404,6 +423,12 @@ class Actions(actioncollection.ActionCollection):
         self.engrave_preview.setText(_("&Engrave (preview)"))
         self.engrave_publish.setText(_("Engrave (&publish)"))
         self.engrave_debug.setText(_("Engrave (&layout control)"))
+        self.engrave_split.setText(_("Engrave (&split into bookparts)"))
+        self.engrave_split.setToolTip(_(
+            "Engrave the bookparts in parallel. Bookparts may be engraved "
+            "twice to get the page numbers right, and settings that depend "
+            "on earlier bookparts can differ from a normal engrave."))
+        self.engrave_fragment.setText(_("Engrave &Fragment at Cursor"))
         self.engrave_custom.setText(_("Engrave (&custom)..."))
         self.engrave_abort.setText(_("Abort Engraving &Job"))
         self.engrave_autocompile.setText(_("Automatic E&ngrave"))
@@ -27,30 +27,62 @@ When a document is modified after the last run, LilyPond is run again after
 a certain time, if the document looks complete
 (documentinfo.docinfo(doc).complete()).
 
+The time to wait depends on the typing speed of the user and on how long
+engraving the document took last time. If an earlier auto-compile job is
+still running when the document has changed again, that job is aborted,
+as its result would be outdated anyway. This happens when the new job is
+started, after the delay, not at the moment of the edit itself.
+
 The log is not displayed.
 
 """
 
 
+import collections
 import contextlib
+import time
 
-from PyQt5.QtCore import QSettings, Qt, QTimer
+from PyQt5.QtCore import Qt, QTimer
 
 import app
 import documentinfo
+import metainfo
 import resultfiles
+import settingssnapshot
 import job
 import plugin
+import progress    # defines the 'buildtime' metainfo
 import ly.lex
 
 from . import engraver
 
 
+# the delay (in seconds) to wait after the last edit, at least and at most
+_min_delay = 0.75
+_max_delay = 3.0
+
+# edits further apart than this (in seconds) are not considered typing
+_typing_pause = 2.0
+
+# how many multiples of the average time between keystrokes to wait
+_typing_factor = 3
+
+# fraction of the last engraving time to add to the delay
+_buildtime_factor = 0.05
+
+
+Statistics = collections.namedtuple("Statistics", "started aborted wasted")
+
+
 class AutoCompiler(plugin.MainWindowPlugin):
     def __init__(self, mainwindow):
         self._enabled = False
         self._timer = QTimer(singleShot=True)
         self._timer.timeout.connect(self.slotTimeout)
+        self._edits = collections.deque(maxlen=10)
+        self._started = 0
+        self._aborted = 0
+        self._wasted = 0.0
 
     def setEnabled(self, enabled):
         """Switch the autocompiler on or off."""
@@ -74,26 +106,67 @@ class AutoCompiler(plugin.MainWindowPlugin):
     def slotDocumentChanged(self, new=None, old=None):
         """Called when the mainwindow changes the current document."""
         if old:
-            old.contentsChanged.disconnect(self.startTimer)
+            old.contentsChanged.disconnect(self.slotContentsChanged)
             old.loaded.disconnect(self.startTimer)
             old.saved.disconnect(self.startTimer)
         if new:
-            new.contentsChanged.connect(self.startTimer)
+            new.contentsChanged.connect(self.slotContentsChanged)
             new.loaded.connect(self.startTimer)
             new.saved.connect(self.startTimer)
             if self._enabled:
                 self.startTimer()
 
+    def slotContentsChanged(self):
+        """Called when the current document is edited.
+
+        Records the time of the edit, to measure the typing speed.
+
+        """
+        self._edits.append(time.time())
+        self.startTimer()
+
     def startTimer(self):
         """Called to trigger a soon auto-compile try."""
-        self._timer.start(750)
+        self._timer.start(self.delay())
+
+    def delay(self):
+        """Return the time to wait (in msec) before trying to auto-compile.
+
+        A user typing slowly gets more time before a new job is started, and
+        documents that take long to engrave wait a bit longer, because
+        a job that is aborted halfway wastes more time.
+
+        """
+        edits = self._edits
+        intervals = [b - a for a, b in zip(edits, list(edits)[1:]) if b - a < _typing_pause]
+        typing = sum(intervals) / len(intervals) if intervals else 0.0
+        delay = max(_min_delay, _typing_factor * typing)
+        doc = engraver(self.mainwindow()).document()
+        if doc:
+            delay += _buildtime_factor * metainfo.info(doc).buildtime
+        return int(1000 * min(delay, _max_delay))
+
+    def statistics(self):
+        """Return a Statistics tuple(started, aborted, wasted).
+
+        started is the number of auto-compile jobs started, aborted the number
+        of jobs that were aborted because the document changed, and wasted the
+        time in seconds those aborted jobs had been running.
+
+        A job is counted as aborted (and its running time as wasted) just
+        before runJob() is asked to start the new job, which aborts the old
+        one; so the numbers also include a job that happened to finish at
+        that very moment.
+
+        """
+        return Statistics(self._started, self._aborted, self._wasted)
 
     def slotTimeout(self):
         """Called when the autocompile timer expires."""
         eng = engraver(self.mainwindow())
         doc = eng.document()
         rjob = job.manager.job(doc)
-        if rjob and rjob.is_running(): # and not job.attributes.get(rjob).hidden:
+        if rjob and rjob.is_running() and not job.attributes.get(rjob).hidden:
             # a real job is running, come back when that is done
             rjob.done.connect(self.startTimer)
             return
@@ -108,9 +181,20 @@ class AutoCompiler(plugin.MainWindowPlugin):
                 if may_compile:
                     mgr.slotJobStarted()
         if may_compile:
+            if rjob and rjob.is_running():
+                # the running auto-compile job is outdated, runJob() aborts it
+                self._aborted += 1
+                self._wasted += rjob.elapsed_time()
             j = job.lilypond.PreviewJob(doc)
             job.attributes.get(j).hidden = True
             eng.runJob(j, doc)
+            self._started += 1
+            stats = self.statistics()
+            j.message(_("Automatic engraving: {started} jobs started, "
+                        "{aborted} aborted as outdated, "
+                        "{wasted} of engraving time discarded.").format(
+                            started=stats.started, aborted=stats.aborted,
+                            wasted=j.elapsed2str(stats.wasted)), job.NEUTRAL)
 
 
 class AutoCompileManager(plugin.DocumentPlugin):
@@ -129,9 +213,7 @@ class AutoCompileManager(plugin.DocumentPlugin):
             self._dirty = False
         else:
             # look for existing result files in the default output format
-            s = QSettings()
-            s.beginGroup("lilypond_settings")
-            if s.value("default_output_target", "pdf", str) == "svg":
+            if settingssnapshot.snapshot().default_output_target == "svg":
                 ext = '.svg*'
             else:
                 ext = '.pdf'
@@ -150,7 +232,7 @@ class AutoCompileManager(plugin.DocumentPlugin):
                 h = dinfo.token_hash()
                 if h != self._hash:
                     self._hash = h
-                    if h != hash(tuple()):
+                    if h != hash(tuple()):  # not only comments/whitespace
                         return True
             self._dirty = False
 
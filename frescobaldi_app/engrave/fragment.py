@@ -0,0 +1,202 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2013 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Engraves only the music under the cursor, in a preview dialog.
+
+The fragment is the \\score, toplevel music expression or variable definition
+the cursor is in. The text that is engraved is the document with everything
+else blanked out, except for the \\version, \\include, \\header, \\paper and
+\\layout blocks, toplevel Scheme expressions and the variables the fragment
+needs. As all the text remains at the same position and the fragment refers
+to the document with \\sourcefilename, point-and-click works as usual.
+
+"""
+
+
+import collections
+import os
+
+from PyQt5.QtCore import Qt
+
+import ly.lex.scheme
+import ly.music.items
+
+import app
+import documentinfo
+import job.lilypond
+import job.split
+import plugin
+import scratchdir
+
+
+# toplevel nodes that are kept for every fragment
+_shared_items = (
+    ly.music.items.Header,
+    ly.music.items.Include,
+    ly.music.items.Language,
+    ly.music.items.Layout,
+    ly.music.items.Paper,
+    ly.music.items.Scheme,
+    ly.music.items.Version,
+)
+
+
+def preview(mainwindow):
+    """Engraves the fragment at the cursor of the current view and shows it."""
+    FragmentPreview.instance(mainwindow).preview()
+
+
+def find(nodes, position):
+    """Returns the node to engrave at the position, or None."""
+    for node in nodes:
+        if node.position <= position <= node.end_position():
+            if isinstance(node, (ly.music.items.Book, ly.music.items.BookPart)):
+                return find(node, position)
+            elif not isinstance(node, _shared_items):
+                return node
+            return
+
+
+def references(node):
+    """Yields the names of the variables (maybe) referred to in the node."""
+    for n in node.iter_depth():
+        if isinstance(n, ly.music.items.UserCommand):
+            yield n.name()
+        elif (isinstance(n, ly.music.items.SchemeItem)
+              and isinstance(n.token, ly.lex.scheme.Word)):
+            yield n.token
+
+
+def invocation(node):
+    """Returns the text to engrave the value of an Assignment node, or None."""
+    value = node.value()
+    if isinstance(value, (ly.music.items.Markup, ly.music.items.MarkupList)):
+        return "\n\\markup \\{0}\n".format(node.name())
+    elif isinstance(value, ly.music.items.Music):
+        return "\n\\score {{ \\{0} }}\n".format(node.name())
+
+
+def fragment(document, position):
+    """Returns the LilyPond text to engrave the fragment at the position.
+
+    Returns None if there is no music at the position.
+
+    """
+    music = documentinfo.music(document)
+    node = find(music, position)
+    if node is None:
+        return
+    suffix = ''
+    if isinstance(node, ly.music.items.Assignment):
+        suffix = invocation(node)
+        if not suffix:
+            return
+
+    keep = [node]
+    assignments = collections.defaultdict(list)
+    for n in music:
+        if isinstance(n, ly.music.items.Assignment):
+            assignments[n.name()].append(n)
+        elif isinstance(n, _shared_items):
+            keep.append(n)
+
+    # add the assignments that are needed, recursively
+    todo = keep[:]
+    names = set()
+    while todo:
+        for name in references(todo.pop()):
+            if name not in names:
+                names.add(name)
+                for n in assignments.get(name, ()):
+                    if n is not node:
+                        keep.append(n)
+                        todo.append(n)
+
+    text = document.toPlainText()
+    result = [job.split.sourcefilename(filename(document))]
+    pos = 0
+    for start, end in sorted((n.position, n.end_position()) for n in keep):
+        result.append(job.split.blank(text[pos:start]))
+        result.append(text[start:end])
+        pos = end
+    result.append(job.split.blank(text[pos:]))
+    result.append(suffix)
+    return ''.join(result)
+
+
+def filename(document):
+    """Returns the filename point-and-click links in the fragment should use.
+
+    For a document without a filename this is its scratch filename, which
+    the point-and-click code maps back to the document.
+
+    """
+    name = document.url().toLocalFile()
+    if not name:
+        s = scratchdir.scratchdir(document)
+        s.create()
+        name = s.path()
+    return name
+
+
+class FragmentPreview(plugin.MainWindowPlugin):
+    """Shows the engraved fragment at the cursor in a MusicPreviewDialog."""
+    def __init__(self, mainwindow):
+        self._dialog = None
+
+    def preview(self):
+        """Engraves the fragment at the cursor of the current view."""
+        view = self.mainwindow().currentView()
+        doc = view.document()
+        text = fragment(doc, view.textCursor().position())
+        if not text:
+            self.mainwindow().statusBar().showMessage(
+                _("No music found at the cursor position."), 5000)
+            return
+        j = job.lilypond.VolatileTextJob(text, _("Fragment of {name}").format(
+            name=doc.documentName()))
+        j.set_d_option('point-and-click', True)
+        paths = {os.path.dirname(name)
+            for name in documentinfo.info(doc).includefiles()}
+        if not doc.url().isEmpty():
+            paths.add(os.path.dirname(doc.url().toLocalFile()))
+        for path in sorted(paths):
+            j.add_include_path(path)
+        self.dialog().previewJob(j)
+
+    def dialog(self):
+        """Returns the (non-modal) preview dialog, creating it if needed."""
+        if not self._dialog:
+            import musicpreview
+            dlg = self._dialog = musicpreview.MusicPreviewDialog(self.mainwindow())
+            dlg.setWindowModality(Qt.NonModal)
+            dlg.setEnablePrintButton(True)
+            dlg.cursorClicked.connect(self.slotCursorClicked)
+        self._dialog.show()
+        self._dialog.raise_()
+        return self._dialog
+
+    def slotCursorClicked(self, cursor):
+        """Called when a point-and-click link in the preview is clicked."""
+        import browseriface
+        mainwindow = self.mainwindow()
+        browseriface.get(mainwindow).setTextCursor(cursor, findOpenView=True)
+        mainwindow.activateWindow()
+        mainwindow.currentView().setFocus()
@@ -29,7 +29,7 @@ if needed.
 
 
 
-from PyQt5.QtCore import QSettings, QTimer
+from PyQt5.QtCore import QSettings, QThread, QTimer
 
 
 def enabled():
@@ -63,21 +63,64 @@ def changedDocuments():
 
     """
     import documentwatcher
+    for w, filename, diskhash in _candidates():
+        try:
+            if documentwatcher.filehash(filename) == diskhash:
+                w.changed = False
+        except (OSError, IOError):
+            pass
+    return _changed()
+
+
+def _candidates():
+    """Return a list of (DocumentWatcher, filename, diskhash) tuples.
+
+    These are the unmodified documents that are marked as changed on disk,
+    with the hash of their contents as last loaded or saved.
+
+    """
+    import documentwatcher
+    result = []
     for w in documentwatcher.DocumentWatcher.instances():
         d = w.document()
         if w.changed and not d.isModified():
             filename = d.url().toLocalFile()
             if filename:
-                try:
-                    with open(filename, 'rb') as diskfile:
-                        if diskfile.read() == d.encodedText():
-                            w.changed = False
-                except (OSError, IOError):
-                    pass
+                if w.diskhash is None:
+                    w.diskhash = documentwatcher.contenthash(d.encodedText())
+                result.append((w, filename, w.diskhash))
+    return result
+
+
+def _changed():
+    """Return the list of Documents that are marked as changed on disk."""
+    import documentwatcher
     return [w.document() for w in documentwatcher.DocumentWatcher.instances()
               if w.changed]
 
 
+class Checker(QThread):
+    """Computes the hashes of files in a background thread.
+
+    Set the filenames attribute to a list of filenames before starting.
+    When finished, the hashes attribute contains the (size, digest) tuple of
+    every file, or None if the file could not be read.
+
+    """
+    def __init__(self, filenames):
+        super(Checker, self).__init__()
+        self.filenames = filenames
+        self.hashes = []
+
+    def run(self):
+        import documentwatcher
+        for filename in self.filenames:
+            try:
+                self.hashes.append(documentwatcher.filehash(filename))
+            except (OSError, IOError):
+                self.hashes.append(None)
+
+
 def display(documents):
     """Diplay the window showing the specified Documents."""
     from . import widget
@@ -92,10 +135,46 @@ def displayChangedDocuments():
 
 
 def checkChangedDocuments():
-    """Display the window if there are changed files."""
-    docs = changedDocuments()
-    if docs:
-        display(docs)
+    """Display the window if there are changed files.
+
+    The files on disk are compared in a background thread.
+
+    """
+    global _checker, _recheck
+    if _checker:
+        # check again when the running check has finished
+        _recheck = True
+        return
+    candidates = _candidates()
+    if not candidates:
+        docs = _changed()
+        if docs:
+            display(docs)
+        return
+    _checker = Checker([filename for w, filename, diskhash in candidates])
+
+    def finished():
+        global _checker, _recheck
+        for (w, filename, diskhash), h in zip(candidates, _checker.hashes):
+            d = w.document()
+            if h == diskhash and w.diskhash == diskhash and d and not d.isModified():
+                w.changed = False
+        _checker = None
+        if _recheck:
+            _recheck = False
+            _timer.start(500)
+            return
+        docs = _changed()
+        if docs:
+            display(docs)
+
+    _checker.finished.connect(finished)
+    _checker.start()
+
+
+# the running Checker thread, if any
+_checker = None
+_recheck = False
 
 
 # timer to wait before really looking at the changed files, a file could
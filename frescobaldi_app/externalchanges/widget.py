@@ -29,6 +29,7 @@ from PyQt5.QtWidgets import (QCheckBox, QGridLayout, QMessageBox, QPushButton,
                              QTextBrowser, QTreeWidget, QTreeWidgetItem)
 
 import app
+import contentstore
 import qutil
 import util
 import icons
@@ -274,8 +275,7 @@ class ChangedDocumentsListDialog(widgets.dialog.Dialog):
 
         filename = d.url().toLocalFile()
         try:
-            with open(filename, 'rb') as f:
-                disktext = util.decode(f.read())
+            disktext = contentstore.text(filename)
         except (IOError, OSError):
             return
 
@@ -26,7 +26,7 @@ import os
 
 from PyQt5.QtCore import Qt, QUrl, QSize
 from PyQt5.QtGui import QKeySequence
-from PyQt5.QtWidgets import QAction, QFileDialog, QMessageBox
+from PyQt5.QtWidgets import QAction, QFileDialog, QMessageBox, QProgressDialog
 
 import app
 import icons
@@ -35,7 +35,6 @@ import actioncollectionmanager
 import documentinfo
 import plugin
 import tokeniter
-import appinfo
 import codecs
 import job
 import qutil
@@ -48,7 +47,9 @@ class FileExport(plugin.MainWindowPlugin):
         ac = self.actionCollection = Actions()
         actioncollectionmanager.manager(mainwindow).addActionCollection(ac)
         ac.export_musicxml.triggered.connect(self.exportMusicXML)
+        ac.export_musicxml_all.triggered.connect(self.exportAllMusicXML)
         ac.export_audio.triggered.connect(self.exportAudio)
+        self._exporters = []
 
     def exportMusicXML(self):
         """ Convert the current document to MusicXML """
@@ -60,19 +61,119 @@ class FileExport(plugin.MainWindowPlugin):
         filename = QFileDialog.getSaveFileName(self.mainwindow(), caption, filename, filetypes)[0]
         if not filename:
             return False # cancelled
-        import ly.musicxml
-        writer = ly.musicxml.writer()
-        writer.parse_text(doc.toPlainText(), orgname)
-        xml = writer.musicxml()
-        # put the Frescobaldi version in the xml file
-        software = xml.root.find('.//encoding/software')
-        software.text = "{0} {1}".format(appinfo.appname, appinfo.version)
-        try:
-            xml.write(filename)
-        except (IOError, OSError) as err:
+        from . import musicxml
+        e = musicxml.Exporter(doc.toPlainText(), filename, orgname)
+        dlg = QProgressDialog(self.mainwindow())
+        dlg.setWindowTitle(caption)
+        dlg.setLabelText(_("Exporting {filename}...").format(
+            filename=os.path.basename(filename)))
+        dlg.setRange(0, 100)
+        dlg.canceled.connect(e.cancel)
+        e.progress.connect(dlg.setValue)
+        e.finished.connect(lambda: self.slotMusicXMLExported(e, dlg))
+        self._exporters.append(e)
+        e.start()
+
+    def slotMusicXMLExported(self, exporter, dialog):
+        """Called when a background MusicXML export has finished."""
+        self._exporters.remove(exporter)
+        dialog.deleteLater()
+        if exporter.exc_info:
+            raise exporter.exc_info[1]
+        elif exporter.error:
             QMessageBox.warning(self.mainwindow(), app.caption(_("Error")),
                 _("Can't write to destination:\n\n{url}\n\n{error}").format(
-                    url=filename, error=err.strerror))
+                    url=exporter.filename, error=exporter.error.strerror))
+
+    def exportAllMusicXML(self):
+        """Convert all documents to MusicXML files in a directory, in parallel."""
+        docs = self.mainwindow().documents()
+        caption = app.caption(_("dialog title", "Export All Documents as MusicXML"))
+        directory = os.path.dirname(self.mainwindow().currentDocument().url().toLocalFile())
+        directory = QFileDialog.getExistingDirectory(self.mainwindow(), caption, directory)
+        if not directory:
+            return False # cancelled
+        from . import musicxml
+        exports = []
+        names = set()
+        for doc in docs:
+            orgname = doc.url().toLocalFile() or None
+            base = name = os.path.splitext(doc.documentName())[0]
+            count = 1
+            while name in names:
+                count += 1
+                name = "{0}-{1}".format(base, count)
+            names.add(name)
+            name += '.xml'
+            exports.append((doc.toPlainText(), os.path.join(directory, name), orgname))
+        dlg = QProgressDialog(self.mainwindow())
+        dlg.setWindowTitle(caption)
+        dlg.setLabelText(_("Exporting {count} documents...").format(count=len(docs)))
+        dlg.setRange(0, len(docs))
+        if musicxml.can_run_script():
+            self.exportAllMusicXMLJobs(exports, dlg)
+        else:
+            self.exportAllMusicXMLThreads(exports, dlg)
+
+    def exportAllMusicXMLJobs(self, exports, dialog):
+        """Export (text, filename, orgname) tuples in parallel processes."""
+        from . import musicxml
+        import job.queue
+        queue = job.queue.JobQueue(queue_mode=job.queue.QueueMode.SINGLE,
+                                   num_runners=os.cpu_count() or 1)
+        failed = []
+        for text, filename, orgname in exports:
+            j = musicxml.exportjob(text, filename, orgname)
+            j.done.connect(lambda success, j=j: success or failed.append(j.title()))
+            queue.add_job(j)
+        dialog.canceled.connect(queue.abort)
+        queue.job_done.connect(lambda j: dialog.setValue(queue.completed()))
+        def finished():
+            self._exporters.remove(queue)
+            dialog.deleteLater()
+            if queue.state() != job.queue.QueueStatus.ABORTED:
+                self.showMusicXMLFailures(failed)
+        queue.finished.connect(finished)
+        self._exporters.append(queue)
+        queue.start()
+
+    def exportAllMusicXMLThreads(self, exports, dialog):
+        """Export (text, filename, orgname) tuples one by one in a thread.
+
+        Used when the musicxml module can't be run as a script, e.g. in a
+        frozen application.
+
+        """
+        from . import musicxml
+        exporters = [musicxml.Exporter(*export) for export in exports]
+        failed = []
+        def cancel():
+            for e in exporters:
+                e.cancel()
+        def start(index):
+            if index:
+                e = exporters[index - 1]
+                if e.error or e.exc_info:
+                    failed.append(os.path.basename(e.filename))
+            if index < len(exporters) and not dialog.wasCanceled():
+                dialog.setValue(index)
+                exporters[index].finished.connect(lambda: start(index + 1))
+                exporters[index].start()
+                return
+            self._exporters.remove(exporters)
+            dialog.deleteLater()
+            if not dialog.wasCanceled():
+                self.showMusicXMLFailures(failed)
+        dialog.canceled.connect(cancel)
+        self._exporters.append(exporters)
+        start(0)
+
+    def showMusicXMLFailures(self, names):
+        """Show the names of the files that could not be exported, if any."""
+        if names:
+            QMessageBox.warning(self.mainwindow(), app.caption(_("Error")),
+                _("The following documents could not be exported:\n\n{files}").format(
+                    files="\n".join(names)))
 
     def exportAudio(self):
         """ Convert the current document to Audio """
@@ -127,14 +228,20 @@ class Actions(actioncollection.ActionCollection):
     name = "file_export"
     def createActions(self, parent):
         self.export_musicxml = QAction(parent)
+        self.export_musicxml_all = QAction(parent)
         self.export_audio = QAction(parent)
 
         self.export_musicxml.setIcon(icons.get("document-export"))
+        self.export_musicxml_all.setIcon(icons.get("document-export"))
         self.export_audio.setIcon(icons.get("document-export"))
 
     def translateUI(self):
         self.export_musicxml.setText(_("Export Music&XML..."))
         self.export_musicxml.setToolTip(_("Export current document as MusicXML."))
 
+        self.export_musicxml_all.setText(_("Export All Documents as MusicXML..."))
+        self.export_musicxml_all.setToolTip(_(
+            "Export all open documents as MusicXML files in a directory."))
+
         self.export_audio.setText(_("Export Audio..."))
         self.export_audio.setToolTip(_("Export to different audio formats."))
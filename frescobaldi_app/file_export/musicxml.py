@@ -0,0 +1,218 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Export LilyPond text to MusicXML, in a background thread or in a separate
+process.
+
+The export works on a snapshot of the text, reports its progress and can be
+cancelled. The XML is written to the file part by part and measure by measure
+instead of serializing the whole tree at once.
+
+This module can also be run as a script: it then reads the LilyPond text
+from standard input and writes the MusicXML to the filename given as the
+first argument, printing "progress: <percent>" lines to standard error.
+That is used to export many documents in parallel using the job queue.
+"""
+
+
+import os
+import sys
+import xml.etree.ElementTree as etree
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+
+class Cancelled(Exception):
+    """Raised by export() when the export was cancelled."""
+    pass
+
+
+def export(text, filename, orgname=None, progress=None, cancelled=None):
+    """Convert the LilyPond text to MusicXML and write it to filename.
+
+    orgname is the filename of the LilyPond document, used to find included
+    files. progress, if given, is called with a percentage while exporting;
+    cancelled, if given, is called regularly and when it returns True, the
+    export is stopped, the unfinished file removed and Cancelled raised.
+
+    """
+    def check(percent):
+        if cancelled and cancelled():
+            raise Cancelled()
+        if progress:
+            progress(percent)
+
+    import ly.musicxml
+    import appinfo
+    check(0)
+    writer = ly.musicxml.writer()
+    writer.parse_text(text, orgname)
+    check(40)
+    xml = writer.musicxml(prettyprint=False)
+    check(70)
+    xml.indent("  ")
+    # put the Frescobaldi version in the xml file
+    software = xml.root.find('.//encoding/software')
+    software.text = "{0} {1}".format(appinfo.appname, appinfo.version)
+    check(75)
+    with open(filename, 'wb') as f:
+        try:
+            write(xml.root, f, lambda p: check(75 + p // 4))
+        except:
+            f.close()
+            os.remove(filename)
+            raise
+    check(100)
+
+
+def write(root, f, progress=None, encoding='UTF-8'):
+    """Write the score-partwise root element to the binary file object f.
+
+    The output is the same as that of ly.musicxml's MusicXML.write(), but
+    every measure is serialized and written separately and removed from the
+    tree afterwards, so memory is freed while writing.
+
+    progress is called with a percentage after every measure.
+
+    """
+    from ly.musicxml.create_musicxml import xml_decl_txt, doctype_txt
+    def out(text):
+        f.write(text.encode(encoding, 'xmlcharrefreplace'))
+
+    def tostring(elem):
+        return etree.tostring(elem, encoding="unicode", method="xml")
+
+    out(xml_decl_txt.format(encoding=encoding) + "\n")
+    out(doctype_txt + "\n")
+    parts = root.findall('part')
+    total = sum(len(part) for part in parts) or 1
+    done = 0
+    out(_starttag(root) + (root.text or ''))
+    for elem in list(root):
+        if elem.tag == 'part' and len(elem):
+            out(_starttag(elem) + (elem.text or ''))
+            for measure in list(elem):
+                out(tostring(measure))
+                elem.remove(measure)
+                done += 1
+                if progress:
+                    progress(done * 100 // total)
+            out('</part>' + (elem.tail or ''))
+        else:
+            out(tostring(elem))
+        root.remove(elem)
+    out('</{0}>'.format(root.tag) + (root.tail or ''))
+
+
+def _starttag(elem):
+    """Return the serialized start tag of the element, with its attributes."""
+    copy = etree.Element(elem.tag, elem.attrib)
+    text = etree.tostring(copy, encoding="unicode", short_empty_elements=False)
+    return text[:text.rindex('</')]
+
+
+class Exporter(QThread):
+    """Runs export() in a background thread.
+
+    When the thread has finished, the cancelled attribute is True if cancel()
+    was called, and error contains the OSError if the file could not be
+    written. Other exceptions are kept in exc_info, so they can be raised
+    again in the main thread.
+
+    """
+    progress = pyqtSignal(int)
+
+    def __init__(self, text, filename, orgname=None):
+        super(Exporter, self).__init__()
+        self.text = text
+        self.filename = filename
+        self.orgname = orgname
+        self.cancelled = False
+        self.error = None
+        self.exc_info = None
+        self._cancel = False
+
+    def run(self):
+        try:
+            export(self.text, self.filename, self.orgname,
+                   self.progress.emit, lambda: self._cancel)
+        except Cancelled:
+            self.cancelled = True
+        except (IOError, OSError) as err:
+            self.error = err
+        except Exception:
+            self.exc_info = sys.exc_info()
+
+    def cancel(self):
+        """Stop the export as soon as possible."""
+        self._cancel = True
+
+
+def can_run_script():
+    """Return True if this module can be run as a script, see exportjob().
+
+    That is not possible in a frozen application (the Windows build or the
+    Mac OS X app bundle), where sys.executable is Frescobaldi itself and this
+    module lives inside an archive.
+
+    """
+    return not getattr(sys, 'frozen', False)
+
+
+def exportjob(text, filename, orgname=None):
+    """Return a job.Job that exports the text to filename in a separate process.
+
+    The job can be added to a job queue, to run many exports in parallel.
+    Only use this if can_run_script() returns True.
+
+    """
+    import job
+    import ly
+    j = job.Job([sys.executable, __file__, filename] + ([orgname] if orgname else []),
+                encoding='utf-8')
+    j.set_title(os.path.basename(filename))
+    # python-ly may have been found using the --python-ly option
+    path = [os.path.dirname(os.path.dirname(os.path.abspath(ly.__file__)))]
+    if os.environ.get('PYTHONPATH'):
+        path.append(os.environ['PYTHONPATH'])
+    j.environment['PYTHONPATH'] = os.pathsep.join(path)
+    data = text.encode('utf-8')
+    def write_input():
+        j._process.write(data)
+        j._process.closeWriteChannel()
+    j.started.connect(write_input)
+    return j
+
+
+def main():
+    """Export standard input to the file named in the first argument."""
+    text = sys.stdin.buffer.read().decode('utf-8')
+    filename = sys.argv[1]
+    orgname = sys.argv[2] if len(sys.argv) > 2 else None
+    def progress(percent):
+        sys.stderr.write("progress: {0}\n".format(percent))
+        sys.stderr.flush()
+    export(text, filename, orgname, progress)
+
+
+if __name__ == '__main__':
+    # import our modules from frescobaldi_app, not from file_export
+    sys.path[0] = os.path.dirname(sys.path[0])
+    main()
@@ -26,16 +26,15 @@ import itertools
 import re
 import os
 import atexit
+import weakref
 
-import ly.document
+import contentstore
 import lydocinfo
 import ly.lex
-import filecache
-import util
 import variables
 
 
-_document_cache = filecache.FileCache()
+_document_cache = weakref.WeakKeyDictionary()  # contentstore.Entry: _CachedDocument
 _suffix_chars_re = re.compile(r'[^-\w]', re.UNICODE)
 
 
@@ -43,6 +42,7 @@ _suffix_chars_re = re.compile(r'[^-\w]', re.UNICODE)
 ### are made (and every node references the document).
 ### (The segfault is preceded by a "corrupted double-linked list" message.)
 atexit.register(_document_cache.clear)
+atexit.register(contentstore.clear)
 
 
 class _CachedDocument(object):
@@ -55,17 +55,21 @@ class _CachedDocument(object):
 
 
 def _cached(filename):
-    """Return a _CachedDocument instance for the filename, else creates one."""
-    filename = os.path.realpath(filename)
+    """Return a _CachedDocument instance for the filename, else creates one.
+
+    The document is the one shared by the contentstore, which checks whether
+    the file has changed. The information derived from it is kept as long as
+    the store keeps the file.
+
+    """
+    e = contentstore.entry(filename)
     try:
-        c = _document_cache[filename]
+        c = _document_cache[e]
     except KeyError:
-        with open(filename, 'rb') as f:
-            text = util.decode(f.read())
-        c = _document_cache[filename] = _CachedDocument()
-        c.variables = v = variables.variables(text)
-        c.document = ly.document.Document(text, v.get("mode"))
-        c.filename = c.document.filename = filename
+        c = _document_cache[e] = _CachedDocument()
+        c.variables = e.variables()
+        c.document = e.document()
+        c.filename = e.filename
     return c
 
 
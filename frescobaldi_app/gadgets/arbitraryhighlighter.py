@@ -20,8 +20,16 @@
 """
 Manages highlighting of arbitrary sections in a Q(Plain)TextEdit
 using QTextEdit.ExtraSelections.
+
+The cursors of every highlighting are kept sorted by position. Only the
+cursors in the visible range of the text edit are turned into
+ExtraSelections, so documents with tens of thousands of highlighted ranges
+(e.g. search results) stay responsive. The extra selections are updated
+when the text edit scrolls or is resized, and shortly after the text is
+edited (which can also bring other cursors into view).
 """
 
+import itertools
 import weakref
 import operator
 
@@ -30,6 +38,46 @@ from PyQt5.QtGui import QTextCharFormat, QTextFormat
 from PyQt5.QtWidgets import QTextEdit
 
 
+class Ranges(object):
+    """A list of QTextCursors, sorted by the end of their selection.
+
+    QTextCursors keep their relative order when the document is edited,
+    so the list does not need to be sorted again. If no cursor selection
+    contains another one, the starts of the selections are ordered as well
+    (the list is "monotonic"), and searching the cursors in a range can
+    stop at the first cursor beyond the range.
+
+    """
+    def __init__(self, cursors):
+        cursors = sorted(cursors,
+            key=lambda c: (c.selectionEnd(), c.selectionStart()))
+        starts = [c.selectionStart() for c in cursors]
+        self.cursors = cursors
+        self.monotonic = all(map(operator.le, starts, starts[1:]))
+
+    def __len__(self):
+        return len(self.cursors)
+
+    def index(self, position):
+        """Return the index of the first cursor ending at or after position."""
+        cursors = self.cursors
+        lo, hi = 0, len(cursors)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if cursors[mid].selectionEnd() < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, start, end):
+        """Yield the cursors that touch the range start - end."""
+        cursors = itertools.islice(self.cursors, self.index(start), None)
+        if self.monotonic:
+            return itertools.takewhile(lambda c: c.selectionStart() <= end, cursors)
+        return (c for c in cursors if c.selectionStart() <= end)
+
+
 class ArbitraryHighlighter(QObject):
     """Manages highlighting of arbitrary sections in a Q(Plain)TextEdit.
 
@@ -41,6 +89,13 @@ class ArbitraryHighlighter(QObject):
         QObject.__init__(self, edit)
         self._selections = {}
         self._formats = {} # store the QTextFormats
+        scrollbar = edit.verticalScrollBar()
+        scrollbar.valueChanged.connect(self.update)
+        scrollbar.rangeChanged.connect(self.update)
+        # don't compute the selections again for every typed character
+        self._updateTimer = QTimer(self, singleShot=True, interval=100,
+                                   timeout=self.update)
+        edit.document().contentsChange.connect(self._contentsChange)
 
     def highlight(self, format, cursors, priority=0, msec=0):
         """Highlights the selection of an arbitrary list of QTextCursors.
@@ -59,12 +114,7 @@ class ArbitraryHighlighter(QObject):
         else:
             fmt = self.textFormat(format)
             key = format
-        selections = []
-        for cursor in cursors:
-            es = QTextEdit.ExtraSelection()
-            es.cursor = cursor
-            es.format = fmt
-            selections.append(es)
+        ranges = Ranges(cursors)
         if msec:
             def clear(selfref=weakref.ref(self)):
                 self = selfref()
@@ -72,9 +122,9 @@ class ArbitraryHighlighter(QObject):
                     self.clear(format)
             timer = QTimer(timeout=clear, singleShot=True)
             timer.start(msec)
-            self._selections[key] = (priority, selections, timer)
+            self._selections[key] = [priority, fmt, ranges, timer]
         else:
-            self._selections[key] = (priority, selections)
+            self._selections[key] = [priority, fmt, ranges]
         self.update()
 
     def clear(self, format):
@@ -98,21 +148,47 @@ class ArbitraryHighlighter(QObject):
         """Implement this to return a QTextCharFormat for the given name."""
         raise NotImplementedError
 
+    def visibleRange(self):
+        """Return the (start, end) positions of the blocks shown in the text edit."""
+        textedit = self.parent()
+        rect = textedit.viewport().rect()
+        start = textedit.cursorForPosition(rect.topLeft()).block().position()
+        block = textedit.cursorForPosition(rect.bottomRight()).block()
+        return start, block.position() + block.length()
+
+    def extraSelections(self, start, end):
+        """Return the list of ExtraSelections for the range start - end.
+
+        The highlightings are drawn in the order of their priority.
+
+        """
+        ess = []
+        for selection in sorted(self._selections.values(), key=operator.itemgetter(0)):
+            fmt, ranges = selection[1:3]
+            for cursor in ranges.range(start, end):
+                es = QTextEdit.ExtraSelection()
+                es.cursor = cursor
+                es.format = fmt
+                ess.append(es)
+        return ess
+
+    def _contentsChange(self, position, removed, added):
+        """(Internal) Called when the document is edited, updates a bit later."""
+        if self._selections:
+            self._updateTimer.start()
+
     def update(self):
-        """(Internal) Called whenever the arbitrary highlighting changes."""
+        """(Internal) Called whenever the arbitrary highlighting or the visible range changes."""
+        self._updateTimer.stop()
         textedit = self.parent()
         if textedit:
-            selections = sorted(self._selections.values(), key=operator.itemgetter(0))
-            ess = sum(map(operator.itemgetter(1), selections), [])
-            textedit.setExtraSelections(ess)
+            textedit.setExtraSelections(self.extraSelections(*self.visibleRange()))
 
     def reload(self):
         """Reloads the named formats in the highlighting (e.g. in case of settings change)."""
         for key in self._selections:
             if isinstance(key, str):
-                fmt = self.textFormat(key)
-                for es in self._selections[key][1]:
-                    es.format = fmt
+                self._selections[key][1] = self.textFormat(key)
         self.update()
 
 
@@ -46,6 +46,20 @@ def html_document(document, scheme='editor', inline=False, number_lines=False, f
     c = lydocument.Cursor(lydocument.Document(document))
     return html(c, scheme, inline, number_lines, full_html, wrap_tag, wrap_attrib, wrap_attrib_name)
 
+def write_document(f, document, scheme='editor', inline=False, number_lines=False,
+        full_html=True, wrap_tag="pre", wrap_attrib="id", wrap_attrib_name="document",
+        encoding='utf-8'):
+    """Write a (by default) css-styled HTML document for the full document to f.
+
+    f is a file object opened in binary mode. The HTML is written in chunks
+    while it is created, so it is never completely held in memory.
+
+    """
+    c = lydocument.Cursor(lydocument.Document(document))
+    for chunk in html_chunks(c, scheme, inline, number_lines, full_html,
+                             wrap_tag, wrap_attrib, wrap_attrib_name):
+        f.write(chunk.encode(encoding))
+
 def html(cursor, scheme='editor', inline=False, number_lines=False, full_html=True,
         wrap_tag="pre", wrap_attrib="id", wrap_attrib_name="document"):
     """Return a HTML document with the syntax-highlighted region.
@@ -58,6 +72,17 @@ def html(cursor, scheme='editor', inline=False, number_lines=False, full_html=Tr
 
     Set number_lines to True to add line numbers.
 
+    """
+    return ''.join(html_chunks(cursor, scheme, inline, number_lines, full_html,
+                               wrap_tag, wrap_attrib, wrap_attrib_name))
+
+def html_chunks(cursor, scheme='editor', inline=False, number_lines=False, full_html=True,
+        wrap_tag="pre", wrap_attrib="id", wrap_attrib_name="document", chunk_size=65536):
+    """Yield the HTML returned by html() in chunks of about chunk_size characters.
+
+    The HTML is produced straight from the tokens of the selected blocks,
+    see token_runs().
+
     """
     data = textformats.formatData(scheme)       # the current highlighting scheme
     w = ly.colorize.HtmlWriter()
@@ -70,4 +95,100 @@ def html(cursor, scheme='editor', inline=False, number_lines=False, full_html=Tr
     w.fgcolor = data.baseColors['text'].name()
     w.bgcolor = data.baseColors['background'].name()
     w.css_scheme = data.css_scheme()
-    return w.html(cursor)
+
+    # this follows ly.colorize.HtmlWriter.html(), but the body is streamed
+    doc_style = {}
+    if w.fgcolor:
+        doc_style['color'] = w.fgcolor
+    if w.bgcolor:
+        doc_style['background'] = w.bgcolor
+    num_style = {}
+    if w.linenumbers_fgcolor:
+        num_style['color'] = w.linenumbers_fgcolor
+    if w.linenumbers_bgcolor:
+        num_style['background'] = w.linenumbers_bgcolor
+    num_attrs = {w.wrapper_attribute: w.linenumbers_id}
+    doc_attrs = {w.wrapper_attribute: w.document_id}
+
+    css = []
+    if w.inline_style:
+        formatter = ly.colorize.css_style_attribute_formatter(w.css_scheme)
+        num_attrs.update(ly.colorize.css_attr(num_style))
+        doc_attrs.update(ly.colorize.css_attr(doc_style))
+    else:
+        formatter = ly.colorize.format_css_span_class
+        wrap_type = '#' if w.wrapper_attribute == 'id' else '.'
+        css.append(ly.colorize.css_group(wrap_type + w.document_id, doc_style))
+        if w.number_lines:
+            css.append(ly.colorize.css_group(wrap_type + w.linenumbers_id, num_style))
+        css.append(ly.colorize.format_stylesheet(w.css_scheme))
+
+    # the text around the body
+    marker = '\0'
+    if w.number_lines:
+        wrapper = ly.colorize.add_line_numbers(cursor, marker, num_attrs, doc_attrs)
+    else:
+        wrapper = '<{0}{1}>{2}</{0}>'.format(w.wrapper_tag,
+            ly.colorize.html_format_attrs(doc_attrs), marker)
+    if w.full_html:
+        wrapper = ly.colorize.format_html_document(wrapper, w.title,
+            '\n'.join(css), w.stylesheet_ref, w.encoding)
+    head, tail = wrapper.split(marker)
+
+    yield head
+    mapper = w.css_mapper or ly.colorize.css_mapper()
+    escape = ly.colorize.html_escape
+    result = []
+    size = 0
+    for t, style in ly.colorize.melt_mapped_tokens(token_runs(cursor, mapper)):
+        arg = formatter(style) if style else None
+        if arg:
+            t = '<span {0}>{1}</span>'.format(arg, escape(t))
+        else:
+            t = escape(t)
+        result.append(t)
+        size += len(t)
+        if size >= chunk_size:
+            yield ''.join(result)
+            result = []
+            size = 0
+    result.append(tail)
+    yield ''.join(result)
+
+def token_runs(cursor, mapper):
+    """Yield (text, style) tuples for the text selected by the ly.document.Cursor.
+
+    The style is what mapper[token] returns, or None for text that is not a
+    token. Only the selected blocks are visited; the tokens are taken from
+    the document, which, for a Frescobaldi document, are the tokens cached
+    by the highlighter.
+
+    """
+    d = cursor.document
+    start, end = cursor.start, cursor.end
+    block = d.block(start)
+    first = True
+    while d.isvalid(block):
+        pos = d.position(block)
+        if end is not None and pos > end:
+            break
+        if not first:
+            yield '\n', None
+        first = False
+        text = d.text(block)
+        s = max(start - pos, 0)
+        e = len(text) if end is None else min(end - pos, len(text))
+        col = s
+        for t in d.tokens(block):
+            if t.end <= s:
+                continue
+            elif t.pos >= e:
+                break
+            tstart, tend = max(t.pos, s), min(t.end, e)
+            if tstart > col:
+                yield text[col:tstart], None
+            yield text[tstart:tend], mapper[t]
+            col = tend
+        if col < e:
+            yield text[col:e], None
+        block = d.next_block(block)
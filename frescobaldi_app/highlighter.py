@@ -23,6 +23,7 @@ about a document's contents.
 """
 
 
+import collections
 
 from PyQt5.QtGui import (
     QColor, QSyntaxHighlighter, QTextBlockUserData, QTextCharFormat,
@@ -98,7 +99,7 @@ class Highlighter(plugin.Plugin, QSyntaxHighlighter):
     """
     def __init__(self, doc):
         QSyntaxHighlighter.__init__(self, doc)
-        self._fridge = ly.lex.Fridge()
+        self._fridge = Fridge()
         app.settingsChanged.connect(self.rehighlight)
         self._initialState = None
         self._highlighting = True
@@ -193,6 +194,63 @@ class Highlighter(plugin.Plugin, QSyntaxHighlighter):
         return self._fridge.thaw(self._initialState)
 
 
+class Fridge(ly.lex.Fridge):
+    """Stores frozen lexer states under an integer number.
+
+    Unlike ly.lex.Fridge, the number of a frozen state is looked up in a
+    dict, so equal states are stored only once without searching the list
+    of all states.
+
+    Thawed states are kept in an LRU cache. Parsers that never change are
+    shared between the State objects returned by thaw(), only the others are
+    created again, so thawing a state mostly costs copying a list.
+
+    The lexer changes a parser in two ways: State.endArgument() decreases a
+    positive argcount, and parsers that count their arguments themselves
+    (like ParsePitchCommand) decrease it in update_state(), even below 0.
+    The latter have a nonzero argcount class attribute. So only parsers with
+    a zero argcount whose class does not count arguments are shared.
+
+    """
+    cache_size = 1024
+
+    def __init__(self, stateClass=ly.lex.State):
+        super(Fridge, self).__init__(stateClass)
+        self._numbers = {}
+        self._thawed = collections.OrderedDict()
+
+    def freeze(self, state):
+        """Stores a state and return an identifying integer."""
+        frozen = state.freeze()
+        try:
+            return self._numbers[frozen]
+        except KeyError:
+            num = self._numbers[frozen] = len(self._states)
+            self._states.append(frozen)
+            return num
+
+    def thaw(self, num):
+        """Returns a new State object for the state stored under the number."""
+        try:
+            parsers, stateful = self._thawed[num]
+            self._thawed.move_to_end(num)
+        except KeyError:
+            if not 0 <= num < len(self._states):
+                return
+            frozen = self._states[num]
+            parsers = [cls.thaw(attrs) for cls, attrs in frozen]
+            stateful = [(i, cls, attrs) for i, (cls, attrs) in enumerate(frozen)
+                        if any(attrs) or getattr(cls, 'argcount', 0)]
+            self._thawed[num] = parsers, stateful
+            if len(self._thawed) > self.cache_size:
+                self._thawed.popitem(False)
+        state = self._stateClass.__new__(self._stateClass)
+        state.state = parsers[:]
+        for i, cls, attrs in stateful:
+            state.state[i] = cls.thaw(attrs)
+        return state
+
+
 def html_copy(cursor, scheme='editor', number_lines=False):
     """Return a new QTextDocument with highlighting set as HTML textcharformats.
 
@@ -201,42 +259,63 @@ def html_copy(cursor, scheme='editor', number_lines=False):
 
     If number_lines is True, line numbers are added.
 
+    Only the selected blocks are visited, and the tokens are taken from the
+    highlighter of the cursor's document, so the text is not lexed again.
+
     """
+    import tokeniter
     data = textformats.formatData(scheme)
+    source = cursor.document()
     doc = QTextDocument()
     doc.setDefaultFont(data.font)
-    doc.setPlainText(cursor.document().toPlainText())
-    if metainfo.info(cursor.document()).highlighting:
-        highlight(doc, mapping(data), ly.lex.state(documentinfo.mode(cursor.document())))
     if cursor.hasSelection():
-        # cut out not selected text
         start, end = cursor.selectionStart(), cursor.selectionEnd()
-        cur1 = QTextCursor(doc)
-        cur1.setPosition(start, QTextCursor.KeepAnchor)
-        cur2 = QTextCursor(doc)
-        cur2.setPosition(end)
-        cur2.movePosition(QTextCursor.End, QTextCursor.KeepAnchor)
-        cur2.removeSelectedText()
-        cur1.removeSelectedText()
-    if number_lines:
-        c = QTextCursor(doc)
-        f = QTextCharFormat()
-        f.setBackground(QColor('#eeeeee'))
-        if cursor.hasSelection():
-            num = cursor.document().findBlock(cursor.selectionStart()).blockNumber() + 1
-            last = cursor.document().findBlock(cursor.selectionEnd())
-        else:
-            num = 1
-            last = cursor.document().lastBlock()
-        lastnum = last.blockNumber() + 1
-        padding = len(format(lastnum))
-        block = doc.firstBlock()
-        while block.isValid():
-            c.setPosition(block.position())
-            c.setCharFormat(f)
-            c.insertText('{0:>{1}d} '.format(num, padding))
-            block = block.next()
-            num += 1
+    else:
+        start, end = 0, source.characterCount() - 1
+    block = source.findBlock(start)
+    last = source.findBlock(end)
+    formats = mapping(data) if metainfo.info(source).highlighting else None
+    plain = QTextCharFormat()
+    numformat = QTextCharFormat()
+    numformat.setBackground(QColor('#eeeeee'))
+    padding = len(format(last.blockNumber() + 1))
+    c = QTextCursor(doc)
+    c.beginEditBlock()
+    while True:
+        if number_lines:
+            c.insertText('{0:>{1}d} '.format(block.blockNumber() + 1, padding), numformat)
+        pos = block.position()
+        text = block.text()
+        s = max(start - pos, 0)
+        e = min(end - pos, len(text))
+        # collect runs of text with the same format
+        runs = []
+        col = s
+        if formats:
+            for token in tokeniter.tokens(block):
+                if token.end <= s:
+                    continue
+                elif token.pos >= e:
+                    break
+                f = formats[token]
+                if f:
+                    tstart, tend = max(token.pos, s), min(token.end, e)
+                    if tstart > col:
+                        runs.append([col, tstart, plain])
+                    if runs and runs[-1][2] is f and runs[-1][1] == tstart:
+                        runs[-1][1] = tend
+                    else:
+                        runs.append([tstart, tend, f])
+                    col = tend
+        if col < e:
+            runs.append([col, e, plain])
+        for rstart, rend, f in runs:
+            c.insertText(text[rstart:rend], f)
+        if block == last:
+            break
+        c.insertText('\n', plain)
+        block = block.next()
+    c.endEditBlock()
     return doc
 
 
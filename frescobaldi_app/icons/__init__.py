@@ -24,7 +24,7 @@ Icons.
 
 import os
 
-from PyQt5.QtCore import QDir, QFile, QFileInfo, QSettings, QSize
+from PyQt5.QtCore import QDir, QFileInfo, QSettings, QSize
 from PyQt5.QtGui import QIcon
 from PyQt5.QtWidgets import QFileIconProvider
 
@@ -32,6 +32,47 @@ import app
 
 
 _cache = {}
+_manifest = None
+_manifest_paths = None
+
+
+def manifest():
+    """Returns a dict mapping icon names to the files found in the icon search path.
+
+    The value is the filename of the SVG icon, or a list of (filename, size)
+    tuples for the PNG icons in different sizes. The search path is scanned
+    only once, and again when it has been changed (e.g. by an extension).
+
+    """
+    global _manifest, _manifest_paths
+    paths = QDir.searchPaths("icons")
+    if _manifest is None or paths != _manifest_paths:
+        svgs = {}
+        pngs = {}
+        for path in paths:
+            for name in _listdir(path, '.svg'):
+                svgs.setdefault(name, os.path.join(path, name + '.svg'))
+            for size in (16, 22, 32, 48):
+                d = os.path.join(path, '{0}x{0}'.format(size))
+                for name in _listdir(d, '.png'):
+                    files = pngs.setdefault(name, {})
+                    files.setdefault(size, os.path.join(d, name + '.png'))
+        _manifest = dict((name, [(f, s) for s, f in sorted(files.items())])
+                         for name, files in pngs.items())
+        _manifest.update(svgs)
+        _manifest_paths = paths
+    return _manifest
+
+
+def _listdir(path, ext):
+    """Yields the names (without extension) of the files in path ending with ext."""
+    try:
+        entries = os.listdir(path)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.endswith(ext):
+            yield entry[:-len(ext)]
 
 
 def get(name):
@@ -42,17 +83,13 @@ def get(name):
         return _cache[name]
     except KeyError:
         icon = _cache[name] = QIcon()
-        # first try SVG
-        fname = 'icons:{0}.svg'.format(name)
-        if QFile(fname).exists():
-            icon.addFile(fname)
-        else:
-            # then try different sizes
-            for size in (16, 22, 32, 48):
-                fname = 'icons:{1}x{1}/{0}.png'.format(name, size or '')
-                if QFile(fname).exists():
-                    qsize = QSize(size, size) if size else QSize()
-                    icon.addFile(fname, qsize)
+        # first try SVG, then different sizes of PNG
+        files = manifest().get(name)
+        if isinstance(files, str):
+            icon.addFile(files)
+        elif files:
+            for fname, size in files:
+                icon.addFile(fname, QSize(size, size))
         return icon
 
 
@@ -24,6 +24,7 @@ and capture the output to get it later or to have a log follow it.
 
 
 import codecs
+import collections
 import os
 import time
 
@@ -63,6 +64,8 @@ class Job(object):
     The output() signal emits output (stderr or stdout) from the process.
     The done() signal is always emitted when the process has ended.
     The history() method returns all status messages and output so far.
+    If the history_limit attribute is set to a number of characters, only
+    the most recent messages are kept in the history.
 
     When the process has finished, the error and success attributes are set.
     The success attribute is set to True When the process exited normally and
@@ -86,6 +89,8 @@ class Job(object):
     started = signals.Signal()
     title_changed = signals.Signal() # title (string)
 
+    history_limit = 0   # maximum size of the history (0 is unlimited)
+
     def __init__(self,
         command=[],
         args=None,
@@ -112,7 +117,9 @@ class Job(object):
         self._priority = priority
         self._aborted = False
         self._process = None
-        self._history = []
+        self._history = collections.deque()
+        self._history_size = 0
+        self._history_dropped = 0
         self._starttime = 0.0
         self._elapsed = 0.0
         self.decoder_stdout = self.create_decoder(STDOUT)
@@ -209,7 +216,9 @@ class Job(object):
         self.success = None
         self.error = None
         self._aborted = False
-        self._history = []
+        self._history = collections.deque()
+        self._history_size = 0
+        self._history_dropped = 0
         self._elapsed = 0.0
         self._starttime = time.time()
         if self._process is None:
@@ -305,6 +314,12 @@ class Job(object):
         """Output some text as the given type (NEUTRAL, SUCCESS, FAILURE, STDOUT or STDERR)."""
         self.output(text, type)
         self._history.append((text, type))
+        if self.history_limit:
+            self._history_size += len(text)
+            while self._history_size > self.history_limit and len(self._history) > 1:
+                msg = self._history.popleft()[0]
+                self._history_size -= len(msg)
+                self._history_dropped += len(msg)
 
     def history(self, types=ALL):
         """Yield the output messages as two-tuples (text, type) since the process started.
@@ -312,7 +327,13 @@ class Job(object):
         If types is given, it should be an OR-ed combination of the status types
         STDERR, STDOUT, NEUTRAL, SUCCESS or FAILURE.
 
+        If older messages were dropped because of the history_limit, a NEUTRAL
+        message mentioning this is yielded first.
+
         """
+        if self._history_dropped and types & NEUTRAL:
+            yield _("[{count} characters of earlier output not kept]").format(
+                count=self._history_dropped), NEUTRAL
         for msg, type in self._history:
             if type & types:
                 yield msg, type
@@ -349,14 +370,27 @@ class Job(object):
 
     def _readstderr(self):
         """(internal) Called when STDERR can be read."""
-        output = self._process.readAllStandardError()
+        output = self._process.readAllStandardError().data()
+        self.parse_output(output, STDERR)
         self.message(self.decoder_stderr(output, self.decode_errors)[0], STDERR)
 
     def _readstdout(self):
         """(internal) Called when STDOUT can be read."""
-        output = self._process.readAllStandardOutput()
+        output = self._process.readAllStandardOutput().data()
+        self.parse_output(output, STDOUT)
         self.message(self.decoder_stdout(output, self.decode_errors)[0], STDOUT)
 
+    def parse_output(self, data, type):
+        """Called with the output of the process, before it is decoded.
+
+        data is a bytes string, type is STDOUT or STDERR. Output parsers can
+        use this to process the output as it arrives, without depending on
+        the (possibly limited) history. The default implementation does
+        nothing.
+
+        """
+        pass
+
     def start_message(self):
         """Called by start().
 
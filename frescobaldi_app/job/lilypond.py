@@ -26,6 +26,7 @@ import codecs
 import glob
 import os
 import shutil
+import time
 
 from PyQt5.QtCore import QSettings, QUrl
 
@@ -34,7 +35,9 @@ import ly.docinfo
 
 import document
 import documentinfo
-from . import Job
+from . import Job, STDERR, NEUTRAL
+from . import logparser
+from . import timing
 import lilypondinfo
 import util
 
@@ -92,6 +95,8 @@ class LilyPondJob(Job):
         self.lilypond_info = docinfo.lilypondinfo()
         self._d_options = {}
         self._backend_args = []
+        self.references = logparser.ReferenceParser()
+        self.phases = logparser.PhaseParser()
         input, self.includepath = docinfo.jobinfo(True)
         directory = os.path.dirname(input)
 
@@ -106,6 +111,9 @@ class LilyPondJob(Job):
                 },
                 title=title,
                 priority=2)
+        self.done.connect(self.references.close)
+        self.done.connect(self.phases.close)
+        self.history_limit = QSettings().value("log/history_limit", 8, int) * 1024 * 1024
 
         # Set default values from Preferences
         s = QSettings()
@@ -122,6 +130,43 @@ class LilyPondJob(Job):
             os.path.basename(self.lilypond_info.command),
             self.lilypond_info.versionString(), doc.documentName()))
 
+    def parse_output(self, data, type):
+        """Collects the file references and phases in LilyPond's output."""
+        if type == STDERR:
+            self.references.feed(data)
+            self.phases.feed(data)
+
+    def finish_message(self, exitCode, exitStatus):
+        """Also outputs the time spent in the phases of LilyPond's work.
+
+        Phases that took clearly longer than in the previous run of the same
+        kind of job on the document are mentioned.
+
+        """
+        super(LilyPondJob, self).finish_message(exitCode, exitStatus)
+        durations = self.phase_durations()
+        if durations and not exitCode and not exitStatus:
+            self.message(_("Time per phase: {phases}.").format(
+                phases=timing.breakdown(durations)), NEUTRAL)
+            run = timing.previous(self.document, type(self).__name__)
+            for phase, seconds, old in timing.slower(durations, run or {}):
+                self.message(_("{phase} took {time} (previous run: {previous}).").format(
+                    phase=timing.title(phase), time=self.elapsed2str(seconds),
+                    previous=self.elapsed2str(old)), NEUTRAL)
+
+    def phase_durations(self):
+        """Return a dictionary with the seconds LilyPond spent in every phase.
+
+        See logparser.PhaseParser.durations(). The dictionary is empty if
+        no phases were recognized, e.g. when LilyPond's messages are translated.
+
+        """
+        if self._elapsed:
+            end = self._starttime + self._elapsed
+        else:
+            end = time.time()
+        return self.phases.durations(self._starttime, end)
+
     def add_include_path(self, path):
         """Add a manual entry to the document's includepath."""
         self.includepath.append(path)
@@ -221,7 +266,7 @@ class VolatileTextJob(PublishJob):
     def resultfiles(self):
         """Returns a list of resulting file(s)"""
         #TODO: Support non-PDF compilation modes
-        return glob.glob(os.path.join(self.directory, '*.pdf'))
+        return glob.glob(os.path.join(self._directory, '*.pdf'))
 
     def cleanup(self):
-        shutil.rmtree(self.directory, ignore_errors=True)
+        shutil.rmtree(self._directory, ignore_errors=True)
@@ -0,0 +1,184 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Parses the output of a Job while it arrives.
+
+The parsers work on the raw (undecoded) output, line by line, so that
+they do not depend on the history of the Job, which may be limited.
+"""
+
+
+import collections
+import re
+import sys
+import time
+
+import signals
+
+
+# finds file references (filename:line:col:) in messages
+message_re = re.compile(br"^((.*?):(\d+)(?::(\d+))?)(?=:)", re.M)
+
+# finds the progress messages LilyPond prints when it starts a phase
+phase_re = re.compile(
+    br"^(?:(Parsing)"
+    br"|(Interpreting music)"
+    br"|(Preprocessing graphical objects)"
+    br"|(Finding the ideal number of pages|Fitting music on)"
+    br"|(Drawing systems)"
+    br"|(Converting to|Layout output to))")
+
+# the names of the phases, in the order of the groups in phase_re
+PHASES = ('parsing', 'interpreting', 'preprocessing', 'breaking', 'drawing', 'output')
+
+
+class LineParser(object):
+    """Splits a stream of bytes in lines and calls parse_line() for every line.
+
+    Call feed() with the output as it arrives and close() when the output
+    has ended. An incomplete line is kept until the rest of it arrives, but
+    never more than max_line_length bytes of it.
+
+    """
+    max_line_length = 65536
+
+    def __init__(self):
+        self._pending = b''
+
+    def feed(self, data):
+        """Parses the given bytes string."""
+        lines = (self._pending + data).split(b'\n')
+        self._pending = lines.pop()[-self.max_line_length:]
+        for line in lines:
+            self.parse_line(line)
+
+    def close(self):
+        """Parses the last line, if it was not terminated."""
+        if self._pending:
+            line, self._pending = self._pending, b''
+            self.parse_line(line)
+
+    def parse_line(self, line):
+        """Implement this method to parse a line (bytes, without newline)."""
+        pass
+
+
+class ReferenceParser(LineParser):
+    """Collects file references (filename:line:column:) in LilyPond's output.
+
+    The references are kept in a compact index: for every distinct reference
+    only the filename, line and column are stored. The found() signal is
+    emitted for every newly found reference.
+
+    """
+    found = signals.Signal()    # (url, filename, line, column)
+    max_references = 100000
+
+    def __init__(self):
+        super(ReferenceParser, self).__init__()
+        self._refs = collections.OrderedDict()
+
+    def parse_line(self, line):
+        m = message_re.match(line)
+        if m and len(self._refs) < self.max_references:
+            enc = sys.getfilesystemencoding()
+            url = m.group(1).decode(enc, 'replace')
+            if url not in self._refs:
+                filename = m.group(2).decode(enc, 'replace')
+                line, column = int(m.group(3)), int(m.group(4) or 0)
+                self.add(url, filename, line, column)
+
+    def add(self, url, filename, line, column):
+        """Adds a reference, e.g. one found by another parser.
+
+        The found() signal is emitted if the reference is new.
+
+        """
+        if url not in self._refs and len(self._refs) < self.max_references:
+            self._refs[url] = (filename, line, column)
+            self.found(url, filename, line, column)
+
+    def references(self):
+        """Yield the references found so far as (url, filename, line, column) tuples."""
+        for url, (filename, line, column) in self._refs.items():
+            yield url, filename, line, column
+
+
+class PhaseParser(LineParser):
+    """Records when LilyPond starts the phases of its work.
+
+    LilyPond prints a progress message when it starts a phase, like
+    "Parsing..." or "Drawing systems...". The time such a message arrives is
+    recorded, even if the rest of the line has not yet arrived. The found()
+    signal is emitted for every phase that starts.
+
+    Only the English messages are recognized.
+
+    """
+    found = signals.Signal()    # (phase, time)
+
+    def __init__(self):
+        super(PhaseParser, self).__init__()
+        self._marks = []
+        self._checked = False   # whether the pending line was recognized
+
+    def feed(self, data):
+        super(PhaseParser, self).feed(data)
+        if self._pending and not self._checked:
+            self._checked = self.check(self._pending)
+
+    def parse_line(self, line):
+        if not self._checked:
+            self.check(line)
+        self._checked = False
+
+    def check(self, line):
+        """Records the phase if the line starts with a progress message.
+
+        Returns True if the line was recognized.
+
+        """
+        m = phase_re.match(line)
+        if m:
+            phase, t = PHASES[m.lastindex - 1], time.time()
+            self._marks.append((phase, t))
+            self.found(phase, t)
+            return True
+        return False
+
+    def marks(self):
+        """Return the list of (phase, time) tuples found so far."""
+        return list(self._marks)
+
+    def durations(self, start, end):
+        """Return a dictionary with the time in seconds spent in every phase.
+
+        start and end are the times the process started and ended. The time
+        before the first phase is recorded as 'startup'. Phases that occur
+        more than once (e.g. for every score) are added up. An empty
+        dictionary is returned if no phase was recognized at all.
+
+        """
+        result = {}
+        if self._marks:
+            marks = [('startup', start)] + self._marks + [(None, end)]
+            for (phase, t), (next_phase, next_t) in zip(marks, marks[1:]):
+                result[phase] = result.get(phase, 0.0) + max(0.0, next_t - t)
+        return result
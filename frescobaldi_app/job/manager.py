@@ -26,6 +26,8 @@ It also sends the app-wide signals jobStarted() and jobFinished().
 """
 
 
+import functools
+
 import app
 import plugin
 import signals
@@ -57,14 +59,14 @@ class JobManager(plugin.DocumentPlugin):
         """Starts a Job on our behalf."""
         if not self.is_running():
             self._job = job
-            job.done.connect(self._finished)
+            job.done.connect(functools.partial(self._finished, job))
             job.start()
             self.started(job)
             app.jobStarted(self.document(), job)
 
-    def _finished(self, success):
+    def _finished(self, job, success):
         self.finished(job, success)
-        app.jobFinished(self.document(), self._job, success)
+        app.jobFinished(self.document(), job, success)
 
     def job(self):
         """Returns the last job if any."""
@@ -123,6 +123,14 @@ class AbstractQueue(QObject):
         """Add a job to the queue."""
         raise NotImplementedError
 
+    def remove(self, j):
+        """Remove a job from the queue, return True if it was queued."""
+        try:
+            self._queue.remove(j)
+        except ValueError:
+            return False
+        return True
+
     def pop(self):
         """Remove and return the next job."""
         raise NotImplementedError
@@ -187,6 +195,16 @@ class PriorityQueue(AbstractQueue):
         heappush(self._queue, (j.priority(), self._insert_count, j))
         self._insert_count += 1
 
+    def remove(self, j):
+        """Remove a job from the queue, return True if it was queued."""
+        from heapq import heapify
+        for i, entry in enumerate(self._queue):
+            if entry[2] is j:
+                del self._queue[i]
+                heapify(self._queue)
+                return True
+        return False
+
     def pop(self):
         """Return the correct part of the tuplet
         (1st: priority, 2nd: insert order)."""
@@ -463,6 +481,20 @@ class JobQueue(QObject):
     def set_queue_mode(self, mode):
         self._queue_mode = mode
 
+    def remove_job(self, job):
+        """Remove a job that has not been started yet from the queue.
+
+        Returns True if the job was removed, False if it was not queued
+        (e.g. because it is already running or has finished).
+
+        """
+        if not self._queue.remove(job):
+            return False
+        if self._queue.empty() and self.state() == QueueStatus.STARTED:
+            self.set_state(QueueStatus.EMPTY)
+            self.emptied.emit()
+        return True
+
     def size(self):
         """Return the number of unstarted jobs."""
         return self._queue.length()
@@ -541,6 +573,17 @@ class GlobalJobQueue(QObject):
             raise ValueError(_("Invalid job queue target: {}".format(target)))
         target_queue.add_job(j)
 
+    def remove_job(self, j, target='engrave'):
+        """Remove a job that has not been started yet from the job queue.
+
+        Returns True if the job was removed.
+
+        """
+        target_queue = self._queues.get(target, None)
+        if not target_queue:
+            raise ValueError(_("Invalid job queue target: {}".format(target)))
+        return target_queue.remove_job(j)
+
     def load_settings(self):
         #TODO: Load settings and create the JobQueues accordingly
         pass
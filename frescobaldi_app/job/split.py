@@ -0,0 +1,420 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2015 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Engraves a book in parts, in parallel.
+
+When a document consists of a \\book with \\bookpart blocks (or just of
+toplevel \\bookpart blocks), a SplitJob creates a copy of the document for
+every bookpart, in which the other bookparts are blanked out. The copies are
+engraved in parallel, using as many LilyPond processes as there are cores.
+Afterwards the PDF documents are merged into one, and the other output files
+(e.g. MIDI files) are copied next to the document, numbered like LilyPond
+numbers them when it engraves the whole document.
+
+The blanked out text is replaced with spaces, so all line and column numbers
+remain the same, and every copy starts with a \\sourcefilename command, so
+that point-and-click links and error messages refer to the original file.
+
+The copies of the parts after the first one start with a \\paper block that
+sets first-page-number, so the pages are numbered as in the whole book, and
+that switches off the book title if the bookpart has no \\header of its own.
+The page numbers are taken from the previous split engrave of the document;
+parts whose first page number turns out to be wrong are engraved again.
+If the document sets first-page-number itself, that setting wins, and every
+part starts with that page number.
+
+"""
+
+
+import collections
+import os
+import re
+import shutil
+import time
+
+try:
+    import pypdf
+except ImportError:
+    pypdf = None
+import weakref
+
+import ly.music.items
+
+from . import NEUTRAL, SUCCESS, FAILURE
+from . import queue
+from .lilypond import LilyPondJob, PreviewJob
+import documentinfo
+import util
+
+
+# nodes that may appear besides the bookparts without producing output
+_toplevel_items = (
+    ly.music.items.Assignment,
+    ly.music.items.Header,
+    ly.music.items.Include,
+    ly.music.items.Language,
+    ly.music.items.Layout,
+    ly.music.items.Paper,
+    ly.music.items.Scheme,
+    ly.music.items.Version,
+)
+
+_book_items = (
+    ly.music.items.Header,
+    ly.music.items.Layout,
+    ly.music.items.Paper,
+)
+
+
+# the page counts of the parts of the last split engrave, per document
+_pagecounts = weakref.WeakKeyDictionary()
+
+# finds the pages in a PDF document if pypdf is not available
+_pdfpage_re = re.compile(rb'/Type\s*/Page(?![A-Za-z])')
+
+
+Part = collections.namedtuple("Part", "start end header")
+
+
+def bookparts(document):
+    """Returns a list of Part(start, end, header) tuples for the bookparts.
+
+    start and end are the positions of the bookpart in the document, header
+    is True if the bookpart has a \\header block of its own.
+
+    An empty list is returned if the document can't be engraved in parts,
+    i.e. if it has less than two bookparts, or if there is other music
+    outside the bookparts that would be engraved with every part.
+
+    """
+    books, parts = [], []
+    for node in documentinfo.music(document):
+        if isinstance(node, ly.music.items.Book):
+            books.append(node)
+        elif isinstance(node, ly.music.items.BookPart):
+            parts.append(node)
+        elif not isinstance(node, _toplevel_items):
+            return []
+    if len(books) > 1 or (books and parts):
+        return []
+    for book in books:
+        for node in book:
+            if isinstance(node, ly.music.items.BookPart):
+                parts.append(node)
+            elif not isinstance(node, _book_items):
+                return []
+    if len(parts) < 2:
+        return []
+    return [Part(node.position, node.end_position(),
+                 any(isinstance(n, ly.music.items.Header) for n in node))
+            for node in parts]
+
+
+def pagecount(filename):
+    """Returns the number of pages in the PDF file."""
+    if pypdf:
+        return len(pypdf.PdfReader(filename).pages)
+    with open(filename, 'rb') as f:
+        return len(_pdfpage_re.findall(f.read()))
+
+
+def firstpages(counts):
+    """Returns the first page number of every part, for the list of page counts."""
+    result = [1]
+    for count in counts[:-1]:
+        result.append(result[-1] + count)
+    return result
+
+
+def blank(text):
+    """Returns the text with all characters except newlines replaced by spaces."""
+    return re.sub(r'[^\n]', ' ', text)
+
+
+def sourcefilename(filename):
+    """Returns a \\sourcefilename command for filename, to put before a text.
+
+    LilyPond then uses filename for point-and-click links and messages.
+    The command is followed by \\sourcefileline 0 and a newline, so the line
+    after it is line 1 again and the columns of the text do not change.
+
+    """
+    name = filename.replace('\\', '\\\\').replace('"', '\\"')
+    return '\\sourcefilename "{0}" \\sourcefileline 0\n'.format(name)
+
+
+def paper(part, firstpage):
+    """Returns a \\paper block (on one line) to put before a part after the first.
+
+    It sets the number of the first page of the part, and, if the bookpart
+    has no \\header of its own, switches off the book title, which LilyPond
+    only prints on the first page of the book.
+
+    """
+    title = "" if part.header else "bookTitleMarkup = ##f "
+    return "\\paper {{ {0}first-page-number = {1} }}\n".format(title, firstpage)
+
+
+def wrapper(text, parts, index, filename, firstpage=1):
+    """Returns the text for the bookpart at index, with the others blanked out.
+
+    The parts are Part tuples as returned by bookparts(). The text starts with
+    a \\sourcefilename command that points to filename, for parts after the
+    first one preceded by a \\paper block (see paper()).
+
+    """
+    result = [sourcefilename(filename)]
+    if index:
+        result.insert(0, paper(parts[index], firstpage))
+    pos = 0
+    for i, (start, end, header) in enumerate(parts):
+        if i != index:
+            result.append(text[pos:start])
+            result.append(blank(text[start:end]))
+            pos = end
+    result.append(text[pos:])
+    return ''.join(result)
+
+
+class SplitJob(PreviewJob):
+    """Engraves the bookparts of a document in parallel.
+
+    If the document can't be split, the whole document is engraved, like
+    a PreviewJob.
+
+    """
+    def __init__(self, document, args=None, title=""):
+        super(SplitJob, self).__init__(document, args, title)
+        self._queue = None
+        self._jobs = []
+        self._tempdir = None
+        self._text = None
+        self._parts = []
+        self._firstpages = []
+        self._renumbered = False
+
+    def start(self):
+        """Starts engraving the parts, or the whole document."""
+        parts = bookparts(self.document)
+        if not parts:
+            return super(SplitJob, self).start()
+        self.success = None
+        self.error = None
+        self._aborted = False
+        self._elapsed = 0.0
+        self._starttime = time.time()
+        self.start_message()
+        self.message(_("Engraving {count} bookparts in parallel...").format(
+            count=len(parts)), NEUTRAL)
+
+        self._tempdir = util.tempdir()
+        self._text = self.document.toPlainText()
+        self._parts = parts
+        counts = _pagecounts.get(self.document)
+        if counts and len(counts) == len(parts):
+            self._firstpages = firstpages(counts)
+        else:
+            self._firstpages = [1] * len(parts)
+        self._renumbered = False
+        self._jobs = [None] * len(parts)
+        for i in range(len(parts)):
+            os.mkdir(os.path.join(self._tempdir, str(i + 1)))
+        self.engrave_parts(range(len(parts)))
+        self.started()
+
+    def engrave_parts(self, indices):
+        """Engraves the parts with the given indices in parallel."""
+        filename = self.filename()
+        self._queue = q = queue.JobQueue(queue_mode=queue.QueueMode.SINGLE,
+                                         num_runners=os.cpu_count() or 1)
+        for i in indices:
+            directory = os.path.join(self._tempdir, str(i + 1))
+            for name in os.listdir(directory):
+                os.remove(os.path.join(directory, name))
+            partfile = os.path.join(directory, os.path.basename(filename))
+            with open(partfile, 'w', encoding='utf-8') as f:
+                f.write(wrapper(self._text, self._parts, i, filename,
+                                self._firstpages[i]))
+            j = PartJob(self, partfile, i + 1)
+            j.done.connect(lambda success, j=j: self._part_done(j, success))
+            self._jobs[i] = j
+            q.add_job(j)
+        q.finished.connect(self._queue_finished)
+        q.start()
+
+    def abort(self):
+        """Aborts all running parts."""
+        if self._queue:
+            self._aborted = True
+            self.abort_message()
+            self._queue.abort()
+        else:
+            super(SplitJob, self).abort()
+
+    def is_running(self):
+        """Returns True if this job is running."""
+        return bool(self._queue) or super(SplitJob, self).is_running()
+
+    def _part_done(self, j, success):
+        """(internal) Called when the job for a part has completed."""
+        self.message(_("Bookpart {number}:").format(number=j.number), NEUTRAL)
+        for msg, type in j.history():
+            self.message(msg, type)
+        if not success and self.error is None:
+            self.error = j.error
+
+    def _queue_finished(self):
+        """(internal) Called when all parts have been engraved (or aborted)."""
+        success = not self._aborted and all(j.success for j in self._jobs)
+        if success and self.renumber():
+            return
+        if success:
+            try:
+                self.message(_("Combining {count} PDF documents...").format(
+                    count=len(self._jobs)), NEUTRAL)
+                self.combine()
+                self.copy_other_files()
+            except (IOError, OSError) as e:
+                self.message(_("Could not write the PDF document: {error}").format(
+                    error=e), FAILURE)
+                success = False
+        if success:
+            elapsed = self.elapsed2str(self.elapsed_time())
+            self.message(_("Completed successfully in {time}.").format(time=elapsed), SUCCESS)
+        elif not self._aborted:
+            self.message(_("Engraving one or more bookparts failed."), FAILURE)
+        shutil.rmtree(self._tempdir, ignore_errors=True)
+        self._elapsed = time.time() - self._starttime
+        self._queue = None
+        self._jobs = []
+        self._text = None
+        self.success = success
+        self.done(success)
+
+    def renumber(self):
+        """Engraves the parts again whose first page number was wrong.
+
+        The page counts are stored for the next split engrave of the document.
+        Returns True if parts are being engraved again. This is done only
+        once, as the page count of a part normally does not depend on the
+        number of its first page.
+
+        """
+        try:
+            counts = [sum(pagecount(f) for f in self.output_files(j)
+                          if f.lower().endswith('.pdf')) for j in self._jobs]
+        except Exception:
+            return False    # can't read the PDF documents, leave the numbering
+        if not all(counts):
+            return False    # pages not found (e.g. compressed), idem
+        _pagecounts[self.document] = counts
+        actual = firstpages(counts)
+        wrong = [i for i in range(1, len(counts)) if actual[i] != self._firstpages[i]]
+        if not wrong or self._renumbered:
+            return False
+        self._firstpages = actual
+        self._renumbered = True
+        self.message(_("Engraving {count} bookparts again with the right page "
+                       "numbers...").format(count=len(wrong)), NEUTRAL)
+        self.engrave_parts(wrong)
+        return True
+
+    def basename(self):
+        """Returns the basename (without extension) for the created PDF document."""
+        basenames = self.document_info.basenames()
+        if basenames:
+            return basenames[0]
+        return os.path.splitext(self.filename())[0]
+
+    def output_files(self, j):
+        """Returns the files the part job j created, in LilyPond's order.
+
+        LilyPond names the second and further files with the same extension
+        basename-1.ext, basename-2.ext, etc.
+
+        """
+        directory = os.path.dirname(j.filename())
+        names = sorted((name for name in os.listdir(directory)
+                        if name != os.path.basename(j.filename())),
+                       key=lambda name: util.naturalsort(os.path.splitext(name)[0]))
+        return [os.path.join(directory, name) for name in names]
+
+    def pdf_files(self):
+        """Returns the PDF files created by the parts, in order."""
+        return [filename for j in self._jobs for filename in self.output_files(j)
+                if filename.lower().endswith('.pdf')]
+
+    def copy_other_files(self):
+        """Copies the files other than PDF documents the parts created.
+
+        They are numbered per extension over all parts, as LilyPond would have
+        named them when engraving the whole document: basename.midi,
+        basename-1.midi, etc.
+
+        """
+        basename = self.basename()
+        counts = collections.Counter()
+        for j in self._jobs:
+            for filename in self.output_files(j):
+                ext = os.path.splitext(filename)[1]
+                if ext.lower() == '.pdf':
+                    continue
+                count = counts[ext]
+                counts[ext] += 1
+                suffix = "-{0}".format(count) if count else ""
+                shutil.copyfile(filename, basename + suffix + ext)
+
+    def combine(self):
+        """Combines the PDF documents of the parts.
+
+        If the pypdf module is not available, the documents are copied to
+        numbered files (basename-1.pdf etc.) instead, which the music viewer
+        shows as separate documents.
+
+        """
+        files = self.pdf_files()
+        basename = self.basename()
+        if pypdf:
+            writer = pypdf.PdfWriter()
+            for filename in files:
+                writer.append(filename)
+            with open(basename + '.pdf', 'wb') as f:
+                writer.write(f)
+        else:
+            # don't let the viewer show a PDF of an earlier full engrave
+            if os.path.exists(basename + '.pdf'):
+                os.remove(basename + '.pdf')
+            for i, filename in enumerate(files, 1):
+                shutil.copyfile(filename, "{0}-{1}.pdf".format(basename, i))
+
+
+class PartJob(LilyPondJob):
+    """Engraves one bookpart of a SplitJob."""
+    def __init__(self, parent, filename, number):
+        super(PartJob, self).__init__(parent.document, list(parent.arguments()))
+        self.number = number
+        self._d_options = dict(parent._d_options)
+        self.set_backend_args(['--pdf'])
+        self.set_input(filename)
+        self.set_directory(os.path.dirname(filename))
+        # find included files relative to the original document
+        self.includepath = [os.path.dirname(parent.filename())] + parent.includepath
+        self.references.found.connect(parent.references.add)
+        self.set_title("{0} ({1})".format(parent.title(), number))
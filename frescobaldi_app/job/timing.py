@@ -0,0 +1,131 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2015 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Keeps a history of how long engraving a document took, per LilyPond phase.
+
+LilyPond jobs record when LilyPond starts a phase (see the PhaseParser in
+the logparser module). When a job has completed successfully, the time spent
+in every phase is appended to the history of the document, which is stored
+in the document's metainfo.
+
+"""
+
+
+import json
+
+import app
+import metainfo
+
+
+metainfo.define('engrave_times', [])
+
+# the number of runs kept per document
+history_size = 20
+
+# a phase is reported as slower when it takes this much longer than before
+_slower_factor = 1.5
+_slower_seconds = 1.0
+
+
+def title(phase):
+    """Return a translated title for the phase name."""
+    return {
+        'startup': _("Starting up"),
+        'parsing': _("Parsing"),
+        'interpreting': _("Interpreting music"),
+        'preprocessing': _("Preprocessing"),
+        'breaking': _("Page breaking"),
+        'drawing': _("Drawing systems"),
+        'output': _("Writing output"),
+    }.get(phase, phase)
+
+
+def breakdown(durations):
+    """Return a short text listing the durations per phase."""
+    from . import Job
+    return ", ".join("{0} {1}".format(title(phase), Job.elapsed2str(seconds))
+                     for phase, seconds in durations.items())
+
+
+def history(document):
+    """Return the list of recorded runs for the document, oldest first.
+
+    Every run is a dictionary with the keys "time" (when the job started),
+    "total" (seconds), "mode" (the class name of the job), "lilypond" (the
+    version string) and "phases" (a dictionary of seconds per phase).
+
+    """
+    return list(metainfo.info(document).engrave_times)
+
+
+def previous(document, mode):
+    """Return the last recorded run of the document with the mode, or None."""
+    for run in reversed(history(document)):
+        if run.get("mode") == mode:
+            return run
+
+
+def slower(durations, run):
+    """Yield (phase, seconds, previous seconds) for phases that became slower.
+
+    The durations are compared with the phases of the earlier run.
+
+    """
+    before = run.get("phases", {})
+    for phase, seconds in durations.items():
+        if phase in before:
+            old = before[phase]
+            if seconds > old * _slower_factor and seconds - old > _slower_seconds:
+                yield phase, seconds, old
+
+
+def record(document, j, durations):
+    """Append a run of the LilyPond job j to the history of the document."""
+    run = {
+        "time": j.start_time(),
+        "total": round(j.elapsed_time(), 3),
+        "mode": type(j).__name__,
+        "lilypond": j.lilypond_info.versionString(),
+        "phases": dict((phase, round(seconds, 3))
+                       for phase, seconds in durations.items()),
+    }
+    runs = history(document)
+    runs.append(run)
+    metainfo.info(document).engrave_times = runs[-history_size:]
+
+
+def export(document, filename):
+    """Write the history of the document as JSON to the file."""
+    data = {
+        "document": document.url().toString(),
+        "runs": history(document),
+    }
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+
+
+@app.jobFinished.connect
+def _job_finished(document, j, success):
+    """Record the phases of successful LilyPond jobs."""
+    durations = success and getattr(j, 'phase_durations', None)
+    if durations:
+        durations = durations()
+        if durations:
+            record(document, j, durations)
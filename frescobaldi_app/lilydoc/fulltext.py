@@ -0,0 +1,303 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Full text search in local LilyPond documentation.
+
+For every local Documentation instance an inverted index is built over the
+HTML pages of the notation, learning and internals manuals. The index is
+built in a background thread and stored on disk, so it only needs to be
+built again when the documentation changes.
+"""
+
+
+import array
+import collections
+import hashlib
+import html.parser
+import math
+import os
+import pickle
+import re
+
+from PyQt5.QtCore import QThread
+
+import app
+import signals
+
+from . import translations
+
+
+# the manuals that are indexed
+manuals = ('notation', 'learning', 'internals')
+
+# increase this when the format of the stored index changes
+_format = 1
+
+_indexes = {}   # loaded Index instances, by documentation path
+_builders = {}  # running Builder threads, by documentation path
+_failures = {}  # error messages of Builders that failed, by documentation path
+
+indexReady = signals.Signal()   # (path), emitted when an index is built
+
+
+_words_re = re.compile(r"\w+")
+
+def words(text):
+    """Yields the lowercase words (of at least two characters) in the text."""
+    for word in _words_re.findall(text.lower()):
+        if len(word) > 1:
+            yield word
+
+
+def index(doc):
+    """Returns the Index for the local Documentation instance.
+
+    If the index is not available yet, None is returned and the index is
+    built in the background. When done, the indexReady signal is emitted.
+    If building the index failed, None is returned and the index is not built
+    again; use error() to get the reason.
+
+    """
+    path = doc.url().toLocalFile()
+    if not path:
+        return
+    try:
+        return _indexes[path]
+    except KeyError:
+        pass
+    if path not in _builders and path not in _failures:
+        b = _builders[path] = Builder(path, doc.versionString() or '')
+        b.finished.connect(lambda: _builderFinished(path))
+        b.start()
+
+
+def error(doc):
+    """Returns the error message if building the index for doc failed, else None."""
+    return _failures.get(doc.url().toLocalFile())
+
+
+def _builderFinished(path):
+    """Called when a Builder has finished."""
+    b = _builders.pop(path)
+    if b.index is not None:
+        _indexes[path] = b.index
+    else:
+        _failures[path] = b.error
+    indexReady(path)
+
+
+def cachefile(path):
+    """Returns the file name the index for the documentation at path is stored in."""
+    name = hashlib.sha1(path.encode('utf-8')).hexdigest() + '.pickle'
+    return os.path.join(app.cachedir('docindex'), name)
+
+
+def pages(path):
+    """Yields the untranslated HTML files of the indexed manuals at path."""
+    langs = tuple('.' + lang for lang in translations)
+    for manual in manuals:
+        directory = os.path.join(path, 'Documentation', manual)
+        try:
+            names = sorted(os.listdir(directory))
+        except OSError:
+            continue
+        for name in names:
+            if name.endswith('.html') and not name[:-5].endswith(langs):
+                yield os.path.join(directory, name)
+
+
+def stamp(path, version):
+    """Returns a value that changes when the documentation at path changes."""
+    mtimes = []
+    for manual in manuals:
+        try:
+            mtimes.append(os.path.getmtime(os.path.join(path, 'Documentation', manual)))
+        except OSError:
+            mtimes.append(None)
+    return (_format, path, version, tuple(mtimes))
+
+
+class Index(object):
+    """An inverted index over the pages of a LilyPond documentation instance.
+
+    For every word the numbers of the pages containing it are stored, with
+    the number of times the word occurs in each page. Pages are ranked using
+    the BM25 formula, words in the page title weigh more.
+
+    """
+    def __init__(self, stamp):
+        self.stamp = stamp
+        self.filenames = []
+        self.titles = []
+        self.summaries = []
+        self.lengths = array.array('i')
+        self.postings = {}  # word: (array of page numbers, array of counts)
+
+    def add(self, filename, title, text):
+        """Adds a page to the index."""
+        page = len(self.filenames)
+        self.filenames.append(filename)
+        self.titles.append(title)
+        self.summaries.append(' '.join(text[:400].split()[:40]))
+        counts = collections.Counter(words(text))
+        self.lengths.append(sum(counts.values()))
+        for word, count in counts.items():
+            try:
+                pages, freqs = self.postings[word]
+            except KeyError:
+                pages, freqs = self.postings[word] = array.array('i'), array.array('i')
+            pages.append(page)
+            freqs.append(count)
+
+    def __len__(self):
+        return len(self.filenames)
+
+    def search(self, query, limit=50):
+        """Returns a list of (score, filename, title, summary) tuples.
+
+        All the words in the query must be present in a page. The results are
+        sorted on descending score, at most limit results are returned.
+
+        """
+        terms = set(words(query))
+        if not terms or not self.filenames:
+            return []
+        postings = []
+        for term in terms:
+            try:
+                postings.append((term, self.postings[term]))
+            except KeyError:
+                return []
+        # start with the rarest word
+        postings.sort(key=lambda p: len(p[1][0]))
+        total = len(self.filenames)
+        avglength = sum(self.lengths) / total
+        k1, b = 1.2, 0.75
+        scores = None
+        for term, (pages, freqs) in postings:
+            idf = math.log(1 + (total - len(pages) + 0.5) / (len(pages) + 0.5))
+            termscores = {}
+            for page, freq in zip(pages, freqs):
+                if scores is None or page in scores:
+                    norm = k1 * (1 - b + b * self.lengths[page] / avglength)
+                    score = idf * freq * (k1 + 1) / (freq + norm)
+                    if term in self.titles[page].lower():
+                        score *= 2
+                    termscores[page] = score + (scores[page] if scores else 0)
+            scores = termscores
+            if not scores:
+                return []
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+        return [(score, self.filenames[page], self.titles[page], self.summaries[page])
+                for page, score in best]
+
+    def save(self, filename):
+        """Stores the index in a file."""
+        tempname = filename + '.tmp'
+        with open(tempname, 'wb') as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tempname, filename)
+
+    @classmethod
+    def load(cls, filename, stamp):
+        """Loads an index from a file, returns None if it is not up-to-date."""
+        try:
+            with open(filename, 'rb') as f:
+                index = pickle.load(f)
+        except Exception:
+            return
+        if isinstance(index, cls) and index.stamp == stamp:
+            return index
+
+
+class TextExtractor(html.parser.HTMLParser):
+    """Extracts the title and the text from an HTML page."""
+    skip = ('script', 'style', 'head')
+
+    def __init__(self):
+        super(TextExtractor, self).__init__()
+        self.title = []
+        self.text = []
+        self._skip = 0
+        self._intitle = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'title':
+            self._intitle = True
+        elif tag in self.skip:
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag == 'title':
+            self._intitle = False
+        elif tag in self.skip and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if self._intitle:
+            self.title.append(data)
+        elif not self._skip:
+            self.text.append(data)
+
+
+class Builder(QThread):
+    """Loads or builds the index for a documentation instance in the background."""
+    def __init__(self, path, version):
+        super(Builder, self).__init__()
+        self.path = path
+        self.version = version
+        self.index = None
+        self.error = None
+
+    def run(self):
+        try:
+            index = self.build()
+        except Exception as e:
+            self.error = "{0}: {1}".format(type(e).__name__, e)
+        else:
+            if len(index):
+                self.index = index
+            else:
+                self.error = _("No documentation pages found.")
+
+    def build(self):
+        """Returns the index, loaded from the cache file or built again."""
+        s = stamp(self.path, self.version)
+        filename = cachefile(self.path)
+        index = Index.load(filename, s)
+        if index is None:
+            index = Index(s)
+            for page in pages(self.path):
+                try:
+                    with open(page, encoding='utf-8', errors='replace') as f:
+                        data = f.read()
+                except OSError:
+                    continue
+                parser = TextExtractor()
+                parser.feed(data)
+                parser.close()
+                title = ' '.join(''.join(parser.title).split())
+                index.add(page, title, ''.join(parser.text))
+            if len(index):
+                try:
+                    index.save(filename)
+                except OSError:
+                    pass
+        return index
@@ -24,7 +24,7 @@ A Log shows the output of a Job.
 
 import contextlib
 
-from PyQt5.QtCore import QSettings
+from PyQt5.QtCore import QSettings, QTimer
 from PyQt5.QtGui import (QFont, QPalette, QTextCharFormat, QTextCursor,
                          QTextFormat)
 from PyQt5.QtWidgets import QApplication, QTextBrowser
@@ -42,6 +42,9 @@ class Log(QTextBrowser):
         self._types = job.ALL
         self._lasttype = None
         self._formats = self.logformats()
+        self._pending = []
+        self._flushTimer = QTimer(self, singleShot=True, interval=50,
+                                  timeout=self.flush)
 
     def setMessageTypes(self, types):
         """Set the types of Job output to display.
@@ -60,6 +63,7 @@ class Log(QTextBrowser):
         """Gives us the output from the Job (past and upcoming)."""
         for msg, type in j.history():
             self.write(msg, type)
+        self.flush()
         j.output.connect(self.write)
 
     def textFormat(self, type):
@@ -69,6 +73,23 @@ class Log(QTextBrowser):
     def write(self, message, type):
         """Writes the given message with the given type to the log.
 
+        The message is not written immediately, but queued and written
+        together with other messages that arrive shortly after it, see flush().
+
+        """
+        if type & self._types:
+            if self._pending and self._pending[-1][1] == type:
+                self._pending[-1][0].append(message)
+            else:
+                self._pending.append(([message], type))
+            if not self._flushTimer.isActive():
+                self._flushTimer.start()
+
+    def flush(self):
+        """Writes the queued messages to the log.
+
+        Consecutive messages of the same type are joined and written at once.
+
         The keepScrolledDown context manager is used to scroll the log further
         down if it was scrolled down at that moment.
 
@@ -76,13 +97,23 @@ class Log(QTextBrowser):
         is inserted if otherwise the message would continue on the same line.
 
         """
-        if type & self._types:
+        self._flushTimer.stop()
+        pending, self._pending = self._pending, []
+        if pending:
             with self.keepScrolledDown():
-                changed = type != self._lasttype
-                self._lasttype = type
-                if changed and self.cursor.block().text() and not message.startswith('\n'):
-                    self.cursor.insertText('\n')
-                self.writeMessage(message, type)
+                for messages, type in pending:
+                    message = ''.join(messages)
+                    changed = type != self._lasttype
+                    self._lasttype = type
+                    if changed and self.cursor.block().text() and not message.startswith('\n'):
+                        self.cursor.insertText('\n')
+                    self.writeMessage(message, type)
+
+    def clear(self):
+        """Clears the log, discarding queued messages."""
+        self._flushTimer.stop()
+        self._pending = []
+        super(Log, self).clear()
 
     def writeMessage(self, message, type):
         """Inserts the given message in the text with the textformat belonging to type."""
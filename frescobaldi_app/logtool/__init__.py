@@ -24,7 +24,7 @@ The log dockwindow.
 
 from PyQt5.QtCore import QSettings, Qt
 from PyQt5.QtGui import QKeySequence
-from PyQt5.QtWidgets import QAction
+from PyQt5.QtWidgets import QAction, QFileDialog, QMessageBox
 
 import actioncollection
 import actioncollectionmanager
@@ -41,6 +41,7 @@ class LogTool(panel.Panel):
         ac = self.actionCollection = Actions()
         ac.log_next_error.triggered.connect(self.slotNextError)
         ac.log_previous_error.triggered.connect(self.slotPreviousError)
+        ac.log_export_times.triggered.connect(self.slotExportTimes)
         actioncollectionmanager.manager(mainwindow).addActionCollection(ac)
         mainwindow.addDockWidget(Qt.BottomDockWidgetArea, self)
         app.jobStarted.connect(self.slotJobStarted)
@@ -81,11 +82,31 @@ class LogTool(panel.Panel):
         self.widget().gotoError(-1)
 
 
+    def slotExportTimes(self):
+        """Saves the engraving times of the current document as JSON."""
+        import os
+        import job.timing
+        doc = self.mainwindow().currentDocument()
+        filename = os.path.splitext(doc.url().toLocalFile() or doc.documentName())[0]
+        filename += '-times.json'
+        caption = app.caption(_("dialog title", "Export Engraving Times"))
+        filetypes = '{0} (*.json);;{1} (*)'.format(_("JSON Files"), _("All Files"))
+        filename = QFileDialog.getSaveFileName(self.mainwindow(), caption, filename, filetypes)[0]
+        if filename:
+            try:
+                job.timing.export(doc, filename)
+            except (IOError, OSError) as e:
+                QMessageBox.warning(self.mainwindow(), app.caption(_("Error")),
+                    _("Can't write to destination:\n\n{url}\n\n{error}").format(
+                        url=filename, error=e.strerror))
+
+
 class Actions(actioncollection.ActionCollection):
     name = "logtool"
     def createActions(self, parent=None):
         self.log_next_error = QAction(parent)
         self.log_previous_error = QAction(parent)
+        self.log_export_times = QAction(parent)
 
         self.log_next_error.setShortcut(QKeySequence("Ctrl+E"))
         self.log_previous_error.setShortcut(QKeySequence("Ctrl+Shift+E"))
@@ -93,6 +114,7 @@ class Actions(actioncollection.ActionCollection):
     def translateUI(self):
         self.log_next_error.setText(_("Next Error Message"))
         self.log_previous_error.setText(_("Previous Error Message"))
+        self.log_export_times.setText(_("Export Engraving &Times..."))
 
 
 # log errors by initializing Errors instance
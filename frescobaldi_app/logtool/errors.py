@@ -23,7 +23,6 @@ Manages cursor positions of file-references in error messages.
 
 
 import os
-import re
 import sys
 
 from PyQt5.QtCore import QSettings, QUrl
@@ -33,12 +32,13 @@ import app
 import bookmarks
 import plugin
 import job
+import job.logparser
 import scratchdir
 import util
 
 
 # finds file references (filename:line:col:) in messages
-message_re = re.compile(br"^((.*?):(\d+)(?::(\d+))?)(?=:)", re.M)
+message_re = job.logparser.message_re
 
 
 def errors(document):
@@ -76,10 +76,17 @@ class Errors(plugin.DocumentPlugin):
         for doc in docs:
             bookmarks.bookmarks(doc).clear("error")
         self._refs.clear()
-        # take over history and connect
-        for msg, type in j.history():
-            self.slotJobOutput(msg, type)
-        j.output.connect(self.slotJobOutput)
+        parser = getattr(j, 'references', None)
+        if parser:
+            # take over the references found so far and connect
+            for ref in parser.references():
+                self.addReference(*ref)
+            parser.found.connect(self.addReference)
+        else:
+            # take over history and connect
+            for msg, type in j.history():
+                self.slotJobOutput(msg, type)
+            j.output.connect(self.slotJobOutput)
 
     def slotJobOutput(self, message, type):
         """Called whenever the job has output.
@@ -94,9 +101,12 @@ class Errors(plugin.DocumentPlugin):
             for m in message_re.finditer(message.encode(job_enc)):
                 url = m.group(1).decode(enc)
                 filename = m.group(2).decode(enc)
-                filename = util.normpath(filename)
                 line, column = int(m.group(3)), int(m.group(4) or 0)
-                self._refs[url] = Reference(filename, line, column)
+                self.addReference(url, filename, line, column)
+
+    def addReference(self, url, filename, line, column):
+        """Stores a reference to the filename, line and column, found in url."""
+        self._refs[url] = Reference(util.normpath(filename), line, column)
 
     def cursor(self, url, load=False):
         """Returns a QTextCursor belonging to the url (string).
@@ -57,4 +57,16 @@ class DocInfo(ly.docinfo.DocInfo):
         if m:
             return m.group(1)
 
+    @ly.docinfo._cache
+    def token_hash(self):
+        """Return an integer hash for all non-whitespace and non-comment tokens.
+
+        For a Frescobaldi document the hashes of the blocks are cached by the
+        tokeniter module, so only changed blocks are hashed again.
 
+        """
+        import lydocument
+        if isinstance(self.document, lydocument.Document):
+            import tokeniter
+            return tokeniter.token_hash(self.document.document)
+        return super(DocInfo, self).token_hash()
@@ -34,6 +34,7 @@ from PyQt5.QtCore import QSettings, QTimer, QUrl
 from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import QApplication
 
+import startuptime         # Measure the time needed to start up
 import appinfo             # Information about our application
 import app              # Instantiate global signals etc
 import install          # Update QSettings structure etc. if needed
@@ -74,6 +75,9 @@ def parse_commandline():
         help=_("Always start a new instance"))
     parser.add_argument('--python-ly', type=str, metavar=_("STR"), default="",
         help=_("Path to python-ly"))
+    parser.add_argument('--startup-times', action="store_true", default=False,
+        help=_("Print the time needed to import modules and load panels "
+               "on startup"))
     parser.add_argument('files', metavar=_("file"), nargs='*',
         help=_("File to be opened"))
 
@@ -164,6 +168,9 @@ def main():
 
     check_ly()
 
+    if args.startup_times:
+        startuptime.trace_imports()
+
     if args.list_sessions:
         import sessions
         for name in sessions.sessionNames():
@@ -190,6 +197,10 @@ def main():
 
     QTimer.singleShot(0, remote.setup)  # Start listening for IPC
 
+    # stop measuring as soon as the event loop runs
+    QTimer.singleShot(0, startuptime.print_report if args.startup_times
+                         else startuptime.finish)
+
     import mainwindow       # contains MainWindow class
     import session          # Initialize QSessionManager support
     import sessions         # Initialize our own named session support
@@ -835,11 +835,11 @@ class MainWindow(QMainWindow):
         wrap_attrib = s.value("wrap_attrib", "id", str)
         wrap_attrib_name = s.value("wrap_attrib_name", "document", str)
         import highlight2html
-        html = highlight2html.html_document(doc, inline=inline_style, number_lines=number_lines,
-            wrap_tag=wrap_tag, wrap_attrib=wrap_attrib, wrap_attrib_name=wrap_attrib_name)
         try:
             with open(filename, "wb") as f:
-                f.write(html.encode('utf-8'))
+                highlight2html.write_document(f, doc, inline=inline_style,
+                    number_lines=number_lines, wrap_tag=wrap_tag,
+                    wrap_attrib=wrap_attrib, wrap_attrib_name=wrap_attrib_name)
         except IOError as e:
             msg = _("{message}\n\n{strerror} ({errno})").format(
                 message = _("Could not write to: {url}").format(url=filename),
@@ -145,6 +145,7 @@ def menu_file_export(mainwindow):
     if app.is_git_controlled() or QSettings().value("experimental-features", False, bool):
         m.addAction(acfe.export_audio)
         m.addAction(acfe.export_musicxml)
+        m.addAction(acfe.export_musicxml_all)
     m.addAction(ac.export_colored_html)
     return m
 
@@ -209,6 +210,7 @@ def menu_view(mainwindow):
     ac = panelmanager.manager(mainwindow).logtool.actionCollection
     m.addAction(ac.log_next_error)
     m.addAction(ac.log_previous_error)
+    m.addAction(ac.log_export_times)
     return m
 
 
@@ -269,6 +271,8 @@ def menu_lilypond(mainwindow):
     m.addAction(ac.engrave_preview)
     m.addAction(ac.engrave_publish)
     m.addAction(ac.engrave_debug)
+    m.addAction(ac.engrave_split)
+    m.addAction(ac.engrave_fragment)
     m.addAction(ac.engrave_custom)
     m.addAction(ac.engrave_abort)
     m.addSeparator()
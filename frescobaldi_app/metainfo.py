@@ -19,16 +19,25 @@
 
 """
 Store meta information about documents.
+
+The information is stored in an SQLite database in the application data
+directory, one row per document. Changes are collected and written in one
+transaction. Information that was stored in the settings by older versions
+is moved to the database the first time it is opened.
 """
 
 
+import json
+import os
+import sqlite3
 import time
 
-from PyQt5.QtCore import QSettings, QUrl
+from PyQt5.QtCore import QStandardPaths, QTimer, QUrl
 
 import app
 import plugin
 import document
+import settingssnapshot
 
 
 __all__ = ["info", "define"]
@@ -75,40 +84,137 @@ class MetaInfo(plugin.DocumentPlugin):
             doc.loaded.connect(self.load, -999) # before all others
             doc.closed.connect(self.save,  999) # after all others
 
-    def settingsGroup(self):
+    def key(self):
+        """Return the key the info is stored under, None for an unnamed document."""
         url = self.document().url()
         if not url.isEmpty():
-            s = app.settings('metainfo')
-            s.beginGroup(url.toString().replace('\\', '_').replace('/', '_'))
-            return s
+            return url.toString().replace('\\', '_').replace('/', '_')
+
+    def values(self):
+        """Return the dictionary of values stored for our document, if any."""
+        key = self.key()
+        if key:
+            return store().get(key)
 
     def load(self):
-        s = self.settingsGroup()
+        values = self.values()
         for name in _defaults:
-            self.loadValue(name, s)
+            self.loadValue(name, values)
 
-    def loadValue(self, name, settings=None):
-        s = settings or self.settingsGroup()
+    def loadValue(self, name, values=None):
+        if values is None:
+            values = self.values()
         default, readfunc = _defaults[name]
-        if s and QSettings().value("metainfo", True, bool):
-            self.__dict__[name] = readfunc(s.value(name, default))
+        if (values is not None and name in values
+            and settingssnapshot.snapshot().metainfo):
+            self.__dict__[name] = readfunc(values[name])
         else:
             self.__dict__[name] = default
 
     def save(self):
-        s = self.settingsGroup()
-        if s:
-            s.setValue("time", time.time())
+        key = self.key()
+        if key:
+            values = {}
             for name in _defaults:
                 value = self.__dict__[name]
-                s.remove(name) if value == _defaults[name][0] else s.setValue(name, value)
+                if value != _defaults[name][0]:
+                    values[name] = value
+            store().put(key, values)
+
+
+class Store(object):
+    """Stores the meta information of all documents in an SQLite database.
+
+    Every document has one row, with the time it was last saved and the
+    values that differ from their default, JSON-encoded. Written values are
+    kept in memory and committed to the database in one transaction, shortly
+    after writing or when flush() is called.
+
+    """
+    version = 1
+
+    def __init__(self, filename):
+        self._pending = {}
+        self._timer = QTimer(singleShot=True, timeout=self.flush)
+        try:
+            self._db = sqlite3.connect(filename)
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS metainfo ("
+                "key TEXT PRIMARY KEY, time REAL NOT NULL, data TEXT NOT NULL)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS metainfo_time ON metainfo (time)")
+        if self._db.execute("PRAGMA user_version").fetchone()[0] < self.version:
+            self.migrate()
+
+    def get(self, key):
+        """Return the dictionary of values stored for key, or None."""
+        try:
+            return self._pending[key][1]
+        except KeyError:
+            row = self._db.execute(
+                "SELECT data FROM metainfo WHERE key = ?", (key,)).fetchone()
+            if row:
+                return json.loads(row[0])
+
+    def put(self, key, values):
+        """Store the dictionary of values for key, with the current time."""
+        self._pending[key] = (time.time(), values)
+        self._timer.start(0)
+
+    def flush(self):
+        """Write all pending values to the database."""
+        self._timer.stop()
+        if self._pending:
+            pending, self._pending = self._pending, {}
+            with self._db:
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO metainfo (key, time, data) VALUES (?, ?, ?)",
+                    ((key, t, json.dumps(values, default=str))
+                     for key, (t, values) in pending.items()))
+
+    def prune(self, before):
+        """Remove the info of all documents not saved since the time before."""
+        self.flush()
+        with self._db:
+            self._db.execute("DELETE FROM metainfo WHERE time < ?", (before,))
+
+    def migrate(self):
+        """Move the info stored in the settings by older versions to the database."""
+        s = app.settings('metainfo')
+        rows = []
+        for key in s.childGroups():
+            s.beginGroup(key)
+            values = dict((name, s.value(name)) for name in s.childKeys())
+            s.endGroup()
+            try:
+                t = float(values.pop("time", 0))
+            except (TypeError, ValueError):
+                t = 0.0
+            rows.append((key, t, json.dumps(values, default=str)))
+        with self._db:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO metainfo (key, time, data) VALUES (?, ?, ?)", rows)
+            self._db.execute("PRAGMA user_version = {0}".format(self.version))
+        s.remove("")
+
+
+_store = None
+
+def store():
+    """Return the global Store instance, opening the database if needed."""
+    global _store
+    if _store is None:
+        path = QStandardPaths.writableLocation(QStandardPaths.AppDataLocation)
+        os.makedirs(path, exist_ok=True)
+        _store = Store(os.path.join(path, "metainfo.sqlite"))
+    return _store
 
 
 @app.aboutToQuit.connect
 def prune():
     """Prune old info."""
-    s = app.settings('metainfo')
     month_ago = time.time() - 31 * 24 * 3600
-    for key in s.childGroups():
-        if s.value(key + "/time", 0.0, float) < month_ago:
-            s.remove(key)
+    store().prune(month_ago)
@@ -13,25 +13,31 @@ TODO:
   dynamic input
 """
 
-import time
+import threading
 import weakref
 
-from PyQt5.QtCore import QObject, QSettings, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, QSettings, QThread, QTimer, pyqtSignal
 
-import midihub
 import midifile.event
-import midifile.parser
 import documentinfo
 
 from . import elements
 
 
 class MidiIn(object):
+    # ms between releasing all keys and pressing a new one that still belongs
+    # to the same chord
+    chord_threshold = 30
+
     def __init__(self, widget):
         self._widget = weakref.ref(widget)
         self._portmidiinput = None
         self._listener = None
         self._chord = None
+        self._chordtime = None
+        self._pollingtime = 10
+        # outputs a chord released at the end of a batch if no key follows
+        self._pending = QTimer(singleShot=True, timeout=self.outputchord)
 
     def __del__(self):
         if isinstance(self._listener, Listener):
@@ -41,13 +47,14 @@ class MidiIn(object):
         return self._widget()
 
     def open(self):
+        import midihub  # loads PortMidi, so only import it when needed
         s = QSettings()
         self._portname = s.value("midi/midi/input_port", midihub.default_input(), str)
         self._pollingtime = s.value("midi/polling_time", 10, int)
         self._portmidiinput = midihub.input_by_name(self._portname)
 
         self._listener = Listener(self._portmidiinput, self._pollingtime)
-        self._listener.NoteEventSignal.connect(self.analyzeevent)
+        self._listener.NoteEventsSignal.connect(self.analyzeevents)
 
     def close(self):
         # self._portmidiinput.close()
@@ -68,12 +75,18 @@ class MidiIn(object):
         doc = self.widget().mainwindow().currentDocument()
         self._language = documentinfo.docinfo(doc).language() or 'nederlands'
         self._activenotes = 0
+        self._chord = None
+        self._chordtime = None
+        self._pending.stop()
         self._listener.start()
 
     def capturestop(self):
         self._listener.stop()
         if not self._listener.isFinished():
             self._listener.wait()
+        if self._pending.isActive():
+            self._pending.stop()
+            self.outputchord()
         self._activenotes = 0
         self.close()
 
@@ -81,7 +94,52 @@ class MidiIn(object):
         if isinstance(event, midifile.event.NoteEvent):
             self.noteevent(event.type, event.channel, event.note, event.value)
 
-    def noteevent(self, notetype, channel, notenumber, value):
+    def analyzeevents(self, events):
+        """Handle a batch of (timestamp, NoteEvent) tuples from the Listener.
+
+        The timestamps (in ms of the PortMidi timer) are used to keep a
+        chord open when all keys are released and a new key is pressed
+        within chord_threshold ms of the last key of the chord, which happens
+        when a chord is played fast and the keys do not overlap.
+
+        If the chord is released by the last event of a batch, it is kept
+        pending: the next batch may start with a key that still belongs to
+        it. When no such batch arrives in time, a timer outputs the chord.
+
+        """
+        if self._pending.isActive():
+            self._pending.stop()
+            if not self.continueschord(*events[0]):
+                self.outputchord()
+        last = len(events) - 1
+        for i, (timestamp, event) in enumerate(events):
+            release = self.noteevent(event.type, event.channel, event.note, event.value, timestamp)
+            if release:
+                if i < last:
+                    if not self.continueschord(*events[i+1]):
+                        self.outputchord()
+                else:
+                    # wait for the next batch, the listener may have read
+                    # this one before the next key arrived
+                    self._pending.start(self.chord_threshold + self._pollingtime)
+
+    def continueschord(self, timestamp, event):
+        """Return True if the (timestamp, event) continues a released chord.
+
+        This is the case if it presses a key within chord_threshold ms of the
+        last key pressed in the chord.
+
+        """
+        return (event.type == 9 and event.value > 0 and self._chordtime is not None
+                and timestamp - self._chordtime <= self.chord_threshold)
+
+    def noteevent(self, notetype, channel, notenumber, value, timestamp=None):
+        """Handle a note event.
+
+        Returns True if the last held note of a chord was released; the chord
+        is then output by analyzeevents() (or immediately if timestamp is None).
+
+        """
         targetchannel = self.widget().channel()
         if targetchannel == 0 or channel == targetchannel-1: # '0' captures all
             # midi channels start at 1 for humans and 0 for programs
@@ -92,16 +150,25 @@ class MidiIn(object):
                     if not self._chord:    # no Chord instance?
                         self._chord = elements.Chord()
                     self._chord.add(note)
+                    self._chordtime = timestamp
                     self._activenotes += 1
                 else:
                     self.printwithspace(note.output(self.widget().relativemode(), self._language))
             elif (notetype == 8 or (notetype == 9 and value == 0)) and self.widget().chordmode():
                 self._activenotes -= 1
                 if self._activenotes <= 0:    # activenotes could get negative under strange conditions
-                    if self._chord:
-                        self.printwithspace(self._chord.output(self.widget().relativemode(), self._language))
                     self._activenotes = 0    # reset in case it was negative
-                    self._chord = None
+                    if timestamp is None:
+                        self.outputchord()
+                    else:
+                        return True
+        return False
+
+    def outputchord(self):
+        """Output the current chord (if any)."""
+        if self._chord and self._activenotes <= 0:
+            self.printwithspace(self._chord.output(self.widget().relativemode(), self._language))
+        self._chord = None
 
     def printwithspace(self, text):
         cursor = self.widget().mainwindow().textCursor()
@@ -114,32 +181,60 @@ class MidiIn(object):
             cursor.insertText(' ' +  text)
 
 class Listener(QThread):
-    NoteEventSignal = pyqtSignal(midifile.event.NoteEvent)
+    """Reads MIDI events from a PortMidi input in a background thread.
+
+    All events waiting in the PortMidi buffer are read at once and the note
+    events are emitted together in NoteEventsSignal, as a list of
+    (timestamp, NoteEvent) tuples, where timestamp is the PortMidi time in ms.
+
+    The input only needs poll() and read(num_events) methods, read() returning
+    a list of ((status, data1, data2, data3), timestamp) tuples, like
+    portmidi.Input.
+
+    While notes are coming in, the input is checked every millisecond; after
+    idle_time ms without events the listener falls back to checking every
+    pollingtime ms.
+
+    """
+    NoteEventsSignal = pyqtSignal(list)
+
+    read_size = 256     # maximum number of events read at once
+    idle_time = 1000    # ms after the last event before slowing down
+
     def __init__(self, portmidiinput, pollingtime):
         QThread.__init__(self)
         self._portmidiinput = portmidiinput
         self._pollingtime = pollingtime
+        self._stop = threading.Event()
 
     def run(self):
-        self._capturing = True
-        while self._capturing:
-            while not self._portmidiinput.poll():
-                time.sleep(self._pollingtime/1000.)
-                if not self._capturing:
+        self._stop.clear()
+        poll = self._portmidiinput.poll
+        read = self._portmidiinput.read
+        NoteEvent = midifile.event.NoteEvent
+        fast = self._pollingtime > 1
+        idle = 0
+        while not self._stop.is_set():
+            if not poll():
+                if fast and idle < self.idle_time:
+                    idle += 1
+                    self._stop.wait(.001)
+                else:
+                    self._stop.wait(self._pollingtime / 1000.)
+                continue
+            idle = 0
+            events = []
+            while True:
+                data = read(self.read_size)
+                for (status, data1, data2, data3), timestamp in data:
+                    # decode note off (0x8n) and note on (0x9n) messages
+                    if 0x80 <= status < 0xA0:
+                        events.append((timestamp,
+                            NoteEvent(status >> 4, status & 0x0F, data1, data2)))
+                if len(data) < self.read_size or not poll():
                     break
-            if not self._capturing:
-                break
-            data = self._portmidiinput.read(1)
-
-            # midifile.parser.parse_midi_events is a generator which expects a long "byte string" from a file,
-            # so we feed it one. But since it's just one event, we only need the first "generated" element.
-            # First byte is time, which is unnecessary in our case, so we feed a dummy byte 77
-            # and strip output by just using [1]. 77 is chosen randomly ;)
-            s = bytearray([77, data[0][0][0], data[0][0][1], data[0][0][2], data[0][0][3]])
-            event = next(midifile.parser.parse_midi_events(s))[1]
-
-            if isinstance(event,midifile.event.NoteEvent):
-                self.NoteEventSignal.emit(event)
+            if events:
+                self.NoteEventsSignal.emit(events)
 
     def stop(self):
-        self._capturing = False
+        self._stop.set()
@@ -22,7 +22,8 @@ A widget and dialog to show an output preview of a LilyPond document.
 """
 
 
-from PyQt5.QtCore import QSize
+from PyQt5.QtCore import QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QTextCursor
 from PyQt5.QtWidgets import (QComboBox, QDialog, QDialogButtonBox, QHBoxLayout,
                              QLabel, QStackedLayout, QVBoxLayout, QWidget)
 
@@ -38,6 +39,10 @@ import widgets.progressbar
 
 
 class MusicPreviewWidget(QWidget):
+
+    # emitted when a point-and-click link is clicked
+    cursorClicked = pyqtSignal(QTextCursor)
+
     def __init__(self, parent=None):
         super(MusicPreviewWidget, self).__init__(parent)
         self._lastbuildtime = 10.0
@@ -48,6 +53,7 @@ class MusicPreviewWidget(QWidget):
         self._chooser = QComboBox(self, activated=self.selectDocument)
         self._log = log.Log()
         self._view = popplerview.View()
+        self._view.surface().linkClicked.connect(self.slotLinkClicked)
         self._progress = widgets.progressbar.TimedProgressBar()
 
         self._stack = QStackedLayout()
@@ -80,26 +86,47 @@ class MusicPreviewWidget(QWidget):
 
     def preview(self, text, title=None):
         """Runs LilyPond on the given text and shows the resulting PDF."""
-        j = self._running = job.lilypond.VolatileTextJob(text, title)
+        self.previewJob(job.lilypond.VolatileTextJob(text, title))
+
+    def previewJob(self, j):
+        """Runs the given VolatileTextJob and shows the resulting PDF.
+
+        A job that is still running is aborted, a job that is still waiting
+        in the job queue is removed from it.
+
+        """
+        self._discard()
+        j = self._running = j
         j.done.connect(self._done)
         self._log.clear()
         self._log.connectJob(j)
         app.job_queue().add_job(j, 'generic')
         self._progress.start(self._lastbuildtime)
 
+    def _discard(self):
+        """Stops the running job, if any, and removes its temporary directory."""
+        j, self._running = self._running, None
+        if j:
+            j.done.disconnect(self._done)
+            # a job that has not started yet has no process to abort
+            if not app.job_queue().remove_job(j, 'generic'):
+                j.abort()
+            j.cleanup()
+
     def _done(self, success):
         self._progress.stop(False)
-        pdfs = self._running.resultfiles()
+        j, self._running = self._running, None
+        pdfs = j.resultfiles()
         self.setDocuments(pdfs)
         if not pdfs:
             self._stack.setCurrentWidget(self._log)
+            j.cleanup()
             return
-        self._lastbuildtime = self._running.elapsed_time()
+        self._lastbuildtime = j.elapsed_time()
         self._stack.setCurrentWidget(self._view)
         if self._current:
             self._current.cleanup()
-        self._current = self._running # keep the tempdir
-        self._running = None
+        self._current = j # keep the tempdir
 
     def setDocuments(self, pdfs):
         """Loads the given PDF path names in the UI."""
@@ -119,10 +146,7 @@ class MusicPreviewWidget(QWidget):
             self._view.load(doc)
 
     def cleanup(self):
-        if self._running:
-            self._running.abort()
-            self._running.cleanup()
-            self._running = None
+        self._discard()
         if self._current:
             self._current.cleanup()
             self._current = None
@@ -130,6 +154,14 @@ class MusicPreviewWidget(QWidget):
         self._top.hide()
         self._view.clear()
 
+    def slotLinkClicked(self, ev, page, link):
+        """Called when a link is clicked, emits cursorClicked for textedit links."""
+        if ev.button() == Qt.LeftButton:
+            import musicview.pointandclick
+            cursor = musicview.pointandclick.links(page.document()).cursor(link, True)
+            if cursor:
+                self.cursorClicked.emit(cursor)
+
     def print_(self):
         """Prints the currently displayed document."""
         if self._documents:
@@ -139,11 +171,16 @@ class MusicPreviewWidget(QWidget):
 
 
 class MusicPreviewDialog(QDialog):
+
+    # emitted when a point-and-click link is clicked
+    cursorClicked = pyqtSignal(QTextCursor)
+
     def __init__(self, parent=None):
         super(MusicPreviewDialog, self).__init__(parent)
         layout = QVBoxLayout()
         self.setLayout(layout)
         self._widget = MusicPreviewWidget()
+        self._widget.cursorClicked.connect(self.cursorClicked)
         layout.addWidget(self._widget)
         layout.addWidget(widgets.Separator())
         b = QDialogButtonBox()
@@ -164,6 +201,9 @@ class MusicPreviewDialog(QDialog):
     def preview(self, text, title=None):
         self._widget.preview(text, title)
 
+    def previewJob(self, j):
+        self._widget.previewJob(j)
+
     def cleanup(self):
         self._widget.cleanup()
 
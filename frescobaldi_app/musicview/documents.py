@@ -26,7 +26,7 @@ Code to load and manage PDF documents to view.
 import os
 import weakref
 
-from PyQt5.QtCore import QByteArray, QSettings
+from PyQt5.QtCore import QByteArray
 
 try:
     import popplerqt5
@@ -36,8 +36,10 @@ except ImportError:
 import app
 import plugin
 import resultfiles
+import settingssnapshot
 import signals
 import popplertools
+import qpopplerview.cache
 
 
 _cache = weakref.WeakValueDictionary()
@@ -90,7 +92,11 @@ class Document(popplertools.Document):
     updated = True
 
     def load(self):
-        return load(self.filename())
+        document = load(self.filename())
+        if document and self._document:
+            # let unchanged pages keep their rendered images
+            qpopplerview.cache.setpredecessor(document, self._document)
+        return document
 
     if popplerqt5 is None:
         def document(self):
@@ -131,7 +137,7 @@ class DocumentGroup(plugin.DocumentPlugin):
 
         """
         if newer is None:
-            newer = QSettings().value("musicview/newer_files_only", True, bool)
+            newer = settingssnapshot.snapshot().newer_files_only
 
         results = resultfiles.results(self.document())
         files = results.files(".pdf", newer)
@@ -48,6 +48,8 @@ Finally there is an AttributePlugin class, combining the Attributes and Plugin c
 
 import weakref
 
+import startuptime
+
 _instances = weakref.WeakKeyDictionary()
 
 
@@ -81,7 +83,11 @@ class Plugin(object):
             instances = _instances.setdefault(cls, weakref.WeakKeyDictionary())
             result = instances[obj] = cls.__new__(cls, obj)
             result._parent = weakref.ref(obj)
-            result.__init__(obj)
+            if startuptime.recording:
+                with startuptime.measure("plugin", cls.__module__ + '.' + cls.__name__):
+                    result.__init__(obj)
+            else:
+                result.__init__(obj)
         return result
 
     @classmethod
@@ -23,6 +23,7 @@ Generic Point and Click handling.
 
 
 import os
+import array
 import collections
 
 from PyQt5.QtCore import QUrl
@@ -125,36 +126,89 @@ class Links(object):
 
 
 class BoundLinks(object):
-    """Stores links as QTextCursors for a document."""
+    """Stores links as a table of positions for a document.
+
+    Instead of creating a QTextCursor for every link (which Qt would have to
+    update on every keystroke), the positions are kept in a sorted table.
+    Changes to the document are recorded and applied to the table only when
+    the positions are needed again. QTextCursors are created on demand.
+
+    """
     def __init__(self, doc, links):
-        """Creates QTextCursor instances for every link, keeps a reference to the document."""
+        """Computes the position of every link, keeps a reference to the document."""
         self.document = doc
-        # make a sorted list of cursors with their [destination, ...] destinations list
-        self._cursor_dict = d = {}              # mapping from (line, col) to QTextCursor
-        self._cursors = cursors = []            # sorted list of the cursors
-        self._destinations = destinations = []  # corresponding list of destinations
+        last = doc.characterCount() - 1
+        items = []
+        block, blocknum = doc.begin(), 0
         for pos, dest in sorted(links.items()):
             line, column = pos
-            b = doc.findBlockByNumber(line - 1)
-            if b.isValid():
-                c = d[pos] = QTextCursor(doc)
-                c.setPosition(b.position() + column)
-                cursors.append(c)
-                destinations.append(dest)
+            if line - 1 != blocknum:
+                blocknum = line - 1
+                block = doc.findBlockByNumber(blocknum)
+            if block.isValid():
+                items.append((min(block.position() + column, last), pos, dest))
+        items.sort(key=lambda item: item[0])
+        self._index = dict((pos, i) for i, (p, pos, dest) in enumerate(items))
+        self._destinations = [dest for p, pos, dest in items]
+        self._positions = PositionTable(p for p, pos, dest in items)
+        self._changes = []
+        doc.contentsChange.connect(self.slotContentsChange)
+
+    def slotContentsChange(self, position, removed, added):
+        """Called when the document changes, records the change."""
+        if removed != added and self._destinations:
+            self._changes.append((position, removed, added))
+
+    def _update(self):
+        """Applies the recorded changes to the positions table."""
+        if self._changes:
+            changes, self._changes = self._changes, []
+            for position, removed, added in changes:
+                self._positions.change(position, removed, added)
+
+    def positions(self):
+        """Return the PositionTable with the current position of every link."""
+        self._update()
+        return self._positions
+
+    def position(self, line, column):
+        """Returns the current position of the link at the given line/col.
+
+        Returns None if there is no link with that line and column.
+
+        """
+        index = self._index.get((line, column))
+        if index is not None:
+            return self.positions()[index]
 
     def cursor(self, line, column):
-        """Returns the QTextCursor for the give line/col."""
-        return self._cursor_dict.get((line, column))
+        """Returns a QTextCursor for the give line/col."""
+        pos = self.position(line, column)
+        if pos is not None:
+            c = QTextCursor(self.document)
+            c.setPosition(pos)
+            return c
 
     def cursors(self):
-        """Return the list of cursors, sorted on cursor position."""
-        return self._cursors
+        """Return a list of cursors, sorted on cursor position.
+
+        The cursors are created on every call, so this is expensive for
+        documents with many links.
+
+        """
+        doc = self.document
+        cursors = []
+        for pos in self.positions():
+            c = QTextCursor(doc)
+            c.setPosition(pos)
+            cursors.append(c)
+        return cursors
 
     def destinations(self):
         """Return the list of destination lists.
 
-        Each destination corresponds with the cursor at the same index in
-        the cursors() list. Each destination is a list of destination items
+        Each destination corresponds with the position at the same index in
+        the positions() table. Each destination is a list of destination items
         that were originally added using Links.add_link, because many
         point-and-click objects can point to the same place in the text
         document.
@@ -175,24 +229,15 @@ class BoundLinks(object):
         points to the _ending_ point of a slur, beam or phrasing slur.
 
         """
-        cursors = self._cursors
-
-        def findlink(pos):
-            # binary search in list of cursors
-            lo, hi = 0, len(cursors)
-            while lo < hi:
-                mid = (lo + hi) // 2
-                if pos < cursors[mid].position():
-                    hi = mid
-                else:
-                    lo = mid + 1
-            return lo - 1
+        positions = self.positions()
+        findlink = lambda pos: positions.bisect_right(pos) - 1
+        findblock = self.document.findBlock
 
         if cursor.hasSelection():
             end = findlink(cursor.selectionEnd() - 1)
             if end >= 0:
                 start = findlink(cursor.selectionStart())
-                if start < 0 or cursors[start].position() < cursor.selectionStart():
+                if start < 0 or positions[start] < cursor.selectionStart():
                     start += 1
                 if start <= end:
                     return slice(start, end+1)
@@ -202,12 +247,13 @@ class BoundLinks(object):
         if index < 0:
             return # before all other links
 
-        cur2 = cursors[index]
-        if cur2.position() < cursor.position():
+        pos2 = positions[index]
+        if pos2 < cursor.position():
             # is the cursor at an ending token like a slur end?
             prevcol = -1
-            if cur2.block() == cursor.block():
-                prevcol = cur2.position() - cur2.block().position()
+            block2 = findblock(pos2)
+            if block2 == cursor.block():
+                prevcol = pos2 - block2.position()
             col = cursor.position() - cursor.block().position()
             found = False
             tokens = ly.document.Runner(lydocument.Document(cursor.document()))
@@ -232,14 +278,114 @@ class BoundLinks(object):
                         break
             if found:
                 index = findlink(tokens.block.position() + token.pos)
-                if index < 0 or cursors[index].block() != tokens.block:
+                if index < 0 or findblock(positions[index]) != tokens.block:
                     return
-            elif cur2.block() != cursor.block():
+            elif block2 != cursor.block():
                 return False
         # highlight it!
         return slice(index, index+1)
 
 
+class PositionTable(object):
+    """A sorted table of text positions that can be shifted efficiently.
+
+    The positions are stored as base values in an array, and a Fenwick tree
+    (binary indexed tree) holds the offsets that were added to all positions
+    from a certain index on. Reading a position and shifting all positions
+    after an index both take O(log n) time.
+
+    """
+    def __init__(self, positions=()):
+        self._base = array.array('q', positions)
+        self._tree = array.array('q', [0]) * (len(self._base) + 1)
+
+    def __len__(self):
+        return len(self._base)
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self._base)
+        total = self._base[index]
+        tree = self._tree
+        i = index + 1
+        while i > 0:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def __iter__(self):
+        offset = 0
+        for i, base in enumerate(self._base):
+            offset += self._shift_at(i)
+            yield base + offset
+
+    def _shift_at(self, index):
+        """Return the amount all positions from index on were shifted by."""
+        tree = self._tree
+        i = index + 1
+        total = tree[i]
+        parent = i - (i & -i)
+        i -= 1
+        while i != parent:
+            total -= tree[i]
+            i -= i & -i
+        return total
+
+    def shift(self, index, delta):
+        """Adds delta to all positions from index on."""
+        tree = self._tree
+        i = index + 1
+        n = len(tree)
+        while i < n:
+            tree[i] += delta
+            i += i & -i
+
+    def set(self, index, position):
+        """Sets the position at index. The table must remain sorted."""
+        self._base[index] += position - self[index]
+
+    def bisect_left(self, position):
+        """Return the index of the first position >= position."""
+        lo, hi = 0, len(self._base)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self[mid] < position:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def bisect_right(self, position):
+        """Return the index of the first position > position."""
+        lo, hi = 0, len(self._base)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if position < self[mid]:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def change(self, position, removed, added):
+        """Adjusts the positions for a change in the text.
+
+        The arguments are those of the QTextDocument.contentsChange signal.
+        Like a QTextCursor, positions after the change are moved and a
+        position where text is inserted moves along with the inserted text.
+        Positions inside a replaced range are interpolated, because the
+        signal does not tell where exactly the text changed in that range.
+
+        """
+        if removed == added:
+            return
+        start = self.bisect_left(position)
+        end = self.bisect_left(position + removed)
+        for i in range(start, end):
+            self.set(i, position + (self[i] - position) * added // removed)
+        if end < len(self._base):
+            self.shift(end, added - removed)
+
+
 def positions(cursor):
     """Return a list of QTextCursors describing the grob the cursor points at.
 
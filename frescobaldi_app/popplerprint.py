@@ -41,6 +41,7 @@ from PyQt5.QtPrintSupport import QPrinter, QPrintDialog
 import app
 import helpers
 import fileprinter
+import popplertools
 import qpopplerview.printer
 
 
@@ -142,6 +143,10 @@ def print_(doc, filename=None, widget=None):
         p.setDocument(doc)
         p.setPrinter(printer)
         p.setResolution(resolution)
+        if filename:
+            # let every render thread load its own copy of the document,
+            # so that pages can be rendered in parallel
+            p.setDocumentLoader(lambda: popplertools.Document(filename).load())
 
         d = QProgressDialog()
         d.setModal(True)
@@ -158,7 +163,11 @@ def print_(doc, filename=None, widget=None):
             p.deleteLater()
             d.deleteLater()
             d.hide()
-            if not p.success and not p.aborted():
+            if p.error():
+                QMessageBox.warning(widget, _("Printing Error"),
+                    _("Could not render the document for printing: {message}").format(
+                        message=p.error()))
+            elif not p.success and not p.aborted():
                 QMessageBox.warning(widget, _("Printing Error"),
                     _("Could not send the document to the printer."))
 
@@ -85,6 +85,15 @@ class LogTool(preferences.Group):
         self.hideauto = QCheckBox(toggled=self.changed)
         layout.addWidget(self.hideauto)
 
+        self.historyLimitLabel = QLabel()
+        self.historyLimit = QSpinBox(valueChanged=self.changed)
+        self.historyLimit.setRange(1, 1024)
+        box = QHBoxLayout()
+        box.addWidget(self.historyLimitLabel)
+        box.addWidget(self.historyLimit)
+        box.addStretch(1)
+        layout.addLayout(box)
+
         app.translateUI(self)
 
     def translateUI(self):
@@ -98,6 +107,12 @@ class LogTool(preferences.Group):
         self.hideauto.setToolTip(_(
             "If checked, Frescobaldi will not show the log for automatically\n"
             "started engraving jobs (LilyPond->Auto-engrave)."))
+        self.historyLimitLabel.setText(_("Keep at most:"))
+        self.historyLimitLabel.setToolTip(_(
+            "The amount of output that is kept for every LilyPond job.\n"
+            "If a job writes more output, the oldest output is discarded."))
+        # L10N: as in "8 MB", appended after number in spinbox, note the leading space
+        self.historyLimit.setSuffix(_(" MB"))
 
     def loadSettings(self):
         s = QSettings()
@@ -110,6 +125,8 @@ class LogTool(preferences.Group):
         self.showlog.setChecked(s.value("show_on_start", True, bool))
         self.rawview.setChecked(s.value("rawview", True, bool))
         self.hideauto.setChecked(s.value("hide_auto_engrave", False, bool))
+        with qutil.signalsBlocked(self.historyLimit):
+            self.historyLimit.setValue(s.value("history_limit", 8, int))
 
     def saveSettings(self):
         s = QSettings()
@@ -119,6 +136,7 @@ class LogTool(preferences.Group):
         s.setValue("show_on_start", self.showlog.isChecked())
         s.setValue("rawview", self.rawview.isChecked())
         s.setValue("hide_auto_engrave", self.hideauto.isChecked())
+        s.setValue("history_limit", self.historyLimit.value())
 
 
 class MusicView(preferences.Group):
@@ -71,7 +71,7 @@ class ProgressBar(plugin.ViewSpacePlugin):
             self.showProgress(document)
 
     def jobFinished(self, document, j, success):
-        if document == self.viewSpace().document():
+        if document == self.viewSpace().document() and j is job.manager.job(document):
             self._bar.stop(success and not job.attributes.get(j).hidden)
             if success:
                 metainfo.info(document).buildtime = j.elapsed_time()
@@ -242,7 +242,7 @@ class PageLayout(AbstractPageLayout):
             width = max((p.width for p in self), default=0) + self.margin * 2
             top = self.margin
             for page in self:
-                page.x = (width - page.width) / 2
+                page.x = (width - page.width) // 2
                 page.y = top
                 top += page.height + self.spacing
         else:
@@ -250,7 +250,7 @@ class PageLayout(AbstractPageLayout):
             left = self.margin
             for page in self:
                 page.x = left
-                page.y = (height - page.height) / 2
+                page.y = (height - page.height) // 2
                 left += page.width + self.spacing
 
 
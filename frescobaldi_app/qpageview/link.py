@@ -0,0 +1,73 @@
+# This file is part of the qpageview package.
+#
+# Copyright (c) 2016 - 2016 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Generic Link class and a spatial index of the links on a Page.
+"""
+
+import collections
+import operator
+
+from PyQt5.QtCore import QRectF
+
+import rectangles
+
+
+Area = collections.namedtuple("Area", "left top right bottom")
+
+
+class Link:
+    """A link on a Page.
+
+    The area is an Area four-tuple (left, top, right, bottom), with coordinates
+    in the range 0.0 to 1.0, relative to the size of the (unrotated) page.
+
+    """
+    url = ""
+
+    def __init__(self, left, top, right, bottom, url=None):
+        self.area = Area(left, top, right, bottom)
+        if url:
+            self.url = url
+
+    def rect(self):
+        """Return the area as a QRectF."""
+        left, top, right, bottom = self.area
+        return QRectF(left, top, right - left, bottom - top)
+
+    def width(self):
+        """Return the width of the area."""
+        return self.area.right - self.area.left
+
+
+class Links(rectangles.Rectangles):
+    """Manages a list of Link objects, finding them quickly by position.
+
+    The coordinates are those of the Link areas, in the range 0.0 to 1.0.
+
+    """
+    _func = staticmethod(operator.attrgetter("area"))
+
+    def __iter__(self):
+        """Iterate over the links, in no particular order."""
+        return iter(self._items)
+
+    def at(self, x, y):
+        """Return a list of the links at the point, the smallest one first."""
+        return sorted(super().at(x, y) or (), key=Link.width)
@@ -33,6 +33,8 @@ from .constants import (
     Rotate_270,
 )
 
+from . import link
+
 
 class AbstractPage:
     """A Page is a rectangle that is positioned in a PageLayout.
@@ -204,6 +206,49 @@ class AbstractPage:
         """
         self.renderer and self.renderer.paint(self, painter, rect, callback)
 
+    def links(self):
+        """Return a Links object with the links on this page.
+
+        By default an empty Links object is returned.
+
+        """
+        return link.Links()
+
+    def linksAt(self, point):
+        """Return a list() of zero or more links touched by point.
+
+        The point is relative to the layout, like our rect(). The list is
+        sorted with the smallest link area first.
+
+        """
+        point = point - self.pos()
+        x = point.x() / self.width
+        y = point.y() / self.height
+        # rotate
+        if self.computedRotation == Rotate_90:
+            x, y = y, 1-x
+        elif self.computedRotation == Rotate_180:
+            x, y = 1-x, 1-y
+        elif self.computedRotation == Rotate_270:
+            x, y = 1-y, x
+        return self.links().at(x, y)
+
+    def linkRect(self, area):
+        """Return a QRect encompassing the area (of a link), relative to the layout."""
+        left, top, right, bottom = area
+        # rotate
+        if self.computedRotation == Rotate_90:
+            left, top, right, bottom = 1-bottom, left, 1-top, right
+        elif self.computedRotation == Rotate_180:
+            left, top, right, bottom = 1-right, 1-bottom, 1-left, 1-top
+        elif self.computedRotation == Rotate_270:
+            left, top, right, bottom = top, 1-right, bottom, 1-left
+        rect = QRect()
+        rect.setCoords(round(left * self.width), round(top * self.height),
+                       round(right * self.width), round(bottom * self.height))
+        rect.translate(self.pos())
+        return rect
+
     def mutex(self):
         """Return an object that should be locked when rendering the page.
 
@@ -20,9 +20,18 @@
 """
 A page that can display a SVG document.
 
+The links (``<a xlink:href="...">`` elements) in a SVG document are found
+when it is loaded, and are available via the links() method of the page.
+The translateAnchors() function can move the contents of those elements.
+
 """
 
-from PyQt5.QtCore import QPoint, QPointF, QRect, QRectF, QSize, QSizeF, Qt
+import re
+import xml.sax.saxutils
+
+from PyQt5.QtCore import (
+    QByteArray, QCoreApplication, QPoint, QPointF, QRect, QRectF, QSize,
+    QSizeF, Qt, QThread)
 from PyQt5.QtGui import QColor,QImage, QPainter
 from PyQt5.QtSvg import QSvgRenderer
 
@@ -33,25 +42,166 @@ from .constants import (
     Rotate_270,
 )
 
+from . import link
 from . import page
 from . import render
 
 
+# finds the start and end tags of <a> elements
+_anchor_re = re.compile(rb'<a\b([^>]*)>|</a\s*>')
+_href_re = re.compile(rb'\bxlink:href\s*=\s*"([^"]*)"')
+
+
+def prepareLinks(data):
+    """Find the anchor elements in the SVG data (bytes).
+
+    Returns a tuple (data, links). QSvgRenderer does not register the id of
+    <a> elements, so the contents of every anchor are wrapped in a group
+    with a generated id, so their position can be looked up in a QSvgRenderer.
+    links is a list of (number, url) tuples, where number is the number of
+    the anchor in the document, see anchorId().
+
+    """
+    links = []
+    count = 0
+    def anchor(m):
+        nonlocal count
+        attrs = m.group(1)
+        if attrs is None:
+            return b'</g></a>'
+        elif attrs.endswith(b'/'):
+            return m.group()    # empty element
+        number = count
+        count += 1
+        href = _href_re.search(attrs)
+        if href:
+            url = xml.sax.saxutils.unescape(href.group(1).decode('utf-8', 'replace'),
+                                            {"&quot;": '"', "&apos;": "'"})
+            links.append((number, url))
+        return m.group() + b'<g id="' + anchorId(number).encode() + b'">'
+    data = _anchor_re.sub(anchor, data)
+    return data, links
+
+
+def anchorId(number):
+    """Return the id prepareLinks() gives to the contents of an anchor."""
+    return "qpageview-link-{0}".format(number)
+
+
+def translateAnchors(data, offsets):
+    """Return the SVG data (bytes) with the contents of anchors moved.
+
+    offsets is a dictionary mapping the number of an anchor (see SvgLink) to
+    an (x, y) offset in SVG units. The contents of those anchors are wrapped
+    in a group with a translate transform.
+
+    """
+    count = 0
+    moved = False
+    def anchor(m):
+        nonlocal count, moved
+        attrs = m.group(1)
+        if attrs is None:
+            if moved:
+                moved = False
+                return b'</g>' + m.group()
+            return m.group()
+        elif attrs.endswith(b'/'):
+            return m.group()    # empty element
+        offset = offsets.get(count)
+        count += 1
+        if offset:
+            moved = True
+            return m.group() + '<g transform="translate({0:.4f}, {1:.4f})">'.format(
+                *offset).encode()
+        return m.group()
+    return _anchor_re.sub(anchor, data)
+
+
+class SvgLink(link.Link):
+    """A Link in a SVG document.
+
+    The anchor attribute is the number of the ``<a>`` element in the
+    document, counting all non-empty anchors.
+
+    """
+    def __init__(self, left, top, right, bottom, url, anchor):
+        super().__init__(left, top, right, bottom, url)
+        self.anchor = anchor
+
+
 class BasicSvgPage(page.AbstractPage):
     """A page that can display a SVG document."""
     def __init__(self, load_file=None):
+        super().__init__()
         self._svg_r = QSvgRenderer()
+        self._links = link.Links()
+        self.filename = None
         if load_file:
             self.load(load_file)
 
     def load(self, load_file):
-        """Load filename or QByteArray."""
-        success = self._svg_r.load(load_file)
+        """Load filename or QByteArray.
+
+        If a filename is given, it is kept in the filename attribute.
+
+        """
+        if isinstance(load_file, str):
+            try:
+                with open(load_file, 'rb') as f:
+                    data = f.read()
+            except (IOError, OSError):
+                return False
+        else:
+            data = bytes(load_file)
+        data, links = prepareLinks(data)
+        success = self._svg_r.load(QByteArray(data))
         if success:
             self.pageWidth = self._svg_r.defaultSize().width()
             self.pageHeight = self._svg_r.defaultSize().height()
+            self._links = self._findLinks(links)
+            if isinstance(load_file, str):
+                self.filename = load_file
         return success
 
+    def _findLinks(self, links):
+        """(Internal) Return a Links object for the list of (number, url) tuples."""
+        r = self._svg_r
+        box = r.viewBoxF()
+        if box.isEmpty():
+            return link.Links()
+        left, top, width, height = box.x(), box.y(), box.width(), box.height()
+        # Qt 5.15 renamed matrixForElement()
+        transform = getattr(r, 'transformForElement', None) or r.matrixForElement
+        result = []
+        for number, url in links:
+            id = anchorId(number)
+            rect = transform(id).mapRect(r.boundsOnElement(id))
+            if not rect.isEmpty():
+                result.append(SvgLink(
+                    (rect.left() - left) / width,
+                    (rect.top() - top) / height,
+                    (rect.right() - left) / width,
+                    (rect.bottom() - top) / height,
+                    url, number))
+        return link.Links(result)
+
+    def links(self):
+        """Return the Links object with the links in the SVG document."""
+        return self._links
+
+    def viewBox(self):
+        """Return the viewBox of the SVG document as a QRectF.
+
+        This can be used to convert distances on the page to SVG units.
+
+        """
+        return self._svg_r.viewBoxF()
+
+    def mutex(self):
+        """The QSvgRenderer can't render from two threads at the same time."""
+        return self._svg_r
+
     def paint(self, painter, rect, callback=None):
         painter.fillRect(rect, self.paperColor or QColor(Qt.white))
         page = QRect(0, 0, self.width, self.height)
@@ -74,6 +224,32 @@ class SvgPage(BasicSvgPage):
         self.renderer.paint(self, painter, rect, callback)
 
 
+class Loader(QThread):
+    """Loads SVG files in a background thread.
+
+    Parsing large SVG documents takes time, so this thread creates the SvgPage
+    instances. When it has finished, the pages attribute contains a page for
+    every file that could be loaded.
+
+    """
+    def __init__(self, filenames, renderer=None):
+        super().__init__()
+        self.filenames = list(filenames)
+        self.renderer = renderer
+        self.pages = []
+
+    def run(self):
+        thread = QCoreApplication.instance().thread()
+        for filename in self.filenames:
+            if self.isInterruptionRequested():
+                break
+            p = SvgPage(None, self.renderer)
+            if p.load(filename):
+                # the QSvgRenderer should live in the main thread
+                p._svg_r.moveToThread(thread)
+                self.pages.append(p)
+
+
 class Renderer(render.AbstractImageRenderer):
     """Render SVG pages.
 
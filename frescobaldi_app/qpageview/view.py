@@ -21,10 +21,12 @@
 The View, deriving from QAbstractScrollArea.
 """
 
+import collections
 import contextlib
+import weakref
 
-from PyQt5.QtCore import pyqtSignal, QPoint, QSize, Qt
-from PyQt5.QtGui import QPainter, QPalette
+from PyQt5.QtCore import pyqtSignal, QPoint, QSize, Qt, QTimer
+from PyQt5.QtGui import QPainter, QPalette, QRegion
 from PyQt5.QtWidgets import QStyle
 
 from . import layout
@@ -65,6 +67,7 @@ class View(scrollarea.ScrollArea):
         self._pageLayout = layout.PageLayout()
         self._magnifier = None
         self._rubberband = None
+        self._highlights = weakref.WeakKeyDictionary()
         self.viewport().setBackgroundRole(QPalette.Dark)
         self.verticalScrollBar().setSingleStep(20)
         self.horizontalScrollBar().setSingleStep(20)
@@ -345,9 +348,9 @@ class View(scrollarea.ScrollArea):
         else:
             viewport = self.viewport()
             vbar.setRange(0, layout.height - viewport.height())
-            vbar.setPageStep(viewport.height() * .9)
+            vbar.setPageStep(int(viewport.height() * .9))
             hbar.setRange(0, layout.width - viewport.width())
-            hbar.setPageStep(viewport.width() * .9)
+            hbar.setPageStep(int(viewport.width() * .9))
 
     def layoutPosition(self):
         """Return the position of the PageLayout relative to the viewport.
@@ -388,6 +391,45 @@ class View(scrollarea.ScrollArea):
         else:
             self._updateScrollBars()
 
+    def highlight(self, highlighter, areas, msec=0):
+        """Highlight the list of areas using the given highlighter.
+
+        Every area is a two-tuple (page, area), where area is a four-tuple
+        (left, top, right, bottom) inside (0, 0, 1, 1), like the area of a Link.
+        If msec > 0, the highlighting is removed after that many milliseconds.
+
+        """
+        d = collections.defaultdict(list)
+        for page, area in areas:
+            d[page].append(area)
+        d = weakref.WeakKeyDictionary(d)
+        if msec:
+            def clear(selfref=weakref.ref(self)):
+                self = selfref()
+                if self:
+                    self.clearHighlight(highlighter)
+            t = QTimer(singleShot = True, timeout = clear)
+            t.start(msec)
+        else:
+            t = None
+        self.clearHighlight(highlighter)
+        self._highlights[highlighter] = (d, t)
+        self._updatePages(d)
+
+    def clearHighlight(self, highlighter):
+        """Remove the highlighted areas of the given highlighter."""
+        try:
+            (d, t) = self._highlights[highlighter]
+        except KeyError:
+            return
+        del self._highlights[highlighter]
+        self._updatePages(d)
+
+    def _updatePages(self, pages):
+        """(Internal) Schedule a repaint of the specified pages."""
+        pos = self.layoutPosition()
+        self.viewport().update(sum((page.rect().translated(pos) for page in pages), QRegion()))
+
     def repaintPage(self, page):
         """Call this when you want to redraw the specified page."""
         rect = page.rect().translated(self.layoutPosition())
@@ -409,7 +451,14 @@ class View(scrollarea.ScrollArea):
             p.paint(painter, rect, self.repaintPage)
             painter.restore()
 
-        # TODO paint highlighting
+        # paint the highlighting
+        painter.translate(layout_pos)
+        for highlighter, (d, t) in self._highlights.items():
+            rects = [page.linkRect(area)
+                     for page in pages_to_paint if page in d
+                     for area in d[page]]
+            if rects:
+                highlighter.paintRects(painter, rects)
 
         # remove pending render jobs for pages that were visible, but are not
         # visible now
@@ -20,8 +20,19 @@
 
 """
 Caching of generated images.
+
+When a document is replaced by a newer version of the same file (e.g. after
+re-engraving), call setpredecessor(). Pages of the new document that look
+exactly the same as a page of the old one then take over the images that were
+already rendered, instead of being rendered again.
+
+Pages are only fingerprinted when the document has a predecessor; the pages
+of the predecessor are fingerprinted when the successor needs them, so
+documents that are never replaced do not pay for it.
+
 """
 
+import hashlib
 import time
 import weakref
 
@@ -33,17 +44,24 @@ except ImportError:
 from PyQt5.QtCore import Qt, QThread
 from PyQt5.QtGui import QImage, QPainter, QFont
 
+import rectangles
+
 from . import render
-from . import rectangles
 from .locking import lock
 
-__all__ = ['maxsize', 'setmaxsize', 'image', 'generate', 'clear', 'links', 'options']
+__all__ = ['maxsize', 'setmaxsize', 'image', 'generate', 'clear', 'links', 'options',
+           'setpredecessor']
 
 
 _cache = weakref.WeakKeyDictionary()
 _schedulers = weakref.WeakKeyDictionary()
 _options = weakref.WeakKeyDictionary()
 _links = weakref.WeakKeyDictionary()
+_fingerprints = weakref.WeakKeyDictionary()     # document: {pageNumber: fingerprint}
+_predecessors = weakref.WeakKeyDictionary()     # document: older document
+
+# resolution of the rendering used to fingerprint a page
+_fingerprint_resolution = 36
 
 
 # cache size
@@ -160,6 +178,99 @@ def purge():
         del _cache[document][pageKey][sizeKey]
 
 
+def setpredecessor(document, predecessor):
+    """Tells that document is a newer version of the predecessor document.
+
+    When a page of the document is rendered, and a page of the predecessor
+    has the same fingerprint, the images of that page are moved over.
+
+    A reference to the predecessor is kept as long as the document lives, or
+    until another document is set as the successor of the document.
+
+    """
+    if document is predecessor:
+        return
+    # do not build a chain of old documents
+    try:
+        del _predecessors[predecessor]
+    except KeyError:
+        pass
+    _predecessors[document] = predecessor
+
+
+def fingerprint(document, pageNumber):
+    """(Internal) Returns a fingerprint and the list of links of a page.
+
+    The fingerprint is computed from the page size, the text boxes, the link
+    areas and a low-resolution rendering of the page. The links do not
+    contribute their destinations, because point-and-click links point to the
+    source lines, which shift when the source is edited above the music.
+
+    Must be called with the document locked.
+
+    """
+    page = document.page(pageNumber)
+    h = hashlib.sha1()
+    size = page.pageSizeF()
+    h.update(repr((size.width(), size.height())).encode())
+    for box in page.textList():
+        h.update(repr((box.text(), box.boundingBox().getCoords())).encode())
+    links = page.links()
+    for link in links:
+        h.update(repr(link.linkArea().normalized().getCoords()).encode())
+    options().write(document)
+    options(document).write(document)
+    image = page.renderToImage(_fingerprint_resolution, _fingerprint_resolution)
+    if not image.isNull():
+        h.update(image.constBits().asstring(image.byteCount()))
+    return h.digest(), links
+
+
+def reusable(document, rotation, width, height):
+    """(Internal) Returns the reusable images of the predecessor of the document.
+
+    The returned dictionary maps the numbers of the pages of the predecessor
+    that have a cached image with the given rotation and size to a
+    (fingerprint, image) tuple. The fingerprint is None if it has not been
+    computed yet.
+
+    """
+    try:
+        old = _predecessors[document]
+        pages = _cache[old]
+    except KeyError:
+        return {}
+    fingerprints = _fingerprints.get(old, {})
+    result = {}
+    for (pageNumber, r), sizes in pages.items():
+        if r == rotation and (width, height) in sizes:
+            result[pageNumber] = (fingerprints.get(pageNumber), sizes[(width, height)][0])
+    return result
+
+
+def takeover(document, pageNumber, fingerprint):
+    """(Internal) Moves the images of a page with the fingerprint from the predecessor.
+
+    Images of all sizes and rotations are moved, without altering the cache size.
+
+    """
+    try:
+        old = _predecessors[document]
+        fingerprints = _fingerprints[old]
+    except KeyError:
+        return
+    for oldNumber, fp in fingerprints.items():
+        if fp == fingerprint:
+            oldcache = _cache.get(old, {})
+            newcache = _cache.setdefault(document, {})
+            for (number, rotation) in list(oldcache):
+                if number == oldNumber:
+                    sizes = oldcache.pop((number, rotation))
+                    newcache.setdefault((pageNumber, rotation), {}).update(sizes)
+            del fingerprints[oldNumber]
+            return
+
+
 def links(page):
     """Returns a position-searchable list of the links in the page."""
     document, pageNumber = page.document(), page.pageNumber()
@@ -276,10 +387,20 @@ class Runner(QThread):
         self.job = job
         self.document = document # keep reference now so that it does not die during this thread
         self.finished.connect(self.slotFinished)
+        self.predecessor = _predecessors.get(document)
+        self.fingerprint = None
+        self.fingerprints = {}  # fingerprints computed for the predecessor
+        self.links = None
+        if self.predecessor is not None:
+            self.fingerprint = _fingerprints.get(document, {}).get(job.pageNumber)
+            self.reusable = reusable(document, job.rotation, job.width, job.height)
         self.start()
 
     def run(self):
         """Main method of this thread, called by Qt on start()."""
+        if self.predecessor is not None and self.reuse():
+            return
+
         page = self.document.page(self.job.pageNumber)
         pageSize = page.pageSize()
         if self.job.rotation & 1:
@@ -303,9 +424,48 @@ class Runner(QThread):
         elif multiplier == 2:
             self.image = self.image.scaledToWidth(self.job.width, Qt.SmoothTransformation)
 
+    def reuse(self):
+        """Looks for an image of the same page in the predecessor.
+
+        Returns True if one was found, it is then used as our image.
+        Pages of the predecessor are fingerprinted as far as needed, starting
+        with the page with the same number, which is the most likely to be
+        unchanged.
+
+        """
+        if self.fingerprint is None:
+            with lock(self.document):
+                self.fingerprint, self.links = fingerprint(self.document, self.job.pageNumber)
+        for pageNumber in sorted(self.reusable, key=lambda n: n != self.job.pageNumber):
+            fp, image = self.reusable[pageNumber]
+            if fp is None:
+                with lock(self.predecessor):
+                    fp = fingerprint(self.predecessor, pageNumber)[0]
+                self.fingerprints[pageNumber] = fp
+            if fp == self.fingerprint:
+                self.image = image
+                return True
+        return False
+
     def slotFinished(self):
         """Called when the thread has completed."""
-        add(self.image, self.document, self.job.pageNumber, self.job.rotation, self.job.width, self.job.height)
+        if self.predecessor is not None:
+            _fingerprints.setdefault(self.predecessor, {}).update(self.fingerprints)
+            fingerprints = _fingerprints.setdefault(self.document, {})
+            if self.job.pageNumber not in fingerprints:
+                fingerprints[self.job.pageNumber] = self.fingerprint
+                if self.links is not None:
+                    _links.setdefault(self.document, {}).setdefault(self.job.pageNumber,
+                        rectangles.Rectangles(self.links,
+                            lambda link: link.linkArea().normalized().getCoords()))
+                takeover(self.document, self.job.pageNumber, self.fingerprint)
+        try:
+            # an image may have been taken over from the predecessor
+            entry = _cache[self.document][(self.job.pageNumber, self.job.rotation)][(self.job.width, self.job.height)]
+        except KeyError:
+            add(self.image, self.document, self.job.pageNumber, self.job.rotation, self.job.width, self.job.height)
+        else:
+            entry[1] = time.time()
         self.scheduler.done(self.job)
         self.scheduler.checkStart()
 
@@ -22,6 +22,9 @@
 Printing functionality.
 """
 
+import os
+import threading
+
 from PyQt5.QtCore import QFile, QIODevice, Qt
 from PyQt5.QtGui import QColor, QPainter
 from PyQt5.QtPrintSupport import QPrinter
@@ -85,12 +88,21 @@ class Printer(object):
     does not work correctly in all cases and is not well supported by
     the Poppler developers at this time.
 
+    The pages are rendered by a pool of worker threads, ahead of painting
+    them to the printer. As a Poppler.Document can only render one page at a
+    time, the workers can only render in parallel if a document loader is
+    set (see setDocumentLoader()), so that every worker has its own copy.
+
     """
     def __init__(self):
         self._stop = False
+        self._error = None
         self._resolution = 300
         self._document = None
+        self._documentLoader = None
         self._printer = None
+        self._renderThreads = min(4, os.cpu_count() or 1)
+        self._memoryLimit = 512 << 20
         opts = render.RenderOptions()
         opts.setRenderHint(0)
         opts.setPaperColor(QColor(Qt.white))
@@ -104,6 +116,45 @@ class Printer(object):
         """Returns the previously set Poppler.Document."""
         return self._document
 
+    def setDocumentLoader(self, loader):
+        """Sets a callable that loads and returns a copy of the Poppler.Document.
+
+        Every render thread calls the loader to get its own document, so
+        the threads can render in parallel. If the loader returns None, the
+        thread uses the document set with setDocument().
+
+        """
+        self._documentLoader = loader
+
+    def documentLoader(self):
+        """Returns the document loader, None by default."""
+        return self._documentLoader
+
+    def setRenderThreads(self, count):
+        """Sets the number of threads that render pages (at least 1)."""
+        self._renderThreads = max(1, count)
+
+    def renderThreads(self):
+        """Returns the number of threads that render pages.
+
+        By default the number of processors, but at most 4.
+
+        """
+        return self._renderThreads
+
+    def setMemoryLimit(self, limit):
+        """Sets the amount of memory (in bytes) rendered pages may use.
+
+        This determines how many pages are rendered ahead. Two pages are
+        always allowed. The default is 512 MB.
+
+        """
+        self._memoryLimit = limit
+
+    def memoryLimit(self):
+        """Returns the amount of memory (in bytes) rendered pages may use."""
+        return self._memoryLimit
+
     def setPrinter(self, printer):
         """Sets the QPrinter to print to (mandatory)."""
         self._printer = printer
@@ -147,8 +198,14 @@ class Printer(object):
         return list(pages)
 
     def print_(self):
-        """Prints the document."""
+        """Prints the document.
+
+        If a page can not be rendered, the print job is aborted, False is
+        returned and error() returns the exception.
+
+        """
         self._stop = False
+        self._error = None
         resolution = self.resolution()
         p = self.printer()
         p.setFullPage(True)
@@ -163,22 +220,37 @@ class Printer(object):
 
         total = len(pages)
 
-        opts = self.renderOptions()
         document = self.document()
-
-        for num, pageNum in enumerate(pages, 1):
-            if self._stop:
-                return p.abort()
-            self.progress(num, total, pageNum)
-            if num > 1:
-                p.newPage()
-            with lock(document):
-                opts.write(document)
-                page = document.page(pageNum - 1)
-                img = page.renderToImage(resolution, resolution)
-            rect = img.rect()
-            rect.moveCenter(center)
-            painter.drawImage(rect, img)
+        threads = self.renderThreads() if self.documentLoader() else 1
+        threads = min(threads, total)
+        # estimate the memory size of a rendered page (32 bits per pixel)
+        size = document.page(pages[0] - 1).pageSizeF() if pages else None
+        if size:
+            pagebytes = size.width() * size.height() * (resolution / 72.0) ** 2 * 4
+            queued = max(2, int(self.memoryLimit() // max(pagebytes, 1)))
+        else:
+            queued = 2
+        renderer = RenderQueue(document, self.documentLoader(), pages,
+            resolution, self.renderOptions(), threads, queued)
+        renderer.start()
+        try:
+            for num, pageNum in enumerate(pages, 1):
+                if self._stop:
+                    return p.abort()
+                self.progress(num, total, pageNum)
+                try:
+                    img = renderer.get(num - 1)
+                except Exception as e:
+                    self._error = e
+                    p.abort()
+                    return False
+                if num > 1:
+                    p.newPage()
+                rect = img.rect()
+                rect.moveCenter(center)
+                painter.drawImage(rect, img)
+        finally:
+            renderer.stop()
 
         return painter.end()
 
@@ -190,6 +262,10 @@ class Printer(object):
         """Returns whether abort() was called."""
         return self._stop
 
+    def error(self):
+        """Returns the exception that aborted the last print job, if any."""
+        return self._error
+
     def progress(self, num, total, pageNumber):
         """Called when printing a page.
 
@@ -203,3 +279,102 @@ class Printer(object):
         pass
 
 
+
+
+class RenderError(Exception):
+    """Raised when a page could not be rendered."""
+    pass
+
+
+class RenderQueue(object):
+    """Renders pages in worker threads, ahead of the painting.
+
+    Call start() to start the worker threads, get() to get the images in
+    order, and stop() when done. At most maxQueued pages are being rendered
+    or waiting to be painted at any time, limiting the memory usage.
+
+    If a worker fails to load the document or to render a page, all workers
+    stop and get() raises the exception.
+
+    """
+    def __init__(self, document, loader, pages, resolution, options,
+                 threads=1, maxQueued=2):
+        self._document = document
+        self._loader = loader
+        self._pages = pages
+        self._resolution = resolution
+        self._options = options
+        self._next = 0
+        self._images = {}
+        self._stopped = False
+        self._error = None
+        self._condition = threading.Condition()
+        self._slots = threading.Semaphore(max(maxQueued, 1))
+        self._threads = [threading.Thread(target=self._work, daemon=True)
+                         for i in range(max(threads, 1))]
+
+    def start(self):
+        """Starts the worker threads."""
+        for t in self._threads:
+            t.start()
+
+    def stop(self):
+        """Stops the worker threads and waits for them to finish."""
+        with self._condition:
+            self._stopped = True
+        for t in self._threads:
+            self._slots.release()
+        for t in self._threads:
+            t.join()
+        self._images.clear()
+
+    def get(self, index):
+        """Returns the image for the page at index in the page list.
+
+        Waits until the page is rendered. A page can only be get once.
+        Raises the exception of a failed worker, if any.
+
+        """
+        with self._condition:
+            while index not in self._images and not self._error:
+                self._condition.wait()
+            if self._error:
+                raise self._error
+            image = self._images.pop(index)
+        self._slots.release()
+        return image
+
+    def _work(self):
+        """Renders pages until all are done or stop() is called."""
+        try:
+            document = (self._loader and self._loader()) or self._document
+        except Exception as e:
+            return self._fail(e)
+        res = self._resolution
+        while True:
+            self._slots.acquire()
+            with self._condition:
+                if self._stopped or self._next >= len(self._pages):
+                    return
+                index = self._next
+                self._next += 1
+            try:
+                with lock(document):
+                    self._options.write(document)
+                    page = document.page(self._pages[index] - 1)
+                    image = page.renderToImage(res, res)
+                if image.isNull():
+                    raise RenderError("could not render page {0}".format(self._pages[index]))
+            except Exception as e:
+                return self._fail(e)
+            with self._condition:
+                self._images[index] = image
+                self._condition.notify_all()
+
+    def _fail(self, exception):
+        """Stops all workers and lets get() raise the exception."""
+        with self._condition:
+            if not self._error:
+                self._error = exception
+            self._stopped = True
+            self._condition.notify_all()
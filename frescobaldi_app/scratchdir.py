@@ -24,6 +24,8 @@ Manages a local temporary directory for a Document (e.g. unnamed or remote).
 
 import os
 
+from PyQt5.QtCore import QUrl
+
 import app
 import util
 import ly.lex
@@ -45,12 +47,15 @@ def findDocument(filename):
     Note that, unlike app.findDocument(), a filename is specified and not a url.
 
     """
-    for d in app.documents:
-        if d.url().toLocalFile() == filename:
-            return d
-        s = ScratchDir.instance(d)
-        if s.directory() and util.equal_paths(filename, s.path()):
+    if filename:
+        d = app.findDocument(QUrl.fromLocalFile(filename))
+        if d:
             return d
+        for s in list(ScratchDir.instances()):
+            if s.directory() and util.equal_paths(filename, s.path()):
+                d = s.document()
+                if d in app.documents:
+                    return d
 
 
 class ScratchDir(plugin.DocumentPlugin):
@@ -36,6 +36,7 @@ import widgets.listedit
 import widgets.urlrequester
 import sessions.manager
 import qsettings
+import settingssnapshot
 import userguide
 
 
@@ -174,6 +175,7 @@ class SessionList(widgets.listedit.ListEdit):
                 session.setValue("urls", urls)
             elif key != 'name':
                 session.setValue(key, data[key])
+        settingssnapshot.invalidate()
         self.load()
         names = sessions.sessionNames()
         if name in names:
@@ -326,6 +328,7 @@ class SessionEditor(QDialog):
         path = [i.text() for i in self.include.items() if i.flags() & Qt.ItemIsEnabled]
         settings.setValue("include-path", path)
         # more settings here
+        settingssnapshot.invalidate()
 
     def defaults(self):
         self.autosave.setChecked(True)
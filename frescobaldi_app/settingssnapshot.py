@@ -0,0 +1,125 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+A read-only snapshot of settings that are read very often.
+
+Constructing a QSettings object and reading keys from it is not cheap, and
+some settings are needed on every repaint or keystroke. The snapshot() function
+returns an immutable Snapshot with those settings already read and converted
+to the right type.
+
+The snapshot is dropped when the settings or the current session change, and
+when snippets or sessions are edited (call invalidate() after writing such
+settings). It is built again the next time it is requested.
+
+"""
+
+
+import collections
+import types
+
+from PyQt5.QtCore import QSettings
+
+import app
+import qsettings
+
+
+Snapshot = collections.namedtuple("Snapshot", (
+    "metainfo",                 # bool: whether to use stored metainfo
+    "include_path",             # tuple: the global LilyPond include path
+    "session_include_path",     # tuple: the include path incl. session paths
+    "newer_files_only",         # bool: only show PDFs newer than the source
+    "default_output_target",    # str: "pdf" or "svg"
+    "snippets",                 # Snippets tuple, see below
+))
+
+Snippets = collections.namedtuple("Snippets", (
+    "groups",       # frozenset of names of all stored snippets
+    "deleted",      # frozenset of names of deleted builtin snippets
+    "titles",       # mapping name: stored title
+    "texts",        # mapping name: stored text
+))
+
+
+_snapshot = None
+
+
+def snapshot():
+    """Return the current Snapshot, reading the settings if needed."""
+    global _snapshot
+    if _snapshot is None:
+        _snapshot = _read()
+    return _snapshot
+
+
+def invalidate(*args):
+    """Drop the current snapshot, it will be read again when requested."""
+    global _snapshot
+    _snapshot = None
+
+# be sure to drop the snapshot before other slots can request it
+app.settingsChanged.connect(invalidate, -1000)
+app.sessionChanged.connect(invalidate, -1000)
+
+
+def _read():
+    """Read all the settings and return a Snapshot."""
+    s = QSettings()
+    include_path = tuple(qsettings.get_string_list(s, "lilypond_settings/include_path"))
+    return Snapshot(
+        metainfo = s.value("metainfo", True, bool),
+        include_path = include_path,
+        session_include_path = _session_include_path(include_path),
+        newer_files_only = s.value("musicview/newer_files_only", True, bool),
+        default_output_target = s.value("lilypond_settings/default_output_target", "pdf", str),
+        snippets = _read_snippets(),
+    )
+
+
+def _session_include_path(include_path):
+    """Return the include path, with the paths of the current session, if any."""
+    import sessions
+    session_settings = sessions.currentSessionGroup()
+    if session_settings and session_settings.value("set-paths", False, bool):
+        sess_path = tuple(qsettings.get_string_list(session_settings, "include-path"))
+        if session_settings.value("repl-paths", False, bool):
+            return sess_path
+        return sess_path + include_path
+    return include_path
+
+
+def _read_snippets():
+    """Read the stored snippets."""
+    s = app.settings("snippets")
+    groups = frozenset(s.childGroups())
+    deleted, titles, texts = set(), {}, {}
+    for name in groups:
+        s.beginGroup(name)
+        if s.value("deleted"):
+            deleted.add(name)
+        title = s.value("title")
+        if title:
+            titles[name] = title
+        text = s.value("text")
+        if text:
+            texts[name] = text
+        s.endGroup()
+    return Snippets(groups, frozenset(deleted),
+        types.MappingProxyType(titles), types.MappingProxyType(texts))
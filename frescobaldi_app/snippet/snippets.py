@@ -31,6 +31,7 @@ import re
 
 import app
 import icons
+import settingssnapshot
 import symbols
 
 textvars = collections.namedtuple('textvars', 'text variables')
@@ -79,9 +80,8 @@ def settings():
 
 def names():
     """Yields the names of available builtin snippets."""
-    s = settings()
-    return set(filter(lambda name: not s.value(name+"/deleted"),
-                      itertools.chain(builtin_snippets, s.childGroups())))
+    s = settingssnapshot.snapshot().snippets
+    return set(itertools.chain(builtin_snippets, s.groups)) - s.deleted
 
 
 def title(name, fallback=True):
@@ -91,8 +91,7 @@ def title(name, fallback=True):
     available.
 
     """
-    s = settings()
-    title = s.value(name+"/title")
+    title = settingssnapshot.snapshot().snippets.titles.get(name)
     if title:
         return title
     try:
@@ -109,7 +108,7 @@ def title(name, fallback=True):
 
 def text(name):
     """Returns the full snippet text for the name, or the empty string."""
-    text = settings().value(name+"/text")
+    text = settingssnapshot.snapshot().snippets.texts.get(name)
     if text:
         return text
     try:
@@ -196,6 +195,7 @@ def delete(name):
     s.remove(name)
     if name in builtin_snippets:
         s.setValue(name+"/deleted", True)
+    settingssnapshot.invalidate()
 
 
 def name(names):
@@ -233,11 +233,13 @@ def save(name, text, title=None):
     else:
         # the snippet exactly matches the builtin, no saving needed
         s.remove(name)
+    settingssnapshot.invalidate()
 
 
 def isoriginal(name):
     """Returns True if the built-in snippet is not changed or deleted."""
-    return name in builtin_snippets and name not in settings().childGroups()
+    return (name in builtin_snippets
+            and name not in settingssnapshot.snapshot().snippets.groups)
 
 
 def expand(text):
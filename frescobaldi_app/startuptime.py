@@ -0,0 +1,123 @@
+# This file is part of the Frescobaldi project, http://www.frescobaldi.org/
+#
+# Copyright (c) 2008 - 2014 by Wilbert Berendsen
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA  02110-1301  USA
+# See http://www.gnu.org/licenses/ for more information.
+
+"""
+Measures the time Frescobaldi needs to start up.
+
+During startup the construction of panels and plugins is timed, and, if
+trace_imports() is called, also the import of every module. When Frescobaldi
+is started with the --startup-times option, a report is printed as soon as
+the main window is shown.
+
+This module should be imported as early as possible.
+"""
+
+
+import builtins
+import contextlib
+import sys
+from time import perf_counter
+
+
+_start = perf_counter()
+_times = []         # list of (kind, name, depth, milliseconds) tuples
+_depth = 0
+_import = None      # the original builtins.__import__ while tracing imports
+
+recording = True    # set to False by finish()
+
+
+@contextlib.contextmanager
+def measure(kind, name):
+    """Context manager measuring the time needed to execute its body.
+
+    kind is a short word like "import", "panel" or "plugin" and name is the
+    name of the object. Measurements nested inside others are indented in the
+    report. Does nothing if startup has finished.
+
+    """
+    global _depth
+    if not recording:
+        yield
+        return
+    index = len(_times)
+    _times.append(None)
+    _depth += 1
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        _depth -= 1
+        _times[index] = (kind, name, _depth, (perf_counter() - start) * 1000)
+
+
+def _traced_import(name, globals=None, locals=None, fromlist=(), level=0):
+    """Replacement for builtins.__import__ timing the first import of a module."""
+    if level or name in sys.modules or not recording:
+        return _import(name, globals, locals, fromlist, level)
+    with measure("import", name):
+        return _import(name, globals, locals, fromlist, level)
+
+
+def trace_imports():
+    """Start measuring the import of every module not yet loaded."""
+    global _import
+    if _import is None:
+        _import = builtins.__import__
+        builtins.__import__ = _traced_import
+
+
+def finish():
+    """Stop measuring, called when the main window is shown."""
+    global recording, _import
+    if recording:
+        recording = False
+        _times.append(("startup", "total", 0, (perf_counter() - _start) * 1000))
+    if _import is not None:
+        builtins.__import__ = _import
+        _import = None
+
+
+def times():
+    """Return the list of (kind, name, depth, milliseconds) tuples measured so far.
+
+    The list is in the order the measurements were started, so that nested
+    measurements (with a higher depth) follow the one they are contained in.
+
+    """
+    return [t for t in _times if t]
+
+
+def report(minimum=0.5):
+    """Return the measured times as a text table.
+
+    Measurements that took less than minimum milliseconds are left out.
+
+    """
+    lines = ["Startup times (ms):"]
+    for kind, name, depth, ms in times():
+        if ms >= minimum:
+            lines.append("{0:9.1f}  {1}{2} {3}".format(ms, "  " * depth, kind, name))
+    return "\n".join(lines) + "\n"
+
+
+def print_report():
+    """Finish measuring and print the report to standard error."""
+    finish()
+    sys.stderr.write(report())
@@ -19,6 +19,10 @@
 
 """
 Handles SVG files.
+
+The SVG files are loaded as qpageview pages in a background thread, and the
+loaded pages are kept until the files change, so switching documents does
+not need to load and render them again.
 """
 
 
@@ -32,17 +36,67 @@ import signals
 import job.manager
 import resultfiles
 import listmodel
+import pointandclick
+import textedit
+import util
+import qpageview.svg
 
 
 class SvgFiles(plugin.DocumentPlugin):
     def __init__(self, document):
         self._files = None
+        self._pages = None
+        self._links = None
+        self._loader = None
+        self._callbacks = []
         self.current = 0
         document.loaded.connect(self.invalidate, -100)
         job.manager.manager(document).finished.connect(self.invalidate, -100)
 
     def invalidate(self):
         self._files = None
+        self._pages = None
+        self._links = None
+        if self._loader:
+            self._loader.requestInterruption()
+            self._loader = None
+
+    def load(self, callback):
+        """Load the SVG files in the background.
+
+        When ready, callback is called with two arguments: the list of
+        qpageview pages and a Links instance with the textedit links of the
+        pages. If the files were already loaded, callback is called directly.
+
+        """
+        if self._files is None:
+            self.update()
+        if self._pages is not None:
+            callback(self._pages, self._links)
+            return
+        self._callbacks.append(callback)
+        if not self._loader:
+            self._loader = loader = qpageview.svg.Loader(self._files)
+            loader.finished.connect(lambda: self._slotLoaded(loader))
+            loader.start()
+
+    def _slotLoaded(self, loader):
+        """(Internal) Called when the background loader has finished."""
+        if loader is not self._loader:
+            return  # the files were invalidated while loading
+        self._loader = None
+        self._pages = pages = loader.pages
+        self._links = links = Links()
+        with links:
+            for num, page in enumerate(pages):
+                for link in page.links():
+                    t = textedit.link(link.url)
+                    if t:
+                        filename = util.normpath(t.filename)
+                        links.add_link(filename, t.line, t.column, (num, link.area))
+        callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(pages, links)
 
     def update(self):
         files = resultfiles.results(self.document()).files('.svg*')
@@ -74,3 +128,22 @@ class SvgFiles(plugin.DocumentPlugin):
         if self._files is None:
             self.update()
         return self._files[index]
+
+
+class Links(pointandclick.Links):
+    """Stores the textedit links of the SVG pages sorted by URL and text position.
+
+    The destinations are (page index, area) tuples.
+
+    """
+    def cursor(self, link, load=False):
+        """Returns the destination of a link as a QTextCursor of the destination document.
+
+        If load (defaulting to False) is True, the document is loaded if it is not yet loaded.
+        Returns None if the url was not valid or the document could not be loaded.
+
+        """
+        t = textedit.link(link.url)
+        if t:
+            filename = util.normpath(t.filename)
+            return super(Links, self).cursor(filename, t.line, t.column, load)
@@ -18,265 +18,347 @@
 # See http://www.gnu.org/licenses/ for more information.
 
 """
-The SVG view (a QWebView displaying a SVG file).
-
-Interaction between the SVG object and Python is done via a JavaScript bridge
-that runs inside the displayed SVG file.
-
-"""
+The SVG view, displaying the pages of a SVG document using qpageview.
 
+Textedit links are found when the SVG files are loaded (see the svgfiles
+module), hovering and clicking them works like in the Music View.
 
+Linked objects can be dragged to another place (an experimental feature used
+by the Object Editor). The moved objects are shown as highlighted rectangles
+until the edits are saved to the SVG files or discarded by reloading them.
 
+"""
 
-import os
-import sys
 
-from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, QSettings, QUrl
-from PyQt5.QtGui import QTextCharFormat, QTextCursor
-from PyQt5.QtWebKitWidgets import QWebView
+from PyQt5.QtCore import pyqtSignal, QSettings, Qt, QTimer, QUrl
+from PyQt5.QtGui import QColor, QCursor, QTextCharFormat, QTextCursor
 
 import app
-import util
-import textedit
+import qpageview
+import qpageview.highlight
+import qpageview.svg
 import textformats
 import pointandclick
-import scratchdir
+import viewhighlighter
 
 
-from . import __path__
+class View(qpageview.View):
+    """Displays SVG pages and handles the textedit links in them.
 
+    The objectStartDragging, objectDragging and objectDragged signals are
+    emitted when a linked object is dragged with the mouse (with experimental
+    features enabled), with the offset in SVG units (staff spaces).
 
-def getJsScript(filename):
-    """fetch the js file"""
-    directory = __path__[0]
-    with open(os.path.join(directory, filename), 'r') as fileObject:
-        jsValue = fileObject.read()
-    return jsValue
-
-
-class View(QWebView):
-    zoomFactorChanged = pyqtSignal(float)
+    """
     objectDragged = pyqtSignal(float, float)
     objectDragging = pyqtSignal(float, float)
     objectStartDragging = pyqtSignal(float, float)
 
     cursor = pyqtSignal(QTextCursor)
-    selectedObject = pyqtSignal(str)
-    selectedUrl = pyqtSignal(QTextCursor)
-
-    defaulturl = QUrl.fromLocalFile(os.path.join(__path__[0], 'background.html'))
 
     def __init__(self, parent):
         super(View, self).__init__(parent)
+        self._links = None
+        self._hovered = None        # (page, link) under the mouse
+        self._pressed = None        # (page, link, position) where the mouse was pressed
+        self._dragging = False
+        self._clicking_link = False
+        self._edits = {}            # page: {anchor: (link, x, y)} of moved objects
         self._highlightFormat = QTextCharFormat()
-        self.jslink = JSLink(self)
-        self.loadFinished.connect(self.svgLoaded)
-        self.mainwindow().aboutToClose.connect(self.cleanupForClose)
+        self._highlightMusicFormat = Highlighter()
+        self._editFormat = Highlighter()
+        self._highlightRange = None
+        self._highlightRemoveTimer = QTimer(singleShot=True, timeout=self.clearHighlighting)
+        self.setViewMode(qpageview.FitWidth)
         app.settingsChanged.connect(self.readSettings)
         self.readSettings()
-        self.load(self.defaulturl)
-
-    def cleanupForClose(self):
-        """Called when our mainwindow is about to close.
-
-        Disconnects the loadFinished signal to prevent a RuntimeError
-        about the QWebView already being deleted.
-
-        """
-        self.loadFinished.disconnect(self.svgLoaded)
 
     def mainwindow(self):
         return self.parent().mainwindow()
 
-    def currentSVG(self):
-        return self.parent().getCurrent()
+    def setPages(self, pages, links):
+        """Display the list of pages.
 
-    def document(self, filename, load=False):
-        """Get the document with the specified filename.
-
-        If load is True, the document is loaded if it wasn't already.
-        Also takes scratchdir into account for unnamed or non-local documents.
+        links is the pointandclick.Links object with the textedit links of
+        the pages, the destinations are (page index, area) tuples.
 
         """
-        doc = scratchdir.findDocument(filename)
-        if not doc and load:
-            doc = app.openUrl(QUrl.fromLocalFile(filename))
-        return doc
-
-    def svgLoaded(self):
-        if not self.url().isEmpty() and not self.url().path().endswith(".html"):
-            frame = self.page().mainFrame()
-            frame.addToJavaScriptWindowObject("pyLinks", self.jslink)
-            frame.evaluateJavaScript(getJsScript('pointandclick.js'))
-            #for now only editable in dev (git) or when the user explicitly allows experimental features
-            if app.is_git_controlled() or QSettings().value("experimental-features", False, bool):
-                frame.evaluateJavaScript(getJsScript('editsvg.js'))
-
-    def evalSave(self):
-        frame = self.page().mainFrame()
-        # to enable useful save of SVG edits to file uncomment the line below
-        # frame.evaluateJavaScript(getJsScript('cleansvg.js'))
-        frame.evaluateJavaScript(getJsScript('savesvg.js'))
+        self.unhover()
+        self._links = links
+        self._highlightRange = None
+        self.discardEdits()
+        self.pageLayout()[:] = pages
+        self.updatePageLayout()
+        if self.viewMode():
+            self._fitLayout()
 
     def clear(self):
         """Empty the View."""
-        self.load(self.defaulturl)
-
-    def dragElement(self, url):
-        t = textedit.link(url)
-        # Only process textedit links
-        if not t:
-            return False
-        filename = util.normpath(t.filename)
-        doc = self.document(filename, True)
-        if doc:
-            cursor = QTextCursor(doc)
-            b = doc.findBlockByNumber(t.line - 1)
-            p = b.position() + t.column
-            cursor.setPosition(p)
-        self.emitCursor(cursor)
-
-    def doObjectDragged(self, offsX, offsY):
-        """announce extra-offsets an element has been dragged to"""
-        self.objectDragged.emit(offsX, offsY)
-
-    def doObjectDragging(self, offsX, offsY):
-        """announce extra-offsets while dragging an element"""
-        self.objectDragging.emit(offsX, offsY)
-
-    def doObjectStartDragging(self, offsX, offsY):
-        """announce extra-offsets when starting to drag an element"""
-        self.objectStartDragging.emit(offsX, offsY)
-
-    def doTextEdit(self, url, setCursor = False):
-        """Process a textedit link and either highlight
-           the corresponding source code or set the
-           cursor to it.
-        """
-        t = textedit.link(url)
-        # Only process textedit links
-        if not t:
-            return False
-        filename = util.normpath(t.filename)
-        doc = self.document(filename, setCursor)
-        if doc:
-            cursor = QTextCursor(doc)
-            b = doc.findBlockByNumber(t.line - 1)
-            p = b.position() + t.column
-            cursor.setPosition(p)
-            cursors = pointandclick.positions(cursor)
-            # Do highlighting if the document is active
-            if cursors and doc == self.mainwindow().currentDocument():
-                import viewhighlighter
-                view = self.mainwindow().currentView()
-                viewhighlighter.highlighter(view).highlight(self._highlightFormat, cursors, 2, 0)
-            # set the cursor and bring the document to front
-            if setCursor:
-                mainwindow = self.mainwindow()
-                mainwindow.setTextCursor(cursor)
-                import widgets.blink
-                widgets.blink.Blinker.blink_cursor(mainwindow.currentView())
-                self.mainwindow().setCurrentDocument(doc)
-                mainwindow.activateWindow()
-                mainwindow.currentView().setFocus()
-        return True
-
-    def emitCursor(self, cursor):
-        self.cursor.emit(cursor)
+        self.unhover()
+        self._links = None
+        self._highlightRange = None
+        self.clearHighlight(self._highlightMusicFormat)
+        self.discardEdits()
+        super(View, self).clear()
+
+    def gotoPage(self, num):
+        """Scroll to the top of the page with the index num."""
+        layout = self.pageLayout()
+        if 0 <= num < len(layout):
+            self.verticalScrollBar().setValue(layout[num].y)
+
+    def zoomOriginal(self):
+        """Show the pages at their natural size."""
+        self.setZoomFactor(1.0)
 
     def readSettings(self):
         """Reads the settings from the user's preferences."""
-        color = textformats.formatData('editor').baseColors['selectionbackground']
+        colors = textformats.formatData('editor').baseColors
+        self._highlightMusicFormat.setColor(colors['musichighlight'])
+        self._editFormat.setColor(colors['selectionbackground'])
+        color = QColor(colors['selectionbackground'])
         color.setAlpha(128)
         self._highlightFormat.setBackground(color)
 
-    def saveSVG(self, svg_string):
-        """Pass string from JavaScript and save to current SVG page."""
-        with open(self.currentSVG(), 'wb') as f:
-            f.write(svg_string.encode('utf8'))
-
-    def unHighlight(self):
-        import viewhighlighter
-        view = self.mainwindow().currentView()
-        viewhighlighter.highlighter(view).clear(self._highlightFormat)
-
-    def zoomIn(self):
-        self.setZoomFactor(self.zoomFactor() * 1.1)
-
-    def zoomOut(self):
-        self.setZoomFactor(self.zoomFactor() / 1.1)
-
-    def zoomOriginal(self):
-        self.setZoomFactor(1.0)
+    def linkAt(self, pos):
+        """Return a (page, link) tuple for the link at pos in the viewport, or None."""
+        pos = pos - self.layoutPosition()
+        page = self.pageLayout().pageAt(pos)
+        if page:
+            links = page.linksAt(pos)
+            if links:
+                return page, links[0]
+
+    def textCursor(self, link, load=False):
+        """Return a QTextCursor for a textedit link, or None."""
+        if self._links:
+            return self._links.cursor(link, load)
+
+    def editingEnabled(self):
+        """Return True if linked objects can be dragged (an experimental feature)."""
+        return app.is_git_controlled() or QSettings().value("experimental-features", False, bool)
+
+    def mouseMoveEvent(self, ev):
+        if self._pressed and ev.buttons() & Qt.LeftButton and self.editingEnabled():
+            page, link, pos = self._pressed
+            if not self._dragging:
+                self._dragging = True
+                self.objectStartDragging.emit(0.0, 0.0)
+            self.objectDragging.emit(*self.dragOffset(page, ev.pos() - pos))
+            self.showEdits((page, link, ev.pos() - pos))
+            return
+        found = self.linkAt(ev.pos())
+        if found != self._hovered:
+            self.unhover()
+            if found:
+                self.hover(*found)
+        super(View, self).mouseMoveEvent(ev)
+
+    def mousePressEvent(self, ev):
+        if ev.button() == Qt.LeftButton:
+            found = self.linkAt(ev.pos())
+            if found:
+                self._pressed = found + (ev.pos(),)
+                self._dragging = False
+                cursor = self.textCursor(found[1], True)
+                if cursor:
+                    self.cursor.emit(cursor)
+                return
+        super(View, self).mousePressEvent(ev)
+
+    def mouseReleaseEvent(self, ev):
+        if self._pressed and ev.button() == Qt.LeftButton:
+            page, link, pos = self._pressed
+            self._pressed = None
+            if self._dragging:
+                self._dragging = False
+                self.objectDragged.emit(*self.dragOffset(page, ev.pos() - pos))
+                self.addEdit(page, link, ev.pos() - pos)
+            else:
+                self.linkClicked(page, link)
+            return
+        super(View, self).mouseReleaseEvent(ev)
+
+    def leaveEvent(self, ev):
+        self.unhover()
+        super(View, self).leaveEvent(ev)
+
+    def dragOffset(self, page, delta):
+        """Return the offset (x, y) in SVG units for a mouse movement (QPoint).
+
+        The y direction is upwards, like in LilyPond.
 
-    def setZoomFactor(self, value):
-        changed = self.zoomFactor() != value
-        super(View, self).setZoomFactor(value)
-        if changed:
-            self.zoomFactorChanged.emit(self.zoomFactor())
+        """
+        x, y = self.svgOffset(page, delta)
+        return x, -y
+
+    def svgOffset(self, page, delta):
+        """Return the offset (x, y) in SVG units for a mouse movement (QPoint)."""
+        box = page.viewBox()
+        return (delta.x() * box.width() / page.width,
+                delta.y() * box.height() / page.height)
+
+    def addEdit(self, page, link, delta):
+        """Record that the linked object was moved by delta (QPoint)."""
+        anchor = getattr(link, 'anchor', None)
+        if anchor is None:
+            return
+        x, y = self.svgOffset(page, delta)
+        edits = self._edits.setdefault(page, {})
+        if anchor in edits:
+            link, x0, y0 = edits[anchor]
+            x, y = x0 + x, y0 + y
+        edits[anchor] = (link, x, y)
+        self.showEdits()
+
+    def showEdits(self, dragging=None):
+        """Highlight the places the objects were moved to.
+
+        dragging may be a (page, link, delta) tuple for an object that is
+        being dragged by the mouse.
 
+        """
+        moved = dict(((page, anchor), (link, x, y))
+                     for page, edits in self._edits.items()
+                     for anchor, (link, x, y) in edits.items())
+        if dragging:
+            page, link, delta = dragging
+            x, y = self.svgOffset(page, delta)
+            anchor = getattr(link, 'anchor', None)
+            if (page, anchor) in moved:
+                link, x0, y0 = moved[(page, anchor)]
+                x, y = x0 + x, y0 + y
+            moved[(page, anchor)] = (link, x, y)
+        areas = []
+        for (page, anchor), (link, x, y) in moved.items():
+            box = page.viewBox()
+            dx, dy = x / box.width(), y / box.height()
+            left, top, right, bottom = link.area
+            areas.append((page, (left + dx, top + dy, right + dx, bottom + dy)))
+        if areas:
+            self.highlight(self._editFormat, areas)
+        else:
+            self.clearHighlight(self._editFormat)
+
+    def hasEdits(self):
+        """Return True if objects were moved."""
+        return bool(self._edits)
+
+    def discardEdits(self):
+        """Forget the moved objects."""
+        self._edits = {}
+        self.clearHighlight(self._editFormat)
+
+    def saveEdits(self):
+        """Write the moved objects to the SVG files.
+
+        Raises OSError if a file can't be read or written. Reload the pages
+        afterwards to see the result.
 
-class JSLink(QObject):
-    """functions to be called from JavaScript
+        """
+        edits, self._edits = self._edits, {}
+        self.clearHighlight(self._editFormat)
+        for page, moved in edits.items():
+            if page.filename:
+                with open(page.filename, 'rb') as f:
+                    data = f.read()
+                offsets = dict((anchor, (x, y)) for anchor, (link, x, y) in moved.items())
+                data = qpageview.svg.translateAnchors(data, offsets)
+                with open(page.filename, 'wb') as f:
+                    f.write(data)
+
+    def hover(self, page, link):
+        """Called when the mouse moves onto a link."""
+        self._hovered = (page, link)
+        self.viewport().setCursor(QCursor(Qt.PointingHandCursor))
+        self.highlight(self._highlightMusicFormat, [(page, link.area)], 2000)
+        self._highlightRange = None
+        cursor = self.textCursor(link)
+        if not cursor or cursor.document() != self.mainwindow().currentDocument():
+            return
+        # highlight token(s) at this cursor
+        cursors = pointandclick.positions(cursor)
+        if cursors:
+            view = self.mainwindow().currentView()
+            viewhighlighter.highlighter(view).highlight(self._highlightFormat, cursors, 2, 5000)
+
+    def unhover(self):
+        """Called when the mouse moves off a previously hovered link."""
+        if self._hovered:
+            self._hovered = None
+            self.viewport().unsetCursor()
+            self.clearHighlighting()
+            view = self.mainwindow().currentView()
+            if view:
+                viewhighlighter.highlighter(view).clear(self._highlightFormat)
+
+    def linkClicked(self, page, link):
+        """Called when a link is clicked.
+
+        If the link is a textedit link, opens the document and puts the cursor
+        there. Otherwise, call the helpers module to open the destination.
 
-    using addToJavaScriptWindowObject
+        """
+        cursor = self.textCursor(link, True)
+        if cursor:
+            import browseriface
+            import widgets.blink
+            mainwindow = self.mainwindow()
+            self._clicking_link = True
+            browseriface.get(mainwindow).setTextCursor(cursor, findOpenView=True)
+            self._clicking_link = False
+            widgets.blink.Blinker.blink_cursor(mainwindow.currentView())
+            mainwindow.activateWindow()
+            mainwindow.currentView().setFocus()
+        elif link.url and not link.url.startswith('textedit:'):
+            import helpers
+            helpers.openUrl(QUrl(link.url))
+
+    def showCursor(self, cursor):
+        """Highlight the objects the text cursor points to, like the Music View."""
+        if not self._links or not self.isVisible():
+            return
+        links = self._links.boundLinks(cursor.document())
+        if not links:
+            return # the SVG contains no references to this text document
+        s = links.indices(cursor)
+        if s is False:
+            self.clearHighlighting()
+        elif s:
+            destinations = links.destinations()[s]
+            if not self._clicking_link:
+                layout = self.pageLayout()
+                rect = layout[destinations[0][0][0]].linkRect(destinations[0][0][1])
+                rect.translate(self.layoutPosition())
+                if not self.viewport().rect().contains(rect):
+                    self.verticalScrollBar().setValue(
+                        self.verticalScrollBar().value() + rect.center().y()
+                        - self.viewport().height() // 2)
+            count = s.stop - s.start
+            self._highlightRemoveTimer.start(5000 if count > 1 else 2000)
+            if self._highlightRange == s:
+                return # don't redraw if same
+            self._highlightRange = s
+            layout = self.pageLayout()
+            self.highlight(self._highlightMusicFormat,
+                [(layout[num], area) for dest in destinations for num, area in dest])
+
+    def clearHighlighting(self):
+        """Remove the highlighting of music objects."""
+        self._highlightRange = None
+        self.clearHighlight(self._highlightMusicFormat)
+
+
+class Highlighter(qpageview.highlight.Highlighter):
+    """Simple version of qpageview.highlight.Highlighter that has the color settable.
+
+    You must set a color before using the Highlighter.
 
     """
-    def __init__(self, view):
-        super(JSLink, self).__init__()
-        self.view = view
-
-    @pyqtSlot(str)
-    def click(self, url):
-        """set cursor in source by clicked textedit link"""
-        if not self.view.doTextEdit(url, True):
-            import helpers
-            helpers.openUrl(QUrl(url))
-
-    @pyqtSlot(float, float)
-    def dragged(self, offX, offY):
-        """announce extra-offsets an element has been dragged to"""
-        self.view.doObjectDragged(offX, offY)
-
-    @pyqtSlot(str)
-    def draggedObject(self, JSON_string):
-        # leave the following commented code as an idea how to proceed from here
-        #print("Dragged object JSON representation:")
-        #import json
-        #js = json.JSONDecoder()
-        #print(js.decode(JSON_string))
-        pass
-
-    @pyqtSlot(str)
-    def dragElement(self, url):
-        self.view.dragElement(url)
-
-    @pyqtSlot(float, float)
-    def dragging(self, offX, offY):
-        """announce extra-offsets while dragging an element"""
-        self.view.doObjectDragging(offX, offY)
-
-    @pyqtSlot(str)
-    def hover(self, url):
-        """actions when user set mouse over link"""
-        self.view.doTextEdit(url, False)
-
-    @pyqtSlot(str)
-    def leave(self, url):
-        """actions when user moves mouse off link"""
-        self.view.unHighlight()
-
-    @pyqtSlot(str)
-    def pyLog(self, txt):
-        """Temporary function. Print to Python console."""
-        print(txt)
-
-    @pyqtSlot(str)
-    def saveSVG(self, svg_string):
-        """Pass string from JavaScript and save to current SVG page."""
-        self.view.saveSVG(svg_string)
-
-    @pyqtSlot(float, float)
-    def startDragging(self, offX, offY):
-        """announce extra-offsets when starting to drag an element"""
-        self.view.doObjectStartDragging(offX, offY)
+    def setColor(self, color):
+        """Sets the color to use to draw highlighting rectangles."""
+        self._color = color
+
+    def color(self):
+        """Returns the color set using the setColor method."""
+        return self._color
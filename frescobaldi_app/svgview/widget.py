@@ -26,8 +26,9 @@ import os
 import sys
 
 from PyQt5 import QtCore
-from PyQt5.QtWidgets import (QComboBox, QHBoxLayout, QLabel, QPushButton,
-                             QSpinBox, QToolButton, QVBoxLayout, QWidget)
+from PyQt5.QtWidgets import (QComboBox, QHBoxLayout, QLabel, QMessageBox,
+                             QPushButton, QSpinBox, QToolButton, QVBoxLayout,
+                             QWidget)
 
 import app
 import qutil
@@ -87,11 +88,17 @@ class SvgView(QWidget):
         self.pageCombo.currentIndexChanged.connect(self.changePage)
         self.zoomNumber.valueChanged.connect(self.slotZoomNumberChanged)
         self.view.zoomFactorChanged.connect(self.slotViewZoomChanged)
+        self.view.verticalScrollBar().valueChanged.connect(self.slotScrolled)
         dockwidget.mainwindow().currentDocumentChanged.connect(self.initSvg)
-        self.zoomNumber.setValue(100)
+        dockwidget.mainwindow().currentViewChanged.connect(self.slotCurrentViewChanged)
+        with qutil.signalsBlocked(self.zoomNumber):
+            self.zoomNumber.setValue(100)
         doc = dockwidget.mainwindow().currentDocument()
         if doc:
             self.initSvg(doc)
+        textview = dockwidget.mainwindow().currentView()
+        if textview:
+            self.slotCurrentViewChanged(textview)
         app.translateUI(self)
 
     def translateUI(self):
@@ -101,7 +108,11 @@ class SvgView(QWidget):
         return self.parent().mainwindow()
 
     def initSvg(self, doc):
-        """Opens first page of score after compilation"""
+        """Opens the pages of the score after compilation.
+
+        The SVG files are loaded in the background.
+
+        """
         if doc == self.mainwindow().currentDocument():
             files = svgfiles.SvgFiles.instance(doc)
             model = files.model() # forces update
@@ -110,21 +121,57 @@ class SvgView(QWidget):
                 with qutil.signalsBlocked(self.pageCombo):
                     self.pageCombo.setModel(model)
                     self.pageCombo.setCurrentIndex(files.current)
-                self.view.load(files.url(files.current))
+                files.load(lambda pages, links: self.slotPagesLoaded(doc, pages, links))
+
+    def slotPagesLoaded(self, doc, pages, links):
+        """Called when the SVG pages of the document have been loaded."""
+        if doc == self._document:
+            self.view.setPages(pages, links)
+            self.view.gotoPage(svgfiles.SvgFiles.instance(doc).current)
 
     def reLoadDoc(self):
         """Reloads current document."""
         if self._document:
+            svgfiles.SvgFiles.instance(self._document).invalidate()
             self.initSvg(self._document)
 
     def callSave(self):
-        """Call save function"""
-        self.view.evalSave()
+        """Save the objects moved in the view to the SVG files and reload them."""
+        if not self.view.hasEdits():
+            return
+        try:
+            self.view.saveEdits()
+        except (IOError, OSError) as e:
+            QMessageBox.warning(self, app.caption(_("Error")),
+                _("Can't write to destination:\n\n{url}\n\n{error}").format(
+                    url=e.filename, error=e.strerror))
+        self.reLoadDoc()
 
     def getCurrent(self):
         files = svgfiles.SvgFiles.instance(self._document)
         return files.filename(files.current)
 
+    def slotCurrentViewChanged(self, view, old=None):
+        if old:
+            old.cursorPositionChanged.disconnect(self.slotCursorPositionChanged)
+        view.cursorPositionChanged.connect(self.slotCursorPositionChanged)
+
+    def slotCursorPositionChanged(self):
+        """Called when the user moves the text cursor."""
+        view = self.mainwindow().currentView()
+        if view:
+            self.view.showCursor(view.textCursor())
+
+    def slotScrolled(self):
+        """Show the page at the top of the view in the combobox."""
+        layout = self.view.pageLayout()
+        page = layout.pageAt(self.view.visibleRect().center())
+        if page and self._document:
+            index = layout.index(page)
+            svgfiles.SvgFiles.instance(self._document).current = index
+            with qutil.signalsBlocked(self.pageCombo):
+                self.pageCombo.setCurrentIndex(index)
+
     def slotZoomNumberChanged(self, value):
         self._setting_zoom = True
         self.view.setZoomFactor(value / 100.0)
@@ -141,8 +188,7 @@ class SvgView(QWidget):
             files = svgfiles.SvgFiles.instance(doc)
             if files:
                 files.current = page_index
-                svg = files.url(page_index)
-                self.view.load(svg)
+                self.view.gotoPage(page_index)
 
     def slotDocumentClosed(self, doc):
         if doc == self._document:
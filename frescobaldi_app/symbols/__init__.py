@@ -30,11 +30,15 @@ from PyQt5.QtGui import QIcon, QIconEngine, QImage, QPainter, QPixmap
 from PyQt5.QtWidgets import QApplication, QStyleOption
 from PyQt5.QtSvg import QSvgRenderer
 
+import app
+
 __all__ = ["icon"]
 
 
 _icons = {}
 _pixmaps = {}
+_renderers = {}
+_cachedir = None
 
 
 def icon(name):
@@ -46,6 +50,65 @@ def icon(name):
         return icon
 
 
+def renderer(name):
+    """Returns the (cached) QSvgRenderer for the named symbol."""
+    try:
+        return _renderers[name]
+    except KeyError:
+        r = _renderers[name] = QSvgRenderer(os.path.join(__path__[0], name + ".svg"))
+        return r
+
+
+def cachedir():
+    """Returns the directory where rendered symbols are cached on disk.
+
+    The directory name contains the modification time of the newest SVG
+    file, so the cache is not used anymore when a symbol is changed.
+    Returns None if the directory can't be created.
+
+    """
+    global _cachedir
+    if _cachedir is None:
+        stamp = max(entry.stat().st_mtime_ns
+                    for entry in os.scandir(__path__[0])
+                    if entry.name.endswith('.svg'))
+        try:
+            _cachedir = os.path.join(app.cachedir('symbols'), format(stamp, 'x'))
+            os.makedirs(_cachedir, exist_ok=True)
+        except OSError:
+            _cachedir = ''
+    return _cachedir or None
+
+
+def image(name, size, color):
+    """Returns a QImage of the named symbol in the given size and color.
+
+    The image is read from the disk cache if possible; otherwise the symbol is
+    rendered and stored in the cache.
+
+    """
+    ratio = QApplication.instance().devicePixelRatio()
+    d = cachedir()
+    if d:
+        filename = os.path.join(d, "{0}-{1}x{2}-{3:08x}@{4}.png".format(
+            name, size.width(), size.height(), color.rgba(), ratio))
+        i = QImage(filename)
+        if not i.isNull() and i.size() == size:
+            return i
+    i = QImage(size, QImage.Format_ARGB32_Premultiplied)
+    i.fill(0)
+    painter = QPainter(i)
+    # render SVG symbol
+    renderer(name).render(painter)
+    # recolor to text color
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(i.rect(), color)
+    painter.end()
+    if d:
+        i.save(filename, "PNG")
+    return i
+
+
 def pixmap(name, size, mode, state):
     """Returns a (possibly cached) pixmap of the name and size with the default text color.
 
@@ -60,15 +123,7 @@ def pixmap(name, size, mode, state):
     try:
         return _pixmaps[key]
     except KeyError:
-        i = QImage(size, QImage.Format_ARGB32_Premultiplied)
-        i.fill(0)
-        painter = QPainter(i)
-        # render SVG symbol
-        QSvgRenderer(os.path.join(__path__[0], name + ".svg")).render(painter)
-        # recolor to text color
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(i.rect(), color)
-        painter.end()
+        i = image(name, size, color)
         # let style alter the drawing based on mode, and create QPixmap
         pixmap = QApplication.style().generatedIconPixmap(mode, QPixmap.fromImage(i), QStyleOption())
         _pixmaps[key] = pixmap
@@ -28,13 +28,24 @@ if it has not run yet.
 If you alter the document and directly after that need the new tokens,
 use update().
 
+For whole-document scans the tokens of a block are also available in
+columns (see columns()): arrays with the class id, start position and length
+of every token. These are cached with the tokens and can be filtered by
+token class without looking at the Token objects themselves; select() and
+token_hash() use them.
+
 """
 
 
+import array
 import collections
+import itertools
+import operator
 
 from PyQt5.QtGui import QTextBlock, QTextCursor
 
+import ly.lex
+
 import cursortools
 import highlighter
 
@@ -161,3 +172,126 @@ def all_tokens(document):
     return (token for block in cursortools.all_blocks(document) for token in tokens(block))
 
 
+
+
+_class_ids = {}     # token class -> class id
+_classes = []       # class id -> token class
+_masks = {}         # tuple of classes -> bytearray with 1 for matching ids
+
+
+def class_id(cls):
+    """Return the integer id of the token class, registering it if needed."""
+    try:
+        return _class_ids[cls]
+    except KeyError:
+        i = _class_ids[cls] = len(_classes)
+        _classes.append(cls)
+        return i
+
+
+def class_mask(classes):
+    """Return a bytearray that has a 1 at the ids of subclasses of classes.
+
+    classes is a tuple of token classes, like the second argument to
+    isinstance(). The mask is cached and extended when new classes are
+    registered.
+
+    """
+    try:
+        mask = _masks[classes]
+    except KeyError:
+        mask = _masks[classes] = bytearray()
+    if len(mask) < len(_classes):
+        mask.extend(issubclass(cls, classes) for cls in _classes[len(mask):])
+    return mask
+
+
+class Columns(object):
+    """The tokens of a block stored in columns.
+
+    The classes, starts and lengths attributes are arrays with the class id
+    (see class_id()), the position in the block and the length of each token.
+    The tokens attribute is the tuple of Token objects the columns were made
+    from.
+
+    """
+    __slots__ = ('tokens', 'classes', 'starts', 'lengths', '_significant')
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        types = list(map(type, tokens))
+        for cls in set(types).difference(_class_ids):
+            class_id(cls)
+        self.classes = array.array('H', map(_class_ids.__getitem__, types))
+        self.starts = array.array('L', map(operator.attrgetter('pos'), tokens))
+        self.lengths = array.array('L', map(len, tokens))
+        self._significant = None
+
+    def __len__(self):
+        return len(self.tokens)
+
+    def indices(self, classes):
+        """Return an iterator over the indices of the tokens of the classes."""
+        mask = class_mask(classes)
+        return itertools.compress(itertools.count(), map(mask.__getitem__, self.classes))
+
+    def select(self, classes):
+        """Return an iterator over the tokens that are instances of classes."""
+        mask = class_mask(classes)
+        return itertools.compress(self.tokens, map(mask.__getitem__, self.classes))
+
+    def significant(self):
+        """Return a tuple of the tokens that are not Space or Comment (cached)."""
+        if self._significant is None:
+            mask = class_mask((ly.lex.Space, ly.lex.Comment))
+            self._significant = tuple(itertools.compress(self.tokens,
+                map(operator.not_, map(mask.__getitem__, self.classes))))
+        return self._significant
+
+
+def columns(block):
+    """Return the Columns of the tokens of the block.
+
+    The Columns are cached in the block's user data as long as the tokens
+    do not change.
+
+    """
+    tokens_ = tokens(block)
+    data = block.userData()
+    c = getattr(data, 'columns', None)
+    if c is None or c.tokens is not tokens_:
+        c = Columns(tokens_)
+        if data is not None and getattr(data, 'tokens', None) is tokens_:
+            data.columns = c
+    return c
+
+
+def all_columns(document):
+    """Yields (block, Columns) tuples for all blocks of the document."""
+    for block in cursortools.all_blocks(document):
+        yield block, columns(block)
+
+
+def select(document, classes):
+    """Yields all tokens of the document that are instances of classes.
+
+    classes is a tuple of token classes, like the second argument to
+    isinstance(). This is faster than checking all_tokens() with isinstance().
+
+    """
+    for block, c in all_columns(document):
+        yield from c.select(classes)
+
+
+def token_hash(document):
+    """Return an integer hash for all non-whitespace and non-comment tokens.
+
+    This hash does not change when only comments or whitespace are changed,
+    also not when lines are joined or split, and it is the same as the hash
+    ly.docinfo.DocInfo.token_hash() computes. The tokens of every block are
+    filtered once and cached, so after a change only the changed blocks need
+    to be filtered again.
+
+    """
+    return hash(tuple(itertools.chain.from_iterable(
+        c.significant() for block, c in all_columns(document))))
@@ -230,9 +230,10 @@ def get_bom(data):
     A two-tuple is returned (encoding, data). If the data starts with a BOM
     mark, its encoding is determined and the BOM mark is stripped off.
     Otherwise, the returned encoding is None and the data is returned
-    unchanged.
+    unchanged. The data may also be a memoryview or another buffer object.
 
     """
+    head = bytes(data[:4])
     for bom, encoding in (
         (codecs.BOM_UTF8, 'utf-8'),
         (codecs.BOM_UTF16_LE, 'utf_16_le'),
@@ -240,7 +241,7 @@ def get_bom(data):
         (codecs.BOM_UTF32_LE, 'utf_32_le'),
         (codecs.BOM_UTF32_BE, 'utf_32_be'),
             ):
-        if data.startswith(bom):
+        if head.startswith(bom):
             return encoding, data[len(bom):]
     return None, data
 
@@ -253,20 +254,23 @@ def decode(data, encoding=None):
 
     Otherwise utf-8 and finally latin1 are tried.
 
+    The data may also be a memoryview or another buffer object, such as a
+    memory-mapped file.
+
     """
     enc, data = get_bom(data)
     for e in (enc, encoding):
         if e:
             try:
-                return data.decode(e)
+                return str(data, e)
             except (UnicodeError, LookupError):
                 pass
-    latin1 = data.decode('latin1') # this never fails
+    latin1 = str(data, 'latin1') # this never fails
     encoding = variables.variables(latin1).get("coding")
     for e in (encoding, 'utf-8'):
         if e and e != 'latin1':
             try:
-                return data.decode(e)
+                return str(data, e)
             except (UnicodeError, LookupError):
                 pass
     return latin1
@@ -100,25 +100,25 @@ class Folder(QObject):
     You should inherit from this class to provide folding events.
     It is enough to implement the fold_events() method.
 
-    By default, simple caching is used to store the nesting depth every
-    20 lines. This makes the depth() method faster, which would otherwise count
-    the fold_events() for every block from the beginning of the document.
+    The fold levels of the blocks are kept in a LevelIndex, which is filled
+    when needed and truncated from the first changed block when the document
+    changes. This makes depth() and region() logarithmic instead of counting
+    the fold_events() of all the blocks before or in the region.
 
-    The depth() caching expects that the fold_events that a text block
-    generates do not depend on the contents of a text block later in the
-    document.
+    The index expects that the fold_events that a text block generates do not
+    depend on the contents of a text block later in the document.
 
     If your fold_events() method generates events for a text block that depend
-    on a later block, you should disable caching by setting the
-    cache_depth_lines instance (or class) attribute to zero.
+    on a later block, you should set the cache_depth_lines instance (or class)
+    attribute to zero, then the whole index is recomputed after every change.
 
     """
-    # cache depth() for every n lines (0=disable)
+    # keep the index after changes (0=recompute the whole index)
     cache_depth_lines = 20
 
     def __init__(self, doc):
         QObject.__init__(self, doc)
-        self._depth_cache = []      # cache result of depth()
+        self._index = LevelIndex()  # fold levels of the first blocks
         self._all_visible = None    # True when all are certainly visible
         doc.contentsChange.connect(self.slot_contents_change)
         self._timer = QTimer(singleShot=True, timeout=self.check_consistency)
@@ -141,9 +141,7 @@ class Folder(QObject):
 
         """
         block = self.document().findBlock(position)
-        if self.cache_depth_lines:
-            chunk = block.blockNumber() // self.cache_depth_lines
-            del self._depth_cache[chunk:]
+        self.invalidate_depth_cache(block)
 
         if self._all_visible:
             return
@@ -171,9 +169,19 @@ class Folder(QObject):
 
     def invalidate_depth_cache(self, block):
         """Makes sure the depth is recomputed from the specified block."""
-        if self.cache_depth_lines:
-            chunk = block.blockNumber() // self.cache_depth_lines
-            del self._depth_cache[chunk:]
+        self._index.truncate(block.blockNumber() if self.cache_depth_lines else 0)
+
+    def update_index(self, count):
+        """Makes sure the fold levels of the first count blocks are indexed."""
+        index = self._index
+        count = min(count, self.document().blockCount())
+        if len(index) < count:
+            block = self.document().findBlockByNumber(len(index))
+            levels = []
+            for i in range(count - len(index)):
+                levels.append(self._fold_level(block))
+                block = block.next()
+            index.extend(levels)
 
     def check_consistency(self):
         """Called some time after the last document change.
@@ -269,8 +277,16 @@ class Folder(QObject):
 
         This methods uses fold_events() to get the information, it discards
         folding regions that start and stop on the same text line.
+        If the block is already in the index, the level is taken from there.
 
         """
+        n = block.blockNumber()
+        if n < len(self._index):
+            return self._index.level(n)
+        return self._fold_level(block)
+
+    def _fold_level(self, block):
+        """Computes the Level(stop, start) of the block using fold_events()."""
         start, stop = 0, 0
         for e in self.fold_events(block):
             if e is START:
@@ -284,34 +300,13 @@ class Folder(QObject):
     def depth(self, block):
         """Return the number of active regions at the start of this block.
 
-        The default implementation simply counts all the fold_events from
-        the beginning of the document, using caching if the cache_depth_lines
-        instance attribute is set to a value > 0.
+        The default implementation counts all the fold_events from the
+        beginning of the document, using the index of fold levels.
 
         """
-        depth = 0
-        last = block.document().firstBlock()
-        if self.cache_depth_lines:
-            chunk = block.blockNumber() // self.cache_depth_lines
-            if chunk:
-                target = block.document().findBlockByNumber(chunk * self.cache_depth_lines)
-                if chunk <= len(self._depth_cache):
-                    depth = self._depth_cache[chunk - 1]
-                    last = target
-                else:
-                    # some values need to be computed first
-                    if self._depth_cache:
-                        depth = self._depth_cache[-1]
-                        last = block.document().findBlockByNumber(len(self._depth_cache) * self.cache_depth_lines)
-                    while last < target:
-                        depth += sum(self.fold_events(last))
-                        last = last.next()
-                        if last.blockNumber() % self.cache_depth_lines == 0:
-                            self._depth_cache.append(depth)
-        while last < block:
-            depth += sum(self.fold_events(last))
-            last = last.next()
-        return depth
+        n = block.blockNumber()
+        self.update_index(n)
+        return self._index.depth(n)
 
     def region(self, block, depth=0):
         """Return as Region (start, end) the region of the specified block.
@@ -325,29 +320,41 @@ class Folder(QObject):
         find one more above that, etc. Use -1 to get the top-most region.
 
         """
+        index = self._index
+        doc = self.document()
+        n = block.blockNumber()
+        self.update_index(n + 1)
+        # a region starting in block s contains our block if the lowest depth
+        # in s is lower than the depth after our block
+        limit = index.depth(n + 1)
         start = None
         start_depth = 0
-        count = 0
-        for b in cursortools.backwards(block):
-            l = self.fold_level(b)
-            if l.start:
-                count += l.start
-                if count > start_depth:
-                    start = b
-                    start_depth = count
-                    if count > depth > -1:
-                        break
-            count += l.stop
-        if start:
-            count = start_depth
-            end = None
-            for end in cursortools.forwards(block.next()):
-                l = self.fold_level(end)
-                if count <= -l.stop:
-                    return Region(start, end)
-                count += sum(l)
-            if end:
-                return Region(start, end)
+        s = n
+        while s >= 0:
+            i = index.find_backward(s, limit - start_depth)
+            if i is None:
+                break
+            start = i
+            start_depth = limit - index.depth(i) - index.level(i).stop
+            if start_depth > depth > -1:
+                break
+            s = i - 1
+        if start is None or n + 1 >= doc.blockCount():
+            return
+        # the region ends in the first block where the depth gets lower
+        # than at the start of the region
+        limit -= start_depth
+        count = n + 1
+        while True:
+            end = index.find_forward(count, limit)
+            if end is not None:
+                break
+            count = len(index)
+            if count >= doc.blockCount():
+                end = count - 1
+                break
+            self.update_index(count * 2)
+        return Region(doc.findBlockByNumber(start), doc.findBlockByNumber(end))
 
     def fold(self, block, depth=0):
         """Fold the region the block is in.
@@ -468,6 +475,125 @@ class Folder(QObject):
                 return
 
 
+class LevelIndex(object):
+    """The fold levels of the first blocks of a document.
+
+    Stores a Level(stop, start) per block in a segment tree, which keeps for
+    every node the sum of the levels and the lowest depth reached, relative to
+    the depth at the start of the node. So the depth at a block, and the first
+    or last block where the depth gets below a value, are found in logarithmic
+    time.
+
+    Only the first len(index) blocks are valid; truncate() forgets the blocks
+    from a block number and extend() appends blocks.
+
+    """
+    def __init__(self):
+        self._size = 1      # number of leaves, a power of two
+        self._sum = [0, 0]  # per node the sum of start and stop of the blocks
+        self._min = [0, 0]  # per node the lowest depth relative to its start
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def truncate(self, count):
+        """Forget the levels of the blocks from block number count."""
+        self._count = min(self._count, count)
+
+    def extend(self, levels):
+        """Append the list of Level tuples for the following blocks."""
+        first = self._count
+        end = first + len(levels)
+        if end > self._size:
+            # grow, keeping the existing leaves
+            size = self._size
+            while size < end:
+                size *= 2
+            sums = [0] * size + self._sum[self._size:self._size + first] + [0] * (size - first)
+            mins = [0] * size + self._min[self._size:self._size + first] + [0] * (size - first)
+            self._size, self._sum, self._min = size, sums, mins
+            first = 0
+        size, sums, mins = self._size, self._sum, self._min
+        for i, (stop, start) in enumerate(levels, size + self._count):
+            sums[i] = stop + start
+            mins[i] = stop
+        # update the parent nodes
+        lo, hi = (size + first) // 2, (size + end - 1) // 2
+        while lo:
+            for i in range(lo, hi + 1):
+                left = sums[2 * i]
+                sums[i] = left + sums[2 * i + 1]
+                mins[i] = min(mins[2 * i], left + mins[2 * i + 1])
+            lo //= 2
+            hi //= 2
+        self._count = end
+
+    def level(self, n):
+        """Return the Level(stop, start) of block n."""
+        i = self._size + n
+        stop = self._min[i]
+        return Level(stop, self._sum[i] - stop)
+
+    def depth(self, n):
+        """Return the depth at the start of block n."""
+        sums = self._sum
+        result = 0
+        lo, hi = self._size, self._size + n
+        while lo < hi:
+            if lo & 1:
+                result += sums[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                result += sums[hi]
+            lo //= 2
+            hi //= 2
+        return result
+
+    def find_forward(self, n, limit):
+        """Return the first block number >= n where the lowest depth is <= limit.
+
+        Returns None if there is no such block in the index.
+
+        """
+        sums, mins, count = self._sum, self._min, self._count
+        def search(node, lo, hi, depth):
+            if hi <= n or lo >= count:
+                return
+            if lo >= n and hi <= count and depth + mins[node] > limit:
+                return
+            if hi - lo == 1:
+                return lo
+            mid = (lo + hi) // 2
+            result = search(2 * node, lo, mid, depth)
+            if result is None:
+                result = search(2 * node + 1, mid, hi, depth + sums[2 * node])
+            return result
+        return search(1, 0, self._size, 0)
+
+    def find_backward(self, n, limit):
+        """Return the last block number <= n where the lowest depth is < limit.
+
+        Returns None if there is no such block in the index.
+
+        """
+        sums, mins, count = self._sum, self._min, self._count
+        def search(node, lo, hi, depth):
+            if lo > n or lo >= count:
+                return
+            if hi <= n + 1 and hi <= count and depth + mins[node] >= limit:
+                return
+            if hi - lo == 1:
+                return lo
+            mid = (lo + hi) // 2
+            result = search(2 * node + 1, mid, hi, depth + sums[2 * node])
+            if result is None:
+                result = search(2 * node, lo, mid, depth)
+            return result
+        return search(1, 0, self._size, 0)
+
+
 class FoldingArea(QWidget):
 
     Folder = Folder
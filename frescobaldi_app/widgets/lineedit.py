@@ -55,7 +55,7 @@ class LineEdit(QLineEdit):
         b = self._clearButton
         if self.text():
             frame = self.style().pixelMetric(QStyle.PM_DefaultFrameWidth)
-            y = max(0, (self.height() - b.height()) / 2)
+            y = max(0, (self.height() - b.height()) // 2)
             if self.layoutDirection() == Qt.RightToLeft:
                 x = frame + 2
             else: